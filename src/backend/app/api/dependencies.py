@@ -8,7 +8,7 @@ FastAPI依存性注入パターン
 
 from typing import AsyncGenerator
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -19,8 +19,12 @@ from app.services.permission_service import PermissionService
 from app.services.project_config_service import ProjectConfigService
 from app.services.public_access_service import PublicAccessService
 from app.services.share_service import ShareService
+from app.services.usage_analytics_service import UsageAnalyticsService
 from app.services.usage_service import UsageService
-from app.utils.database import get_session_context
+from app.utils.database import get_read_session_context, get_session_context
+
+# read-your-writes 判定に使うパス/クエリパラメータ
+_CONSISTENCY_PARAMS = ("session_id", "project_id")
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -29,6 +33,24 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """読み取り専用データベースセッション取得
+
+    レプリカが利用可能ならレプリカへ、パス/クエリパラメータの
+    セッション/プロジェクトが直前に書き込まれていればプライマリへ振り分けます。
+    （例: GET /sessions?project_id=... はセッション作成直後ならプライマリ）
+    書き込みを伴うエンドポイントでは使用しないでください。
+    """
+    keys = [
+        value
+        for params in (request.path_params, request.query_params)
+        for name, value in params.items()
+        if name in _CONSISTENCY_PARAMS
+    ]
+    async with get_read_session_context(keys) as session:
+        yield session
+
+
 async def get_project_manager(
     session: AsyncSession = Depends(get_db_session)
 ) -> ProjectManager:
@@ -43,6 +65,13 @@ async def get_session_manager(
     return SessionManager(session)
 
 
+async def get_read_session_manager(
+    session: AsyncSession = Depends(get_read_session)
+) -> SessionManager:
+    """読み取り専用SessionManager取得（一覧・履歴表示用）"""
+    return SessionManager(session)
+
+
 def get_file_service() -> FileService:
     """FileService取得"""
     return FileService(workspace_base=settings.workspace_base)
@@ -78,6 +107,26 @@ async def get_usage_service(
     return UsageService(session)
 
 
+async def get_read_usage_service(
+    session: AsyncSession = Depends(get_read_session),
+) -> UsageService:
+    """読み取り専用UsageService取得
+
+    ダッシュボードの使用量統計表示に使用します。
+    """
+    return UsageService(session)
+
+
+async def get_usage_analytics_service(
+    session: AsyncSession = Depends(get_read_session),
+) -> UsageAnalyticsService:
+    """UsageAnalyticsService取得
+
+    使用量の時系列分析に使用します（読み取り専用）。
+    """
+    return UsageAnalyticsService(session)
+
+
 async def get_project_config_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> ProjectConfigService:
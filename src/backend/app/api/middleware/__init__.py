@@ -3,5 +3,6 @@ Middleware module for API error handling and request processing.
 """
 
 from app.api.middleware.error_handler import handle_exceptions
+from app.api.middleware.rate_limit import RateLimitMiddleware
 
-__all__ = ["handle_exceptions"]
+__all__ = ["handle_exceptions", "RateLimitMiddleware"]
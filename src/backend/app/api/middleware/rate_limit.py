@@ -0,0 +1,165 @@
+"""
+Rate Limit Middleware
+
+HTTPリクエストのレート制限（ASGIミドルウェア）
+
+パスからルートグループを判定し、グループごとの上限と
+キー（ユーザー・公開トークン・クライアントIP）でトークンバケットを消費します。
+上限超過時は 429 と Retry-After ヘッダーを返します。
+WebSocket はメッセージフレーム単位で各ハンドラーが制限します。
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import jwt
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.models.errors import ErrorCode
+from app.services.rate_limiter import get_rate_limiter
+from app.utils.helpers import get_client_ip
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fastapi-users の JWT audience
+_JWT_AUDIENCE = "fastapi-users:auth"
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    ルートグループのレート制限ルール
+
+    Attributes:
+        group: グループ名（get_group_limit で上限を解決、None はレート制限対象外）
+        path_prefix: 対象パスのプレフィックス
+        key_func: 接続からバケットキーを生成する関数
+    """
+    group: Optional[str]
+    path_prefix: str
+    key_func: Optional[Callable[[HTTPConnection], str]] = None
+
+
+def _user_or_ip_key(connection: HTTPConnection) -> str:
+    """認証済みならユーザーID、未認証ならクライアントIP"""
+    authorization = connection.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            payload = jwt.decode(
+                authorization[7:],
+                settings.secret_key,
+                algorithms=["HS256"],
+                audience=_JWT_AUDIENCE,
+            )
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+        except jwt.InvalidTokenError:
+            pass
+    return f"ip:{get_client_ip(connection)}"
+
+
+def _ip_key(connection: HTTPConnection) -> str:
+    """クライアントIP"""
+    return f"ip:{get_client_ip(connection)}"
+
+
+def _public_token_key(connection: HTTPConnection) -> str:
+    """公開トークン（パスの先頭セグメント）+ クライアントIP"""
+    prefix = f"{settings.api_prefix}/public/"
+    token = connection.url.path[len(prefix):].split("/", 1)[0]
+    return f"token:{token}:ip:{get_client_ip(connection)}"
+
+
+def default_rules() -> list[RateLimitRule]:
+    """
+    既定のルール（先頭一致、上から順に評価）
+
+    Returns:
+        list[RateLimitRule]: ルール一覧
+    """
+    api = settings.api_prefix
+    return [
+        RateLimitRule(group=None, path_prefix=f"{api}/health"),
+        RateLimitRule(group="auth", path_prefix=f"{api}/auth/", key_func=_ip_key),
+        RateLimitRule(group="public", path_prefix=f"{api}/public/", key_func=_public_token_key),
+        RateLimitRule(group="api", path_prefix=f"{api}/", key_func=_user_or_ip_key),
+    ]
+
+
+class RateLimitMiddleware:
+    """
+    レート制限ミドルウェア
+
+    責務:
+    - パスによるルートグループの判定
+    - グループ上限によるトークンバケット判定
+    - 429 / Retry-After / X-RateLimit-* ヘッダーの付与
+    """
+
+    def __init__(self, app: ASGIApp, rules: Optional[list[RateLimitRule]] = None):
+        """
+        Args:
+            app: ASGIアプリケーション
+            rules: ルール一覧（省略時は default_rules）
+        """
+        self.app = app
+        self.rules = rules if rules is not None else default_rules()
+
+    def _match(self, path: str) -> Optional[RateLimitRule]:
+        """パスに一致するルール"""
+        for rule in self.rules:
+            if path.startswith(rule.path_prefix):
+                return rule
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match(scope.get("path", ""))
+        if rule is None or rule.group is None or rule.key_func is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = rule.key_func(HTTPConnection(scope))
+        result = await get_rate_limiter().hit_group(rule.group, key)
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        rate_headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+        if not result.allowed:
+            logger.info("Rate limit exceeded", group=rule.group, key=key, path=scope.get("path"))
+            body = json.dumps({
+                "code": ErrorCode.RATE_LIMITED.value,
+                "message": "Too many requests",
+                "details": {"retry_after": result.retry_after_seconds},
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(result.retry_after_seconds).encode()),
+                    *rate_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *rate_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
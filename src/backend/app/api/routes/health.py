@@ -6,7 +6,16 @@ Health Check API
 
 from fastapi import APIRouter
 
-from app.schemas.response import HealthCheckResponse
+from app.config import settings
+from app.schemas.response import (
+    DatabaseHealthResponse,
+    HealthCheckResponse,
+    MaintenanceHealthResponse,
+    PublicResultCacheHealthResponse,
+)
+from app.services.maintenance_service import get_maintenance_service
+from app.services.public_result_cache import get_public_result_cache
+from app.utils.database import get_pool_metrics
 from app.utils.helpers import current_timestamp
 
 router = APIRouter(tags=["health"])
@@ -25,3 +34,48 @@ async def health_check() -> HealthCheckResponse:
         version="1.0.0",
         timestamp=current_timestamp(),
     )
+
+
+@router.get("/health/database", response_model=DatabaseHealthResponse)
+async def database_health() -> DatabaseHealthResponse:
+    """
+    データベース接続プール状態
+
+    プライマリ/レプリカのプール使用状況と読み取りルーティング件数を返します。
+
+    Returns:
+        DatabaseHealthResponse: プール・レプリカ状態
+    """
+    return DatabaseHealthResponse(**get_pool_metrics(), timestamp=current_timestamp())
+
+
+@router.get("/health/public-result-cache", response_model=PublicResultCacheHealthResponse)
+async def public_result_cache_health() -> PublicResultCacheHealthResponse:
+    """
+    公開コマンド結果キャッシュの状態
+
+    このワーカーのヒット/ミス件数とエントリ数を返します。
+
+    Returns:
+        PublicResultCacheHealthResponse: キャッシュ状態
+    """
+    return PublicResultCacheHealthResponse(
+        **get_public_result_cache().metrics(), timestamp=current_timestamp()
+    )
+
+
+@router.get("/health/maintenance", response_model=MaintenanceHealthResponse)
+async def maintenance_health() -> MaintenanceHealthResponse:
+    """
+    定期メンテナンスの状態
+
+    このワーカーでのタスクごとの直近の所要時間・処理件数・エラーを返します。
+
+    Returns:
+        MaintenanceHealthResponse: メンテナンス状態
+    """
+    return MaintenanceHealthResponse(
+        enabled=settings.maintenance_enabled,
+        tasks=get_maintenance_service().stats(),
+        timestamp=current_timestamp(),
+    )
@@ -12,6 +12,7 @@ from fastapi import APIRouter, Depends, Query
 from app.api.dependencies import (
     get_permission_service,
     get_project_manager,
+    get_read_usage_service,
     get_session_manager,
     get_share_service,
     get_usage_service,
@@ -426,7 +427,7 @@ async def get_project_usage(
     current_user: UserModel = Depends(current_active_user),
     project_manager: ProjectManager = Depends(get_project_manager),
     permission_service: PermissionService = Depends(get_permission_service),
-    usage_service: UsageService = Depends(get_usage_service),
+    usage_service: UsageService = Depends(get_read_usage_service),
 ) -> UsageStatsResponse:
     """
     プロジェクトの使用量統計取得（認証必須）
@@ -154,17 +154,20 @@ async def update_public_access(
     if not await permission_service.can_admin(user.id, project_id):
         raise PermissionDeniedError("You don't have permission to manage public access")
 
-    public_access = await public_access_service.update_public_access(
-        project_id=project_id,
-        enabled=request.enabled,
-        password=request.password,
-        clear_password=request.clear_password or False,
-        allowed_ips=request.allowed_ips,
-        max_sessions_per_day=request.max_sessions_per_day,
-        max_messages_per_session=request.max_messages_per_session,
-        expires_at=request.expires_at,
-        clear_expires_at=request.clear_expires_at or False,
-    )
+    try:
+        public_access = await public_access_service.update_public_access(
+            project_id=project_id,
+            enabled=request.enabled,
+            password=request.password,
+            clear_password=request.clear_password or False,
+            allowed_ips=request.allowed_ips,
+            max_sessions_per_day=request.max_sessions_per_day,
+            max_messages_per_session=request.max_messages_per_session,
+            expires_at=request.expires_at,
+            clear_expires_at=request.clear_expires_at or False,
+        )
+    except ValueError as e:
+        raise ValidationError(str(e))
 
     if not public_access:
         raise NotFoundError("PublicAccess", project_id)
@@ -314,6 +317,7 @@ async def update_command_public_setting(
         command_id=command_id,
         is_public=request.is_public,
         priority=request.priority,
+        result_cache_ttl_seconds=request.result_cache_ttl_seconds,
     )
 
     if not setting:
@@ -21,31 +21,13 @@ from app.schemas.public_access import (
     VerifyPasswordResponse,
 )
 from app.services.public_access_service import PublicAccessService
+from app.utils.helpers import get_client_ip
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 router = APIRouter(tags=["public"])
 
 
-def get_client_ip(request: Request) -> str:
-    """クライアントIPを取得"""
-    # X-Forwarded-For ヘッダーがある場合は最初のIPを使用
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-
-    # X-Real-IP ヘッダー
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip
-
-    # 直接接続
-    if request.client:
-        return request.client.host
-
-    return "unknown"
-
-
 @router.get(
     "/public/{token}",
     response_model=PublicProjectInfoResponse,
@@ -258,8 +240,8 @@ async def create_public_session(
     client_ip = get_client_ip(request)
     user_agent = request.headers.get("User-Agent")
 
-    # トークン検証
-    public_access = await public_access_service.get_public_access_by_token(token)
+    # トークン検証（無効化・再生成が他ワーカーに未反映でも作成しないようDBを参照）
+    public_access = await public_access_service.get_public_access_by_token(token, use_cache=False)
     if not public_access:
         raise NotFoundError("PublicAccess", token)
 
@@ -275,10 +257,6 @@ async def create_public_session(
     if public_access_service.check_expired(public_access):
         raise PermissionDeniedError("Public access has expired")
 
-    # セッション上限チェック
-    if await public_access_service.check_session_limit(public_access):
-        raise ValidationError("Daily session limit reached")
-
     # パスワード認証チェック
     if public_access.password_hash:
         if not authorization:
@@ -293,13 +271,16 @@ async def create_public_session(
         if verified_access_id != public_access.id:
             raise PermissionDeniedError("Invalid or expired session token")
 
-    # セッション作成
-    session = await public_access_service.create_public_session(
-        public_access=public_access,
-        ip_address=client_ip,
-        user_agent=user_agent,
-        command_id=request_data.command_id,  # Noneの場合はフリーチャット
-    )
+    # セッション作成（当日セッション上限はアトミックに判定）
+    try:
+        session = await public_access_service.create_public_session(
+            public_access=public_access,
+            ip_address=client_ip,
+            user_agent=user_agent,
+            command_id=request_data.command_id,  # Noneの場合はフリーチャット
+        )
+    except ValueError as e:
+        raise ValidationError(str(e))
 
     if not session:
         raise ValidationError("Invalid command or command is not public")
@@ -9,7 +9,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from app.api.dependencies import get_session_manager
+from app.api.dependencies import get_read_session_manager, get_session_manager
 from app.api.middleware import handle_exceptions
 from app.core.session_manager import SessionManager
 from app.models.errors import SessionNotFoundError
@@ -59,7 +59,7 @@ async def list_sessions(
     project_id: Optional[str] = Query(default=None),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    manager: SessionManager = Depends(get_session_manager),
+    manager: SessionManager = Depends(get_read_session_manager),
 ) -> SessionListResponse:
     """
     セッション一覧取得
@@ -89,7 +89,7 @@ async def list_sessions(
 @handle_exceptions
 async def get_session(
     session_id: str,
-    manager: SessionManager = Depends(get_session_manager),
+    manager: SessionManager = Depends(get_read_session_manager),
 ) -> SessionResponse:
     """
     セッション取得
@@ -198,7 +198,7 @@ async def get_session_messages(
     start_date: Optional[datetime] = Query(default=None, description="開始日時でフィルタ (ISO 8601形式)"),
     end_date: Optional[datetime] = Query(default=None, description="終了日時でフィルタ (ISO 8601形式)"),
     search: Optional[str] = Query(default=None, max_length=100, description="メッセージ内容で検索"),
-    manager: SessionManager = Depends(get_session_manager),
+    manager: SessionManager = Depends(get_read_session_manager),
 ) -> MessageHistoryResponse:
     """
     セッションのメッセージ履歴取得
@@ -275,7 +275,7 @@ async def get_session_messages_paginated(
     start_date: Optional[datetime] = Query(default=None, description="開始日時でフィルタ (ISO 8601形式)"),
     end_date: Optional[datetime] = Query(default=None, description="終了日時でフィルタ (ISO 8601形式)"),
     search: Optional[str] = Query(default=None, max_length=100, description="メッセージ内容で検索"),
-    manager: SessionManager = Depends(get_session_manager),
+    manager: SessionManager = Depends(get_read_session_manager),
 ) -> PaginatedMessageHistoryResponse:
     """
     セッションのメッセージ履歴取得（詳細ペジネーション情報付き）
@@ -367,6 +367,10 @@ async def save_session_message(
     if not target_session:
         raise SessionNotFoundError(session_id)
 
+    # アーカイブ済みの場合は履歴を復元してから追記
+    if target_session.archived_at is not None:
+        await manager.rehydrate_if_archived(session_id)
+
     # メッセージロール変換
     role = MessageRole(request.role)
 
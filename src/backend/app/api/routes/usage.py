@@ -0,0 +1,75 @@
+"""
+Usage Analytics API
+
+使用量の時系列分析エンドポイント
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_permission_service, get_usage_analytics_service
+from app.api.middleware import handle_exceptions
+from app.core.auth.users import current_active_user
+from app.models.database import UserModel
+from app.models.errors import PermissionDeniedError, ValidationError
+from app.schemas.response import UsageAnalyticsResponse
+from app.services.permission_service import PermissionService
+from app.services.usage_analytics_service import UsageAnalyticsService
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+# 1リクエストで指定できる最大プロジェクト数
+MAX_PROJECTS_PER_QUERY = 50
+
+
+@router.get("/analytics", response_model=UsageAnalyticsResponse)
+@handle_exceptions
+async def get_usage_analytics(
+    project_ids: List[str] = Query(..., description="対象プロジェクトID（複数指定可）"),
+    interval: Literal["hour", "day", "week"] = Query(default="day", description="バケット間隔（JST基準）"),
+    group_by: Optional[Literal["project", "model", "user", "session"]] = Query(
+        default=None, description="系列の分割キー"
+    ),
+    start: Optional[datetime] = Query(default=None, description="集計開始日時 (ISO 8601形式)"),
+    end: Optional[datetime] = Query(default=None, description="集計終了日時 (ISO 8601形式)"),
+    current_user: UserModel = Depends(current_active_user),
+    permission_service: PermissionService = Depends(get_permission_service),
+    analytics_service: UsageAnalyticsService = Depends(get_usage_analytics_service),
+) -> UsageAnalyticsResponse:
+    """
+    使用量の時系列分析（認証必須）
+
+    複数プロジェクトをまとめて集計できるため、プロジェクト横断の
+    コストダッシュボードも1リクエストで取得できます。
+
+    Args:
+        project_ids: 対象プロジェクトID
+        interval: バケット間隔（hour/day/week）
+        group_by: 系列の分割キー（project/model/user/session）
+        start: 集計開始日時
+        end: 集計終了日時
+        current_user: 現在のログインユーザー
+        permission_service: 権限サービス (DI)
+        analytics_service: 使用量分析サービス (DI)
+
+    Returns:
+        UsageAnalyticsResponse: バケット別の使用量系列
+    """
+    if len(set(project_ids)) > MAX_PROJECTS_PER_QUERY:
+        raise ValidationError(f"Too many projects (max {MAX_PROJECTS_PER_QUERY})")
+
+    # 権限チェック（すべてのプロジェクトにアクセス権限が必要、1クエリで判定）
+    accessible = await permission_service.filter_accessible_projects(current_user.id, project_ids)
+    if not accessible.issuperset(project_ids):
+        raise PermissionDeniedError("You don't have access to this project")
+
+    result = await analytics_service.get_usage_series(
+        project_ids,
+        interval=interval,
+        group_by=group_by,
+        start=start,
+        end=end,
+    )
+    return UsageAnalyticsResponse(**result)
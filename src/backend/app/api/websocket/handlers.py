@@ -35,6 +35,10 @@ from app.core.chat_processor import ChatMessageProcessor, ConfigBundle
 from app.core.session_manager import SessionManager, MessageSaveError
 from app.models.messages import MessageRole
 from app.schemas.websocket import WSChatMessage, WSErrorMessage
+from app.services.rate_limiter import get_rate_limiter
+from app.services.spend_reservation import get_spend_reservations, remaining_budget
+from app.services.turn_budget import TurnBudget
+from app.services.usage_ledger import UsageLedgerEntry, get_usage_ledger
 from app.services.usage_service import UsageService
 from app.utils.database import get_session_context
 from app.utils.logger import get_logger
@@ -64,6 +68,7 @@ class ErrorCode(str, Enum):
     STREAM_INTERRUPTED = "stream_interrupted"
     MESSAGE_SAVE_FAILED = "message_save_failed"
     INTERNAL_ERROR = "internal_error"
+    RATE_LIMITED = "rate_limited"
 
 
 @dataclass
@@ -402,6 +407,17 @@ async def handle_chat_websocket(
             message_type = message_data.get("type", "chat")
 
             if message_type == "chat":
+                # メッセージフレームのレート制限（セッション単位）
+                limited = await get_rate_limiter().hit_group("chat_ws", session_id)
+                if limited and not limited.allowed:
+                    await connection_manager.send_error(
+                        session_id,
+                        "Too many messages. Please wait before sending again.",
+                        ErrorCode.RATE_LIMITED,
+                        details={"retry_after": limited.retry_after_seconds},
+                    )
+                    continue
+
                 # チャット処理をバックグラウンドタスクとして実行
                 # これによりメインループはブロックされず、question_answer などのメッセージを受信できる
                 asyncio.create_task(_handle_chat_type(
@@ -701,8 +717,13 @@ async def handle_chat_message(
     # 処理中フラグをセット（メモリ上）
     conn_manager.set_processing(session_id, True)
     conn_manager.clear_partial_response(session_id)
+    reservation = None
 
     try:
+        # アーカイブ済みセッションは短いトランザクションで先に復元（ターンの失敗に巻き込まない）
+        async with get_session_context() as db_session:
+            await SessionManager(db_session).rehydrate_if_archived(session_id)
+
         # データベースセッションを使用してメッセージ履歴取得・保存
         async with get_session_context() as db_session:
             session_manager = SessionManager(db_session)
@@ -765,6 +786,22 @@ async def handle_chat_message(
                 )
                 return
 
+            # 推定コストを予約（同時実行ターンによる上限超過を防止）
+            reservation = await get_spend_reservations().reserve(project_id, cost_check)
+            if reservation is None:
+                await conn_manager.send_error(
+                    session_id,
+                    "利用制限の残りが少ないため、実行中の他のリクエストの完了後に再度お試しください。",
+                    ErrorCode.COST_LIMIT_EXCEEDED,
+                    {
+                        "reserved": True,
+                        "limit_daily": cost_check.get("limit_daily"),
+                        "limit_weekly": cost_check.get("limit_weekly"),
+                        "limit_monthly": cost_check.get("limit_monthly"),
+                    }
+                )
+                return
+
             # メッセージ履歴取得
             message_history = await session_manager.get_message_history(session_id)
             existing_message_count = len(message_history)
@@ -782,6 +819,12 @@ async def handle_chat_message(
             # SDKセッションIDを取得（セッション再開用）
             sdk_session_id = await session_manager.get_sdk_session_id(session_id)
 
+            # ターン内の使用量上限（ターン上限とプロジェクト残予算）
+            turn_budget = TurnBudget.for_turn(
+                session_model or settings.default_model,
+                remaining_budget(cost_check),
+            )
+
             # SDK オプション構築（既存のSDKセッションIDがあれば再開、セッションのモデルを使用）
             options = processor.build_sdk_options(
                 config,
@@ -998,7 +1041,8 @@ async def handle_chat_message(
             # ストリーミング処理（リトライ対応）
             try:
                 full_response_text, content_blocks, usage_info, was_interrupted, new_sdk_session_id = await _stream_response(
-                    session_id, options, message, conn_manager, tool_use_id_map, hook_tool_results
+                    session_id, options, message, conn_manager, tool_use_id_map, hook_tool_results,
+                    turn_budget,
                 )
             except Exception as stream_error:
                 error_str = str(stream_error)
@@ -1028,7 +1072,8 @@ async def handle_chat_message(
 
                     # リトライ
                     full_response_text, content_blocks, usage_info, was_interrupted, new_sdk_session_id = await _stream_response(
-                        session_id, options, message, conn_manager, tool_use_id_map, hook_tool_results
+                        session_id, options, message, conn_manager, tool_use_id_map, hook_tool_results,
+                        turn_budget,
                     )
                 else:
                     raise
@@ -1090,7 +1135,15 @@ async def handle_chat_message(
             total_tokens = usage_info.get("input_tokens", 0) + usage_info.get("output_tokens", 0)
             total_cost = usage_info.get("total_cost_usd", 0)
             if total_tokens > 0 or total_cost > 0:
-                await session_manager.update_usage(session_id, total_tokens, total_cost)
+                await session_manager.update_usage(
+                    session_id,
+                    total_tokens,
+                    total_cost,
+                    input_tokens=usage_info.get("input_tokens", 0),
+                    output_tokens=usage_info.get("output_tokens", 0),
+                    cache_read_tokens=usage_info.get("cache_read_input_tokens", 0),
+                    cache_creation_tokens=usage_info.get("cache_creation_input_tokens", 0),
+                )
                 logger.debug(
                     "Usage saved to DB",
                     session_id=session_id,
@@ -1098,6 +1151,19 @@ async def handle_chat_message(
                     cost=total_cost,
                 )
 
+                # 予約を実コストで精算
+                await get_spend_reservations().settle(reservation, total_cost)
+
+                # ターン単位の使用量台帳（バックグラウンドでバッチ書き込み）
+                get_usage_ledger().record(UsageLedgerEntry.from_usage_info(
+                    usage_info,
+                    project_id=project_id,
+                    session_id=session_id,
+                    user_id=session_info.user_id if session_info else None,
+                    model=session_model or settings.default_model,
+                    tool_count=sum(1 for b in content_blocks if b.get("type") == "tool_use"),
+                ))
+
             # 処理状態をDBでクリア（正常完了）
             await session_manager.set_processing(session_id, False)
 
@@ -1115,6 +1181,13 @@ async def handle_chat_message(
             logger.warning("Failed to clear processing state on error", session_id=session_id, error=str(db_error))
 
     finally:
+        # 未精算の予約を解放（エラー・中断時）
+        if reservation is not None:
+            try:
+                await get_spend_reservations().release(reservation)
+            except Exception as release_error:
+                logger.warning("Failed to release spend reservation", session_id=session_id, error=str(release_error))
+
         # 処理中フラグをクリア（メモリ上）
         conn_manager.set_processing(session_id, False)
         conn_manager.clear_partial_response(session_id)
@@ -1127,17 +1200,21 @@ async def _stream_response(
     conn_manager: ConnectionManager,
     tool_use_id_map: Optional[Dict[str, str]] = None,
     hook_tool_results: Optional[Dict[str, dict]] = None,
+    turn_budget: Optional[TurnBudget] = None,
 ) -> tuple[str, List[dict], dict, bool, Optional[str]]:
     """
     Claude Agent SDK でストリーミングレスポンスを処理
 
     セッション継続性のため、同じセッションでは同じSDKクライアントを再利用します。
+    turn_budget の上限を超えた場合は client.interrupt() で中断し、
+    ResultMessage まで受信を続けて部分結果と実使用量を確定させます。
 
     Args:
         session_id: セッションID
         options: Claude Agent SDK オプション
         message: チャットメッセージ
         conn_manager: 接続マネージャー
+        turn_budget: ターン内の使用量トラッカー（上限判定用）
 
     Returns:
         tuple[str, List[dict], dict, bool, Optional[str]]:
@@ -1155,6 +1232,7 @@ async def _stream_response(
         "duration_ms": 0,
     }
     was_interrupted = False
+    result_received = False
     sdk_session_id: Optional[str] = None
     start_time = time.time()
 
@@ -1247,6 +1325,38 @@ async def _stream_response(
                             },
                         )
 
+                # ストリーミング中の使用量積算と上限判定
+                exceeded = turn_budget.observe(sdk_message) if turn_budget else None
+                if exceeded:
+                    logger.warning(
+                        "Turn budget exceeded, interrupting",
+                        session_id=session_id,
+                        reason=exceeded,
+                        tokens=turn_budget.total_tokens,
+                        estimated_cost=round(turn_budget.cost_usd, 6),
+                        max_tokens=turn_budget.max_tokens,
+                        max_cost_usd=turn_budget.max_cost_usd,
+                    )
+                    was_interrupted = True
+                    await conn_manager.send_error(
+                        session_id,
+                        "ターンの利用上限に達したため処理を中断しました。",
+                        ErrorCode.COST_LIMIT_EXCEEDED,
+                        {
+                            "reason": exceeded,
+                            "tokens": turn_budget.total_tokens,
+                            "estimated_cost_usd": round(turn_budget.cost_usd, 6),
+                            "max_tokens": turn_budget.max_tokens,
+                            "max_cost_usd": turn_budget.max_cost_usd,
+                        },
+                    )
+                    # 中断後も ResultMessage まで受信し、部分結果と実使用量を確定させる
+                    try:
+                        await client.interrupt()
+                    except Exception as e:
+                        logger.warning("Failed to interrupt SDK client", session_id=session_id, error=str(e))
+                        break
+
             elif isinstance(sdk_message, UserMessage):
                 # UserMessage内のToolResultBlockを処理
                 for block in sdk_message.content:
@@ -1295,6 +1405,7 @@ async def _stream_response(
                 )
 
             elif isinstance(sdk_message, ResultMessage):
+                result_received = True
                 # 使用量情報（usageは辞書型）
                 usage_dict = sdk_message.usage or {}
                 usage_info = {
@@ -1339,6 +1450,10 @@ async def _stream_response(
             if tool_use_id and tool_use_id in all_tool_results:
                 final_content_blocks.append(all_tool_results[tool_use_id])
 
+    # ResultMessage なしで中断した場合はストリーミング中の積算値を使用
+    if not result_received and turn_budget and turn_budget.total_tokens > 0:
+        usage_info = turn_budget.to_usage_info()
+
     # 実際の処理時間を計算（SDK から取得できない場合）
     if usage_info["duration_ms"] == 0:
         usage_info["duration_ms"] = int((time.time() - start_time) * 1000)
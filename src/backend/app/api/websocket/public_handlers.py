@@ -8,7 +8,9 @@ import asyncio
 import json
 import os
 import time
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Coroutine, Dict, Optional
 
 from fastapi import WebSocket, WebSocketDisconnect
 
@@ -24,19 +26,55 @@ from claude_agent_sdk import (
 from app.config import settings
 from app.core.chat_processor import ChatMessageProcessor
 from app.models.database import PublicSessionModel, ProjectCommandModel
+from app.services.project_config_cache import get_project_config_cache
 from app.services.public_access_service import PublicAccessService
+from app.services.public_chat_queue import PublicChatQueue, QueueFullError
+from app.services.public_result_cache import (
+    CachedResult,
+    get_public_result_cache,
+    make_cache_key,
+)
+from app.services.public_workspace_overlay import get_public_workspace_overlays
+from app.services.rate_limiter import get_rate_limiter
 from app.utils.database import get_session_context
+from app.utils.helpers import get_client_ip
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class PublicSDKClientLease:
+    """公開セッションに貸し出すSDKクライアント"""
+    client: ClaudeSDKClient
+    access_id: Optional[str]
+    last_used: float
+    in_use: bool = False
+    # False にすると返却時にクローズ（ストリーム途中で中断した場合など）
+    reusable: bool = True
+    # セッションに保持されず、返却時に必ずクローズされる一時クライアント
+    ephemeral: bool = False
+    # 作成時のプロジェクト設定バージョン（変更後は作り直す）
+    config_version: int = 0
+
+
 class PublicConnectionManager:
     """公開WebSocket接続管理"""
 
+    # アイドルクライアント掃除の間隔（秒）
+    SDK_CLIENT_SWEEP_INTERVAL = 60
+
     def __init__(self) -> None:
         self.active_connections: Dict[str, WebSocket] = {}
         self.processing: Dict[str, bool] = {}
+        # セッションごとに保持するSDKクライアント（CLI起動コストの削減）
+        self._sdk_clients: Dict[str, PublicSDKClientLease] = {}
+        self._sdk_client_lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        # セッションごとのメッセージ処理タスク（切断時にキャンセル）
+        self._chat_tasks: Dict[str, asyncio.Task] = {}
+        # 公開アクセスごとの同時実行数制御
+        self.chat_queue = PublicChatQueue()
 
     async def connect(self, session_id: str, websocket: WebSocket) -> None:
         """WebSocket接続を受け入れる"""
@@ -58,8 +96,195 @@ class PublicConnectionManager:
             del self.active_connections[session_id]
         if session_id in self.processing:
             del self.processing[session_id]
+        # 処理中・待機中のメッセージは中断（待機順・実行枠は解放される）
+        task = self._chat_tasks.get(session_id)
+        if task and not task.done():
+            task.cancel()
+        # 処理中でなければSDKクライアントを解放（処理中は返却時にクローズ）
+        lease = self._sdk_clients.get(session_id)
+        if lease:
+            if lease.in_use:
+                lease.reusable = False
+            else:
+                asyncio.create_task(self.close_sdk_client(session_id))
         logger.info("Public WebSocket disconnected", session_id=session_id)
 
+    @asynccontextmanager
+    async def lease_sdk_client(
+        self,
+        session_id: str,
+        access_id: Optional[str],
+        options: ClaudeAgentOptions,
+        config_version: int = 0,
+    ) -> AsyncIterator[PublicSDKClientLease]:
+        """
+        セッションのSDKクライアントを貸し出す
+
+        セッションごとにクライアントを保持し、メッセージごとのCLI起動を省略します。
+        トークンあたりの上限に達した場合は、同じトークンで最も長くアイドルな
+        クライアントを破棄し、それもなければ一時クライアントを使用します。
+        プロジェクト設定が変更されている場合は保持中のクライアントを作り直します。
+        例外発生時や lease.reusable=False の場合は返却時にクローズします。
+
+        Args:
+            session_id: 公開セッションID
+            access_id: 公開アクセスID（上限の単位）
+            options: Claude Agent SDK オプション（新規作成時のみ使用）
+            config_version: プロジェクト設定のバージョン
+
+        Yields:
+            PublicSDKClientLease: 貸し出したクライアント
+        """
+        lease = await self._acquire_sdk_client(session_id, access_id, options, config_version)
+        try:
+            yield lease
+        except BaseException:
+            lease.reusable = False
+            raise
+        finally:
+            lease.in_use = False
+            lease.last_used = time.monotonic()
+            if lease.ephemeral:
+                await self._close_client(session_id, lease.client)
+            elif not lease.reusable or session_id not in self.active_connections:
+                await self.close_sdk_client(session_id)
+
+    async def _acquire_sdk_client(
+        self,
+        session_id: str,
+        access_id: Optional[str],
+        options: ClaudeAgentOptions,
+        config_version: int,
+    ) -> PublicSDKClientLease:
+        """保持中のクライアントを取得、なければ作成"""
+        evicted: Optional[PublicSDKClientLease] = None
+        stale: Optional[PublicSDKClientLease] = None
+        async with self._sdk_client_lock:
+            lease = self._sdk_clients.get(session_id)
+            if lease and not lease.in_use:
+                if lease.config_version == config_version:
+                    lease.in_use = True
+                    logger.debug("Reusing public SDK client", session_id=session_id)
+                    return lease
+                # 設定変更前のオプションで起動したクライアントは破棄して作り直す
+                stale = self._sdk_clients.pop(session_id)
+                lease = None
+
+            ephemeral = lease is not None
+            if not ephemeral:
+                token_leases = [
+                    (sid, held) for sid, held in self._sdk_clients.items()
+                    if held.access_id == access_id
+                ]
+                if len(token_leases) >= settings.public_sdk_clients_per_token:
+                    idle = [item for item in token_leases if not item[1].in_use]
+                    if idle:
+                        evicted_id, evicted = min(idle, key=lambda item: item[1].last_used)
+                        del self._sdk_clients[evicted_id]
+                    else:
+                        ephemeral = True
+
+            client = ClaudeSDKClient(options=options)
+            lease = PublicSDKClientLease(
+                client=client,
+                access_id=access_id,
+                last_used=time.monotonic(),
+                in_use=True,
+                ephemeral=ephemeral,
+                config_version=config_version,
+            )
+            if not ephemeral:
+                self._sdk_clients[session_id] = lease
+
+        if stale:
+            logger.info("Public SDK client outdated by config change", session_id=session_id)
+            await self._close_client(session_id, stale.client)
+        if evicted:
+            await self._close_client(session_id, evicted.client)
+
+        try:
+            await client.__aenter__()  # コンテキストマネージャーを開始
+        except BaseException:
+            if not ephemeral:
+                self._sdk_clients.pop(session_id, None)
+            raise
+
+        logger.info(
+            "Created public SDK client",
+            session_id=session_id,
+            ephemeral=ephemeral,
+            live_clients=len(self._sdk_clients),
+        )
+        self._start_sweeper()
+        return lease
+
+    async def _close_client(self, session_id: str, client: ClaudeSDKClient) -> None:
+        """SDKクライアントを終了"""
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            logger.warning("Error closing public SDK client", session_id=session_id, error=str(e))
+
+    async def close_sdk_client(self, session_id: str) -> None:
+        """
+        セッションのSDKクライアントをクローズ
+
+        Args:
+            session_id: 公開セッションID
+        """
+        lease = self._sdk_clients.get(session_id)
+        if lease is None or lease.in_use:
+            return
+        del self._sdk_clients[session_id]
+        await self._close_client(session_id, lease.client)
+        logger.info("Public SDK client closed", session_id=session_id)
+
+    async def evict_idle_sdk_clients(self, max_idle_seconds: Optional[float] = None) -> int:
+        """
+        一定時間使われていないSDKクライアントをクローズ
+
+        Args:
+            max_idle_seconds: アイドル上限（秒）
+
+        Returns:
+            int: クローズした数
+        """
+        if max_idle_seconds is None:
+            max_idle_seconds = settings.public_sdk_client_idle_seconds
+        threshold = time.monotonic() - max_idle_seconds
+        idle_ids = [
+            session_id for session_id, lease in self._sdk_clients.items()
+            if not lease.in_use and lease.last_used < threshold
+        ]
+        for session_id in idle_ids:
+            await self.close_sdk_client(session_id)
+        if idle_ids:
+            logger.info("Evicted idle public SDK clients", count=len(idle_ids))
+        return len(idle_ids)
+
+    def _start_sweeper(self) -> None:
+        """アイドルクライアントの掃除タスクを起動"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        """保持中のクライアントがなくなるまで定期的にアイドル掃除"""
+        while self._sdk_clients:
+            await asyncio.sleep(self.SDK_CLIENT_SWEEP_INTERVAL)
+            try:
+                await self.evict_idle_sdk_clients()
+            except Exception as e:
+                logger.warning("Public SDK client sweep failed", error=str(e))
+
+    async def close_all_sdk_clients(self) -> None:
+        """全SDKクライアントをクローズ（シャットダウン時）"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for session_id in list(self._sdk_clients):
+            lease = self._sdk_clients.pop(session_id)
+            await self._close_client(session_id, lease.client)
+
     async def send_message(self, session_id: str, message: dict) -> None:
         """メッセージを送信"""
         websocket = self.active_connections.get(session_id)
@@ -69,13 +294,47 @@ class PublicConnectionManager:
             except Exception as e:
                 logger.error("Failed to send message", session_id=session_id, error=str(e))
 
+    def start_chat_task(self, session_id: str, coro: Coroutine[Any, Any, None]) -> bool:
+        """
+        メッセージ処理タスクを開始
+
+        Args:
+            session_id: 公開セッションID
+            coro: 処理コルーチン
+
+        Returns:
+            bool: 開始した場合 True（処理中のタスクがある場合は開始せず False）
+        """
+        task = self._chat_tasks.get(session_id)
+        if task and not task.done():
+            coro.close()
+            return False
+        task = asyncio.create_task(coro)
+        self._chat_tasks[session_id] = task
+        task.add_done_callback(lambda done: self._forget_chat_task(session_id, done))
+        return True
+
+    def _forget_chat_task(self, session_id: str, task: asyncio.Task) -> None:
+        """完了したタスクの登録を解除"""
+        if self._chat_tasks.get(session_id) is task:
+            del self._chat_tasks[session_id]
+
+    async def cancel_all_chat_tasks(self) -> None:
+        """全メッセージ処理タスクをキャンセル（シャットダウン時）"""
+        tasks = list(self._chat_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     def is_processing(self, session_id: str) -> bool:
         """処理中かどうかを確認"""
         return self.processing.get(session_id, False)
 
     def set_processing(self, session_id: str, is_processing: bool) -> None:
         """処理中フラグを設定"""
-        self.processing[session_id] = is_processing
+        if session_id in self.active_connections:
+            self.processing[session_id] = is_processing
 
 
 # グローバル接続マネージャー
@@ -152,6 +411,7 @@ async def handle_public_chat_websocket(
 
     # 接続確立
     await public_connection_manager.connect(session_id, websocket)
+    rate_limit_key = f"token:{token}:ip:{get_client_ip(websocket)}"
 
     try:
         # メッセージループ
@@ -180,9 +440,26 @@ async def handle_public_chat_websocket(
             if message_type == "chat":
                 content = message_data.get("content", "")
                 if content:
-                    asyncio.create_task(_handle_public_chat(
-                        session_id, content, project_id, workspace_path, command
-                    ))
+                    # メッセージフレームのレート制限（トークン+クライアントIP単位）
+                    limited = await get_rate_limiter().hit_group("public_ws", rate_limit_key)
+                    if limited and not limited.allowed:
+                        await public_connection_manager.send_message(session_id, {
+                            "type": "error",
+                            "error": "Too many messages. Please wait before sending again.",
+                            "code": "rate_limited",
+                            "retry_after": limited.retry_after_seconds,
+                        })
+                        continue
+                    started = public_connection_manager.start_chat_task(
+                        session_id,
+                        _handle_public_chat(session_id, content, project_id, workspace_path, command),
+                    )
+                    if not started:
+                        await public_connection_manager.send_message(session_id, {
+                            "type": "error",
+                            "error": "Already processing a message",
+                            "code": "already_processing",
+                        })
 
             elif message_type == "ping":
                 await public_connection_manager.send_message(session_id, {
@@ -215,6 +492,8 @@ async def _handle_public_chat(
         return
 
     public_connection_manager.set_processing(session_id, True)
+    message_counted = False
+    public_access_id = None
 
     try:
         async with get_session_context() as db_session:
@@ -230,14 +509,19 @@ async def _handle_public_chat(
                 })
                 return
 
-            # メッセージ上限チェック
-            if await public_service.check_message_limit(public_session):
+            # メッセージ上限の判定と加算（条件付きUPDATE1回、失敗時は戻す）
+            max_messages = public_session.public_access.max_messages_per_session
+            public_access_id = public_session.public_access_id
+            if not await public_service.increment_message_count(
+                session_id, max_messages, public_access_id=public_access_id
+            ):
                 await public_connection_manager.send_message(session_id, {
                     "type": "error",
                     "error": "Message limit reached",
                     "code": "message_limit",
                 })
                 return
+            message_counted = True
 
             # コマンドのプロンプトを取得
             system_prompt = None
@@ -266,36 +550,122 @@ async def _handle_public_chat(
                 })
                 return
 
-            # Thinking状態通知
-            await public_connection_manager.send_message(session_id, {
-                "type": "thinking",
-                "timestamp": time.time(),
-            })
+            # 完了通知用の残りメッセージ数
+            remaining = None
+            if max_messages:
+                remaining = max_messages - (public_session.message_count + 1)
+
+            # 結果キャッシュ（オプトインしたコマンドの、会話履歴のない最初のメッセージのみ）
+            # SDKセッションの状態は作業ディレクトリ単位のため、セッションごとの
+            # ワークスペースが有効な場合は元の実行を再開できず対象外
+            overlays = get_public_workspace_overlays()
+            cache_key = None
+            cache_ttl = 0 if overlays.enabled else _result_cache_ttl(command)
+            if cache_ttl and public_session.message_count == 0 and not public_session.sdk_session_id:
+                cache_key = make_cache_key(
+                    command.id,
+                    command.content,
+                    content,
+                    get_project_config_cache().version(project_id),
+                )
+                cached = get_public_result_cache().get(cache_key)
+                if cached is not None:
+                    await public_connection_manager.send_message(session_id, {
+                        "type": "thinking",
+                        "timestamp": time.time(),
+                    })
+                    await _replay_cached_result(session_id, cached)
+                    # 次のメッセージは元の実行の会話を分岐して再開する
+                    public_session.sdk_session_id = cached.sdk_session_id
+                    public_session.sdk_session_shared = True
+                    await db_session.commit()
+                    message_counted = False
+                    logger.info(
+                        "Public command result served from cache",
+                        session_id=session_id,
+                        command_id=command.id,
+                    )
+                    await public_connection_manager.send_message(session_id, {
+                        "type": "result",
+                        "usage": {
+                            "input_tokens": 0,
+                            "output_tokens": 0,
+                            "total_cost_usd": 0,
+                            "duration_ms": 0,
+                        },
+                        "remaining_messages": remaining,
+                        "cached": True,
+                        "timestamp": time.time(),
+                    })
+                    return
+
+            # セッションごとのコピーオンライト・ワークスペース（有効時）
+            if overlays.enabled:
+                session_workspace = await overlays.ensure(session_id, config.workspace_path)
+                # システムプロンプトのワークスペースパスも作り直す
+                config = replace(config, workspace_path=session_workspace, system_prompt=None)
 
             # SDK オプション構築（公開用はシンプルに）
+            # 結果キャッシュと共有中のSDKセッションは分岐して再開する（共有元に追記しない）
             options = processor.build_sdk_options(
                 config,
                 resume_session_id=public_session.sdk_session_id,
-                system_prompt_override=system_prompt,
+                system_prompt=system_prompt,
+                fork_session=bool(public_session.sdk_session_id and public_session.sdk_session_shared),
             )
 
-            # ストリーミング処理
-            full_response, usage_info, new_sdk_session_id = await _stream_public_response(
-                session_id, options, content
-            )
+            # 待機・実行中にDB接続を保持しないようトランザクションを終了
+            await db_session.commit()
 
-            # SDKセッションIDを更新
-            if new_sdk_session_id and new_sdk_session_id != public_session.sdk_session_id:
+            # ストリーミング処理（公開アクセスごとの実行枠を確保、セッションのSDKクライアントを再利用）
+            recorded_events: Optional[list] = [] if cache_key else None
+            try:
+                async with public_connection_manager.chat_queue.slot(
+                    public_access_id, session_id, on_position=_notify_queue_position
+                ):
+                    await public_connection_manager.send_message(session_id, {
+                        "type": "thinking",
+                        "timestamp": time.time(),
+                    })
+                    full_response, usage_info, new_sdk_session_id = await _stream_public_response(
+                        session_id,
+                        options,
+                        content,
+                        access_id=public_access_id,
+                        recorder=recorded_events,
+                        config_version=get_project_config_cache().version(project_id),
+                    )
+            except QueueFullError:
+                await public_connection_manager.send_message(session_id, {
+                    "type": "error",
+                    "error": "Too many people are using this link. Please try again shortly.",
+                    "code": "queue_full",
+                })
+                return
+
+            # SDKセッションIDを更新（結果をキャッシュした場合はキャッシュと共有）
+            shared = bool(cache_key and recorded_events and new_sdk_session_id)
+            if new_sdk_session_id and (
+                new_sdk_session_id != public_session.sdk_session_id
+                or shared != public_session.sdk_session_shared
+            ):
                 public_session.sdk_session_id = new_sdk_session_id
+                public_session.sdk_session_shared = shared
                 await db_session.commit()
 
-            # メッセージカウントをインクリメント
-            await public_service.increment_message_count(session_id)
+            message_counted = False
 
-            # 完了通知
-            remaining = None
-            if public_session.public_access.max_messages_per_session:
-                remaining = public_session.public_access.max_messages_per_session - (public_session.message_count + 1)
+            if shared:
+                get_public_result_cache().set(
+                    cache_key,
+                    CachedResult(
+                        events=recorded_events,
+                        full_response=full_response,
+                        usage=usage_info,
+                        sdk_session_id=new_sdk_session_id,
+                    ),
+                    cache_ttl,
+                )
 
             await public_connection_manager.send_message(session_id, {
                 "type": "result",
@@ -312,21 +682,72 @@ async def _handle_public_chat(
             "code": "chat_error",
         })
     finally:
+        if message_counted:
+            # 応答できなかったメッセージは上限に数えない
+            try:
+                async with get_session_context() as db_session:
+                    await PublicAccessService(db_session).decrement_message_count(
+                        session_id, public_access_id=public_access_id
+                    )
+            except Exception as e:
+                logger.warning("Failed to refund public message", session_id=session_id, error=str(e))
         public_connection_manager.set_processing(session_id, False)
 
 
+async def _notify_queue_position(session_id: str, position: int) -> None:
+    """待機順を通知"""
+    await public_connection_manager.send_message(session_id, {
+        "type": "queued",
+        "position": position,
+        "timestamp": time.time(),
+    })
+
+
+def _result_cache_ttl(command: Optional[ProjectCommandModel]) -> int:
+    """コマンドの結果キャッシュ有効期間（秒、0 は無効）"""
+    if command is None or command.public_setting is None:
+        return 0
+    return command.public_setting.result_cache_ttl_seconds or 0
+
+
+async def _replay_cached_result(session_id: str, cached: CachedResult) -> None:
+    """
+    キャッシュ済みの結果をストリームとして再生
+
+    Args:
+        session_id: セッションID
+        cached: キャッシュ済みの結果
+    """
+    for event in cached.events:
+        if session_id not in public_connection_manager.active_connections:
+            break
+        await public_connection_manager.send_message(session_id, {**event, "timestamp": time.time()})
+        # 1イベントずつクライアントに届くよう制御を返す
+        await asyncio.sleep(0)
+
+
 async def _stream_public_response(
     session_id: str,
     options: ClaudeAgentOptions,
     content: str,
+    access_id: Optional[str] = None,
+    recorder: Optional[list] = None,
+    config_version: int = 0,
 ) -> tuple[str, dict, Optional[str]]:
     """
     公開用ストリーミングレスポンス処理（シンプル版）
 
+    SDKクライアントはセッション単位で貸し出され、次のメッセージでも再利用されます。
+
     Args:
         session_id: セッションID
-        options: Claude Agent SDK オプション
+        options: Claude Agent SDK オプション（クライアント新規作成時のみ使用）
         content: ユーザーメッセージ
+        access_id: 公開アクセスID（トークンごとのクライアント数上限用）
+        recorder: 送信したイベントの記録先（結果キャッシュ用、正常に完了しなかった場合は空にする）
+            記録する場合、SDKセッションはキャッシュから応答したセッションと共有されるため
+            クライアントを再利用せず、次のメッセージは分岐して再開します。
+        config_version: プロジェクト設定のバージョン（保持中クライアントの再利用判定）
 
     Returns:
         tuple[str, dict, Optional[str]]: (応答テキスト, 使用量情報, SDKセッションID)
@@ -339,34 +760,43 @@ async def _stream_public_response(
         "duration_ms": 0,
     }
     sdk_session_id: Optional[str] = None
+    completed = False
     start_time = time.time()
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
+        async with public_connection_manager.lease_sdk_client(
+            session_id, access_id, options, config_version
+        ) as lease:
+            client = lease.client
+            if recorder is not None:
+                # このSDKセッションに後続のターンを追記しない
+                lease.reusable = False
             await client.query(content)
 
             async for sdk_message in client.receive_response():
                 # 接続確認
                 if session_id not in public_connection_manager.active_connections:
                     logger.warning("Connection lost during streaming", session_id=session_id)
+                    # 未受信のメッセージが残るため再利用しない
+                    lease.reusable = False
                     break
 
                 if isinstance(sdk_message, AssistantMessage):
                     for block in sdk_message.content:
                         if isinstance(block, TextBlock):
                             full_response += block.text
-                            await public_connection_manager.send_message(session_id, {
-                                "type": "text",
-                                "content": block.text,
-                                "timestamp": time.time(),
-                            })
+                            event = {"type": "text", "content": block.text}
                         elif isinstance(block, ToolUseBlock):
                             # 公開版ではツール使用は通知のみ
-                            await public_connection_manager.send_message(session_id, {
-                                "type": "tool_use",
-                                "tool": block.name,
-                                "timestamp": time.time(),
-                            })
+                            event = {"type": "tool_use", "tool": block.name}
+                        else:
+                            continue
+                        if recorder is not None:
+                            recorder.append(event)
+                        await public_connection_manager.send_message(session_id, {
+                            **event,
+                            "timestamp": time.time(),
+                        })
 
                 elif isinstance(sdk_message, ResultMessage):
                     # 使用量情報（usageは辞書型）
@@ -380,11 +810,16 @@ async def _stream_public_response(
                         "cache_read_input_tokens": usage_dict.get("cache_read_input_tokens", 0),
                     }
                     sdk_session_id = getattr(sdk_message, "session_id", None)
+                    completed = not getattr(sdk_message, "is_error", False)
 
     except Exception as e:
         logger.error("Error during public streaming", session_id=session_id, error=str(e), exc_info=True)
         raise
 
+    # 途中で中断した・エラーで終わった応答は記録しない
+    if recorder is not None and not completed:
+        recorder.clear()
+
     # 実際の処理時間を計算
     if usage_info["duration_ms"] == 0:
         usage_info["duration_ms"] = int((time.time() - start_time) * 1000)
@@ -33,6 +33,33 @@ class Settings(BaseSettings):
     mysql_password: str = Field(default="claude_password", description="MySQL password")
     mysql_database: str = Field(default="claude_code", description="MySQL database name")
 
+    # Read Replica Configuration（未設定の場合はプライマリのみ使用）
+    mysql_read_host: Optional[str] = Field(default=None, description="MySQL read replica host")
+    mysql_read_port: Optional[int] = Field(default=None, description="MySQL read replica port")
+
+    # Schema Migration Configuration
+    db_auto_migrate: bool = Field(
+        default=False, description="Apply pending SQL migrations at startup"
+    )
+    migrations_path: Optional[str] = Field(
+        default=None, description="Migration directory (defaults to bundled migrations/)"
+    )
+
+    # Connection Pool Configuration
+    db_pool_size: int = Field(default=10, description="Primary connection pool size")
+    db_max_overflow: int = Field(default=20, description="Primary connection pool overflow")
+    db_read_pool_size: int = Field(default=10, description="Read replica connection pool size")
+    db_read_max_overflow: int = Field(default=20, description="Read replica connection pool overflow")
+    replica_max_lag_seconds: float = Field(
+        default=5.0, description="Fall back to primary when replica lag exceeds this"
+    )
+    replica_lag_check_interval: float = Field(
+        default=5.0, description="Replica lag check interval in seconds"
+    )
+    read_your_writes_window: float = Field(
+        default=10.0, description="Route reads to primary for this many seconds after a write"
+    )
+
     @field_validator("mysql_password", mode="before")
     @classmethod
     def mysql_password_empty_str_to_default(cls, v: Optional[str]) -> str:
@@ -52,6 +79,23 @@ class Settings(BaseSettings):
     )
     session_timeout: int = Field(default=3600, description="Session timeout in seconds")
 
+    # Message Compression Configuration
+    message_compression_enabled: bool = Field(
+        default=True, description="Compress large message bodies stored in the database"
+    )
+    message_compression_threshold: int = Field(
+        default=16384, description="Minimum message size in bytes to compress"
+    )
+
+    # Session Archive Configuration
+    archive_enabled: bool = Field(default=True, description="Enable cold-storage archival of inactive sessions")
+    archive_path: str = Field(default="/app/archive", description="Archive segment directory")
+    archive_inactive_days: int = Field(
+        default=30, description="Archive sessions inactive for this many days"
+    )
+    archive_batch_size: int = Field(default=100, description="Maximum sessions archived per run")
+    archive_interval_minutes: int = Field(default=60, description="Archive job interval in minutes")
+
     # Security Configuration
     secret_key: str = Field(
         default="changeme-insecure-secret-key-for-development-only",
@@ -60,6 +104,10 @@ class Settings(BaseSettings):
     allowed_origins: str = Field(
         default="http://localhost:3000", description="CORS allowed origins (comma-separated)"
     )
+    trusted_proxies: str = Field(
+        default="",
+        description="Reverse proxy IPs/CIDRs allowed to set X-Forwarded-For / X-Real-IP (comma-separated)",
+    )
     sandbox_mode: str = Field(default="enabled", description="Sandbox mode: enabled/disabled")
     permission_mode: str = Field(
         default="ask", description="Permission mode: ask/auto/disabled"
@@ -74,16 +122,155 @@ class Settings(BaseSettings):
     # Frontend URL (for public access links)
     FRONTEND_URL: str = Field(default="http://localhost:3000", description="Frontend URL")
 
+    # Public Chat SDK Clients
+    public_sdk_client_idle_seconds: int = Field(
+        default=300, description="Close a public session's SDK client after this many idle seconds"
+    )
+    public_sdk_clients_per_token: int = Field(
+        default=10, description="Maximum live SDK clients per public access token"
+    )
+    public_chat_concurrency_per_token: int = Field(
+        default=3,
+        description="Concurrent public agent runs per public access token (per worker unless REDIS_URL is set)",
+    )
+    public_chat_queue_max_waiting: int = Field(
+        default=50,
+        description="Messages that may wait for a run slot per public access token (per worker unless REDIS_URL is set)",
+    )
+
+    # Public Session Workspaces
+    public_workspace_isolation: str = Field(
+        default="none",
+        description="Per-session copy-on-write workspace for public chats (none, auto, overlayfs, reflink, copy)",
+    )
+    public_workspace_overlay_path: str = Field(
+        default="/app/public-workspaces", description="Directory holding per-session public workspaces"
+    )
+    public_session_ttl_hours: int = Field(
+        default=24, description="Public sessions idle for this many hours are expired"
+    )
+
+    # Maintenance
+    maintenance_enabled: bool = Field(default=True, description="Run periodic maintenance sweeps")
+    maintenance_interval_minutes: int = Field(default=30, description="Maintenance sweep interval in minutes")
+    maintenance_batch_size: int = Field(
+        default=500, description="Rows updated/deleted per maintenance batch (one transaction each)"
+    )
+    maintenance_max_batches: int = Field(
+        default=20, description="Maximum batches per maintenance task per run (the rest waits for the next run)"
+    )
+    maintenance_batch_pause_ms: int = Field(
+        default=200, description="Pause between maintenance batches in milliseconds"
+    )
+    maintenance_stale_processing_minutes: int = Field(
+        default=30, description="Reset session processing flags older than this many minutes"
+    )
+    maintenance_public_session_retention_days: int = Field(
+        default=0, description="Delete public sessions idle for this many days (0 = keep them)"
+    )
+    maintenance_orphan_grace_hours: int = Field(
+        default=24, description="Only remove orphaned directories untouched for this many hours"
+    )
+    maintenance_remove_orphaned_project_workspaces: bool = Field(
+        default=False, description="Remove workspace directories of deleted projects"
+    )
+    cron_log_retention_days: int = Field(default=30, description="Delete cron logs older than this many days")
+    sdk_state_path: str = Field(
+        default="~/.claude/projects", description="Directory holding SDK session state per working directory"
+    )
+
+    # Public Access Token Cache
+    public_access_cache_ttl_seconds: int = Field(
+        default=30, description="TTL of a cached public access token resolution (0 = disabled)"
+    )
+    public_access_negative_cache_ttl_seconds: int = Field(
+        default=10, description="TTL of a cached unknown public access token (0 = disabled)"
+    )
+
+    # Public Command Result Cache
+    public_result_cache_max_entries: int = Field(
+        default=1000, description="Maximum cached public command results (LRU)"
+    )
+    public_result_cache_max_response_chars: int = Field(
+        default=100000, description="Responses longer than this are not cached"
+    )
+
     # Claude Agent Configuration
     default_model: str = Field(default="claude-opus-4-5", description="Default Claude model")
     max_turns: int = Field(default=20, description="Maximum conversation turns")
     max_tokens: int = Field(default=4096, description="Maximum output tokens")
 
+    # Cost Budget Cache
+    budget_cache_enabled: bool = Field(default=True, description="Cache project cost budgets in memory")
+    budget_cache_max_age_seconds: int = Field(
+        default=300, description="Reload a cached budget from the database after this many seconds"
+    )
+    budget_reconcile_interval_minutes: int = Field(
+        default=1, description="Budget cache reconciliation interval in minutes"
+    )
+
+    # Per-turn Limits (0 = unlimited)
+    turn_max_tokens: int = Field(
+        default=0, description="Interrupt a turn once its input+output tokens reach this value"
+    )
+    turn_max_cost_usd: float = Field(
+        default=0.0, description="Interrupt a turn once its estimated cost reaches this value"
+    )
+
+    # Project Config Cache
+    project_config_cache_ttl_seconds: int = Field(
+        default=300, description="Maximum age of a cached project configuration bundle"
+    )
+
+    # Spend Reservation
+    spend_reservation_backend: str = Field(
+        default="memory", description="Spend reservation backend (memory, redis)"
+    )
+    redis_url: Optional[str] = Field(default=None, description="Redis URL for shared state across workers")
+    spend_reservation_default_usd: float = Field(
+        default=0.25, description="Estimated turn cost reserved before any history exists"
+    )
+    spend_reservation_min_usd: float = Field(
+        default=0.05, description="Minimum estimated turn cost to reserve"
+    )
+    spend_reservation_ttl_seconds: int = Field(
+        default=1800, description="Reservation expiry for turns that never settle (crashed workers)"
+    )
+
+    # Usage Ledger
+    usage_ledger_flush_interval_seconds: float = Field(
+        default=2.0, description="Usage ledger flush interval in seconds"
+    )
+    usage_ledger_batch_size: int = Field(default=200, description="Usage ledger rows per INSERT")
+    usage_ledger_max_buffer: int = Field(
+        default=10000, description="Maximum buffered usage ledger entries"
+    )
+
+    # Usage Analytics
+    usage_analytics_cache_ttl_seconds: int = Field(
+        default=30, description="Usage analytics result cache TTL in seconds"
+    )
+
     # Rate Limiting
     rate_limit_enabled: bool = Field(default=True, description="Enable rate limiting")
     rate_limit_per_minute: int = Field(
         default=60, description="Maximum requests per minute"
     )
+    rate_limit_backend: str = Field(
+        default="memory", description="Rate limit backend (memory, redis)"
+    )
+    rate_limit_auth_per_minute: int = Field(
+        default=10, description="Maximum auth requests per minute per client IP (0 = unlimited)"
+    )
+    rate_limit_public_per_minute: int = Field(
+        default=30, description="Maximum public API requests per minute per token and client IP (0 = unlimited)"
+    )
+    rate_limit_chat_messages_per_minute: int = Field(
+        default=30, description="Maximum chat WebSocket messages per minute per session (0 = unlimited)"
+    )
+    rate_limit_public_messages_per_minute: int = Field(
+        default=10, description="Maximum public chat WebSocket messages per minute per token and client IP (0 = unlimited)"
+    )
 
     @field_validator("allowed_origins")
     @classmethod
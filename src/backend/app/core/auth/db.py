@@ -6,7 +6,6 @@ StringベースのIDを使用するカスタムUserDatabase実装
 """
 
 from typing import AsyncGenerator, Optional
-import uuid
 
 from fastapi import Depends
 from fastapi_users.db import BaseUserDatabase
@@ -15,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.database import UserModel
 from app.utils.database import get_session
+from app.utils.helpers import generate_id
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -52,9 +52,9 @@ class SQLAlchemyUserDatabaseString(BaseUserDatabase[UserModel, str]):
 
     async def create(self, create_dict: dict) -> UserModel:
         """新規ユーザーを作成"""
-        # IDを生成（UUIDの文字列形式）
+        # IDを生成（UUID v7の文字列形式）
         if "id" not in create_dict or create_dict["id"] is None:
-            create_dict["id"] = str(uuid.uuid4())
+            create_dict["id"] = generate_id()
 
         # Boolean値をIntegerに変換（MySQL互換性）
         for bool_field in ["is_active", "is_superuser", "is_verified"]:
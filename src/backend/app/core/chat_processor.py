@@ -5,7 +5,7 @@ Chat Message Processor
 設定読み込み、SDKオプション構築、システムプロンプト生成を分離
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -17,13 +17,14 @@ from claude_agent_sdk.types import McpStdioServerConfig, AgentDefinition
 from app.config import settings
 from app.core.config_loader import (
     ProjectConfig,
-    load_project_config,
+    load_project_config_async,
     generate_enhanced_system_prompt,
     get_enabled_tools,
 )
-from app.core.project_manager import ProjectManager
 from app.models.database import ProjectModel
+from app.models.projects import Project
 from app.schemas.project_config import ProjectConfigJSON
+from app.services.project_config_cache import get_project_config_cache
 from app.services.project_config_service import ProjectConfigService
 from app.utils.logger import get_logger
 
@@ -44,6 +45,7 @@ class ConfigBundle:
     workspace_path: str = ""
     mcp_servers_config: Dict[str, McpStdioServerConfig] = field(default_factory=dict)
     agents_config: Dict[str, AgentDefinition] = field(default_factory=dict)
+    system_prompt: Optional[str] = None
 
 
 class ChatMessageProcessor:
@@ -65,30 +67,48 @@ class ChatMessageProcessor:
         """
         self.session = session
         self.project_id = project_id
-        self._project_manager = ProjectManager(session)
         self._config_service = ProjectConfigService(session)
 
     async def load_config(self) -> Optional[ConfigBundle]:
         """
         プロジェクト設定を読み込む
 
-        DB設定を優先し、存在しない場合はファイルベースにフォールバック
+        DB設定を優先し、存在しない場合はファイルベースにフォールバック。
+        DB由来の部分（プロジェクト・DB設定・MCP/Agent構成・プロンプト）は
+        ProjectConfigCache にキャッシュし、設定変更のコミットで無効化されます。
 
         Returns:
             ConfigBundle: 設定バンドル（プロジェクトが見つからない場合はNone）
         """
-        # プロジェクト取得
-        project = await self._project_manager.get_project(self.project_id)
-        if not project:
+        cache = get_project_config_cache()
+        cached = cache.get(self.project_id)
+        if cached is not None:
+            if cached.use_db_config:
+                return cached
+            # ファイルベースの設定はワークスペースの変更を反映するため毎回読み込む
+            return await self._apply_file_config(replace(cached))
+
+        version = cache.version(self.project_id)
+        config = await self._build_config()
+        if config is not None:
+            cache.set(self.project_id, version, config)
+            if not config.use_db_config:
+                return await self._apply_file_config(replace(config))
+        return config
+
+    async def _build_config(self) -> Optional[ConfigBundle]:
+        """DBからプロジェクト設定を読み込み、ConfigBundle を構築"""
+        # プロジェクトとDB設定を1クエリで取得
+        loaded = await self._config_service.get_project_with_config_json(self.project_id)
+        if not loaded:
             logger.warning("Project not found", project_id=self.project_id)
             return None
+        project_model, db_config = loaded
+        project = Project.model_validate(project_model)
 
         # ワークスペースパス
         workspace_path = str(Path(settings.workspace_base) / self.project_id)
 
-        # DB設定を読み込み
-        db_config = await self._config_service.get_project_config_json(self.project_id)
-
         # DB設定が存在するか判定
         use_db_config = bool(
             db_config.mcp_servers
@@ -105,10 +125,11 @@ class ChatMessageProcessor:
             workspace_path=workspace_path,
         )
 
-        # MCP Servers / Agents を構築
+        # MCP Servers / Agents / システムプロンプトを構築
         if use_db_config:
             config.mcp_servers_config = self._build_mcp_servers_from_db(db_config)
             config.agents_config = self._build_agents_from_db(db_config)
+            config.system_prompt = self._generate_db_system_prompt(workspace_path, db_config)
             logger.info(
                 "Project config loaded from DB",
                 project_id=self.project_id,
@@ -117,23 +138,29 @@ class ChatMessageProcessor:
                 skills_count=len(db_config.skills),
                 commands_count=len(db_config.commands),
             )
-        else:
-            # ファイルベースのフォールバック
-            file_config = load_project_config(workspace_path)
-            config.file_config = file_config
-            config.mcp_servers_config = self._build_mcp_servers_from_file(file_config)
-            config.agents_config = self._build_agents_from_file(file_config)
-            logger.info(
-                "Project config loaded from files (fallback)",
-                project_id=self.project_id,
-                mcp_servers=list(file_config.mcp_servers.keys()),
-                agents=list(file_config.agents.keys()),
-                skills=list(file_config.skills.keys()),
-                commands=list(file_config.commands.keys()),
-            )
 
         return config
 
+    async def _apply_file_config(self, config: ConfigBundle) -> ConfigBundle:
+        """ファイルベースの設定を読み込んで ConfigBundle に反映（フォールバック）
+
+        変更されたファイルのみ再解析するインデックスをスレッドで更新します。
+        """
+        file_config = await load_project_config_async(config.workspace_path)
+        config.file_config = file_config
+        config.mcp_servers_config = self._build_mcp_servers_from_file(file_config)
+        config.agents_config = self._build_agents_from_file(file_config)
+        config.system_prompt = generate_enhanced_system_prompt(config.workspace_path, file_config)
+        logger.info(
+            "Project config loaded from files (fallback)",
+            project_id=self.project_id,
+            mcp_servers=list(file_config.mcp_servers.keys()),
+            agents=list(file_config.agents.keys()),
+            skills=list(file_config.skills.keys()),
+            commands=list(file_config.commands.keys()),
+        )
+        return config
+
     def _build_mcp_servers_from_db(
         self, db_config: ProjectConfigJSON
     ) -> Dict[str, McpStdioServerConfig]:
@@ -200,6 +227,8 @@ class ChatMessageProcessor:
         Returns:
             str: システムプロンプト
         """
+        if config.system_prompt:
+            return config.system_prompt
         if config.use_db_config:
             return self._generate_db_system_prompt(
                 config.workspace_path, config.db_config
@@ -356,6 +385,7 @@ You have access to the following default tools:
         system_prompt: Optional[str] = None,
         resume_session_id: Optional[str] = None,
         model: Optional[str] = None,
+        fork_session: bool = False,
     ) -> ClaudeAgentOptions:
         """
         Claude Agent SDK オプションを構築する
@@ -365,6 +395,7 @@ You have access to the following default tools:
             system_prompt: カスタムシステムプロンプト（Noneの場合は自動生成）
             resume_session_id: 再開するSDKセッションID（Noneの場合は新規セッション）
             model: 使用するClaudeモデル（Noneの場合はデフォルト）
+            fork_session: 再開時に新しいSDKセッションIDへ分岐するか（元のセッションに追記しない）
 
         Returns:
             ClaudeAgentOptions: SDKオプション
@@ -385,12 +416,13 @@ You have access to the following default tools:
             allowed_tools=tools,
             permission_mode="acceptEdits",
             cwd=Path(config.workspace_path),
-            mcp_servers=config.mcp_servers_config if config.mcp_servers_config else {},
-            agents=config.agents_config if config.agents_config else None,
+            mcp_servers=dict(config.mcp_servers_config) if config.mcp_servers_config else {},
+            agents=dict(config.agents_config) if config.agents_config else None,
             setting_sources=["project"],  # Skills/Commands をファイルシステムから読み込み
             env={"ANTHROPIC_API_KEY": config.project.api_key},  # プロジェクト固有のAPIキー
             resume=resume_session_id,  # セッション再開用（Noneの場合は新規セッション）
             model=model,  # セッションで選択されたモデル
+            fork_session=fork_session,
         )
 
         # ログ出力
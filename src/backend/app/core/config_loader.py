@@ -2,12 +2,19 @@
 Configuration Loader for MCP, Agents, Skills, and Commands
 
 Reads project-specific configuration files and provides them to the chat handler.
+Parsed files are kept in a per-workspace index keyed by mtime and size, so
+repeated loads only stat the configuration files and re-parse the ones that changed.
 """
+import asyncio
 import json
+import os
 import re
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
 
 from app.utils.logger import get_logger
 
@@ -73,12 +80,26 @@ def load_mcp_config(workspace_path: str) -> Dict[str, MCPServerConfig]:
     Returns:
         Dictionary of MCP server configurations
     """
-    mcp_servers: Dict[str, MCPServerConfig] = {}
     mcp_path = Path(workspace_path) / ".mcp.json"
 
     if not mcp_path.exists():
         logger.debug("No .mcp.json found", path=str(mcp_path))
-        return mcp_servers
+        return {}
+
+    return parse_mcp_json(mcp_path)
+
+
+def parse_mcp_json(mcp_path: Path) -> Dict[str, MCPServerConfig]:
+    """
+    Parse MCP server configurations from a .mcp.json file
+
+    Args:
+        mcp_path: Path to .mcp.json
+
+    Returns:
+        Dictionary of MCP server configurations
+    """
+    mcp_servers: Dict[str, MCPServerConfig] = {}
 
     try:
         with open(mcp_path, "r", encoding="utf-8") as f:
@@ -250,7 +271,7 @@ def load_agents_config(workspace_path: str) -> Dict[str, AgentConfig]:
     # Load from .agents/ directory (Markdown files)
     agents_dir = workspace / ".agents"
     if agents_dir.exists() and agents_dir.is_dir():
-        for md_file in agents_dir.glob("*.md"):
+        for md_file in sorted(agents_dir.glob("*.md")):
             agent = parse_agent_md(md_file)
             if agent:
                 agents[agent.name] = agent
@@ -259,7 +280,7 @@ def load_agents_config(workspace_path: str) -> Dict[str, AgentConfig]:
     # Load from custom_agents/ directory (Python files)
     custom_agents_dir = workspace / "custom_agents"
     if custom_agents_dir.exists() and custom_agents_dir.is_dir():
-        for py_file in custom_agents_dir.glob("*_agent.py"):
+        for py_file in sorted(custom_agents_dir.glob("*_agent.py")):
             agent = parse_agent_py(py_file)
             if agent:
                 agents[agent.name] = agent
@@ -268,22 +289,58 @@ def load_agents_config(workspace_path: str) -> Dict[str, AgentConfig]:
     # Also check .agents.json for enabled/disabled status
     agents_json_path = workspace / ".agents.json"
     if agents_json_path.exists():
-        try:
-            with open(agents_json_path, "r", encoding="utf-8") as f:
-                config_data = json.load(f)
+        agents = _apply_agent_states(agents, parse_agents_json(agents_json_path))
 
-            agents_config = config_data.get("agents", {})
-            for name, config in agents_config.items():
-                if name in agents:
-                    agents[name].enabled = config.get("enabled", True)
+    logger.info("Loaded agents", count=len(agents), agents=list(agents.keys()))
+    return agents
 
-        except Exception as e:
-            logger.error("Error loading .agents.json", error=str(e))
 
-    logger.info("Loaded agents", count=len(agents), agents=list(agents.keys()))
+def parse_agents_json(agents_json_path: Path) -> Dict[str, bool]:
+    """
+    Parse enabled/disabled agent states from .agents.json
+
+    Args:
+        agents_json_path: Path to .agents.json
+
+    Returns:
+        Dictionary of agent name to enabled flag
+    """
+    try:
+        with open(agents_json_path, "r", encoding="utf-8") as f:
+            config_data = json.load(f)
+
+        agents_config = config_data.get("agents", {})
+        return {name: config.get("enabled", True) for name, config in agents_config.items()}
+
+    except Exception as e:
+        logger.error("Error loading .agents.json", error=str(e))
+        return {}
+
+
+def _apply_agent_states(
+    agents: Dict[str, AgentConfig], states: Dict[str, bool]
+) -> Dict[str, AgentConfig]:
+    """Apply .agents.json states without mutating (possibly cached) agent configs"""
+    for name, enabled in states.items():
+        if name in agents:
+            agents[name] = replace(agents[name], enabled=enabled)
     return agents
 
 
+def _parse_md_summary(content: str) -> Tuple[str, str]:
+    """Extract the description and category from a skill/command Markdown file"""
+    # Extract description (first paragraph after main heading)
+    desc_match = re.search(r'^#\s+[^\n]+\n\n([^#]+?)(?=\n\n##|\n##|\Z)', content, re.MULTILINE)
+    description = desc_match.group(1).strip() if desc_match else ""
+    if description:
+        description = description.split('\n\n')[0].strip()
+
+    # Extract category (single line after ## Category)
+    cat_match = re.search(r'^##\s+Category\s*\n+([^\n#]+)', content, re.MULTILINE)
+    category = cat_match.group(1).strip().lower() if cat_match else "custom"
+    return description, category
+
+
 def load_skills_config(workspace_path: str) -> Dict[str, SkillConfig]:
     """
     Load skill configurations from .skills.json and custom_skills/
@@ -300,58 +357,71 @@ def load_skills_config(workspace_path: str) -> Dict[str, SkillConfig]:
     # Load from .skills.json
     skills_json_path = workspace / ".skills.json"
     if skills_json_path.exists():
-        try:
-            with open(skills_json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            skills_data = data.get("skills", {})
-            for name, config in skills_data.items():
-                skills[name] = SkillConfig(
-                    name=name,
-                    description=config.get("description", ""),
-                    category=config.get("category", "custom"),
-                    enabled=config.get("enabled", True),
-                )
-
-        except Exception as e:
-            logger.error("Error loading .skills.json", error=str(e))
+        skills.update(parse_skills_json(skills_json_path))
 
     # Load from custom_skills/ directory (Markdown files)
     custom_skills_dir = workspace / "custom_skills"
     if custom_skills_dir.exists() and custom_skills_dir.is_dir():
-        for md_file in custom_skills_dir.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
+        for md_file in sorted(custom_skills_dir.glob("*.md")):
+            skill = parse_skill_md(md_file)
+            if skill:
+                skills[skill.name] = skill
 
-                # Extract name from first heading
-                name_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-                name = name_match.group(1).strip() if name_match else md_file.stem
+    logger.info("Loaded skills", count=len(skills), skills=list(skills.keys()))
+    return skills
 
-                # Extract description (first paragraph after main heading)
-                desc_match = re.search(r'^#\s+[^\n]+\n\n([^#]+?)(?=\n\n##|\n##|\Z)', content, re.MULTILINE)
-                description = desc_match.group(1).strip() if desc_match else ""
-                if description:
-                    description = description.split('\n\n')[0].strip()
 
-                # Extract category (single line after ## Category)
-                cat_match = re.search(r'^##\s+Category\s*\n+([^\n#]+)', content, re.MULTILINE)
-                category = cat_match.group(1).strip().lower() if cat_match else "custom"
+def parse_skills_json(skills_json_path: Path) -> Dict[str, SkillConfig]:
+    """
+    Parse skill configurations from .skills.json
+
+    Args:
+        skills_json_path: Path to .skills.json
+
+    Returns:
+        Dictionary of skill configurations
+    """
+    skills: Dict[str, SkillConfig] = {}
+    try:
+        with open(skills_json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
-                skill_name = f"sc:{md_file.stem}"
-                skills[skill_name] = SkillConfig(
-                    name=skill_name,
-                    description=description,
-                    category=category,
-                    enabled=True,
-                )
+        skills_data = data.get("skills", {})
+        for name, config in skills_data.items():
+            skills[name] = SkillConfig(
+                name=name,
+                description=config.get("description", ""),
+                category=config.get("category", "custom"),
+                enabled=config.get("enabled", True),
+            )
 
-            except Exception as e:
-                logger.error("Error parsing skill MD file", file=str(md_file), error=str(e))
+    except Exception as e:
+        logger.error("Error loading .skills.json", error=str(e))
 
-    logger.info("Loaded skills", count=len(skills), skills=list(skills.keys()))
     return skills
 
 
+def parse_skill_md(md_file: Path) -> Optional[SkillConfig]:
+    """
+    Parse a skill definition from a custom_skills/ Markdown file
+
+    The skill is registered as ``sc:<file stem>``.
+    """
+    try:
+        description, category = _parse_md_summary(md_file.read_text(encoding="utf-8"))
+        skill_name = f"sc:{md_file.stem}"
+        return SkillConfig(
+            name=skill_name,
+            description=description,
+            category=category,
+            enabled=True,
+        )
+
+    except Exception as e:
+        logger.error("Error parsing skill MD file", file=str(md_file), error=str(e))
+        return None
+
+
 def load_commands_config(workspace_path: str) -> Dict[str, CommandConfig]:
     """
     Load command configurations from .commands.json and custom_commands/
@@ -368,73 +438,279 @@ def load_commands_config(workspace_path: str) -> Dict[str, CommandConfig]:
     # Load from .commands.json
     commands_json_path = workspace / ".commands.json"
     if commands_json_path.exists():
-        try:
-            with open(commands_json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            commands_data = data.get("commands", {})
-            for name, config in commands_data.items():
-                commands[name] = CommandConfig(
-                    name=name,
-                    description=config.get("description", ""),
-                    category=config.get("category", "custom"),
-                    enabled=config.get("enabled", True),
-                )
-
-        except Exception as e:
-            logger.error("Error loading .commands.json", error=str(e))
+        commands.update(parse_commands_json(commands_json_path))
 
     # Load from custom_commands/ directory (Markdown files)
     custom_commands_dir = workspace / "custom_commands"
     if custom_commands_dir.exists() and custom_commands_dir.is_dir():
-        for md_file in custom_commands_dir.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
+        for md_file in sorted(custom_commands_dir.glob("*.md")):
+            command = parse_command_md(md_file)
+            if command:
+                commands[command.name] = command
 
-                # Extract name from first heading
-                name_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-                name = name_match.group(1).strip() if name_match else md_file.stem
+    logger.info("Loaded commands", count=len(commands), commands=list(commands.keys()))
+    return commands
 
-                # Extract description (first paragraph after main heading)
-                desc_match = re.search(r'^#\s+[^\n]+\n\n([^#]+?)(?=\n\n##|\n##|\Z)', content, re.MULTILINE)
-                description = desc_match.group(1).strip() if desc_match else ""
-                if description:
-                    description = description.split('\n\n')[0].strip()
 
-                # Extract category (single line after ## Category)
-                cat_match = re.search(r'^##\s+Category\s*\n+([^\n#]+)', content, re.MULTILINE)
-                category = cat_match.group(1).strip().lower() if cat_match else "custom"
+def parse_commands_json(commands_json_path: Path) -> Dict[str, CommandConfig]:
+    """
+    Parse command configurations from .commands.json
 
-                commands[md_file.stem] = CommandConfig(
-                    name=md_file.stem,
-                    description=description,
-                    category=category,
-                    enabled=True,
-                )
+    Args:
+        commands_json_path: Path to .commands.json
 
-            except Exception as e:
-                logger.error("Error parsing command MD file", file=str(md_file), error=str(e))
+    Returns:
+        Dictionary of command configurations
+    """
+    commands: Dict[str, CommandConfig] = {}
+    try:
+        with open(commands_json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        commands_data = data.get("commands", {})
+        for name, config in commands_data.items():
+            commands[name] = CommandConfig(
+                name=name,
+                description=config.get("description", ""),
+                category=config.get("category", "custom"),
+                enabled=config.get("enabled", True),
+            )
+
+    except Exception as e:
+        logger.error("Error loading .commands.json", error=str(e))
 
-    logger.info("Loaded commands", count=len(commands), commands=list(commands.keys()))
     return commands
 
 
+def parse_command_md(md_file: Path) -> Optional[CommandConfig]:
+    """
+    Parse a command definition from a custom_commands/ Markdown file
+
+    The command is registered under its file stem.
+    """
+    try:
+        description, category = _parse_md_summary(md_file.read_text(encoding="utf-8"))
+        return CommandConfig(
+            name=md_file.stem,
+            description=description,
+            category=category,
+            enabled=True,
+        )
+
+    except Exception as e:
+        logger.error("Error parsing command MD file", file=str(md_file), error=str(e))
+        return None
+
+
+# Single configuration files: source kind -> (relative path, parser)
+_CONFIG_FILES: Dict[str, Tuple[str, Callable[[Path], Any]]] = {
+    "mcp": (".mcp.json", parse_mcp_json),
+    "agents_json": (".agents.json", parse_agents_json),
+    "skills_json": (".skills.json", parse_skills_json),
+    "commands_json": (".commands.json", parse_commands_json),
+}
+
+# Configuration directories: source kind -> (relative dir, file pattern, parser)
+_CONFIG_DIRS: Dict[str, Tuple[str, str, Callable[[Path], Any]]] = {
+    "agent_md": (".agents", "*.md", parse_agent_md),
+    "agent_py": ("custom_agents", "*_agent.py", parse_agent_py),
+    "skill_md": ("custom_skills", "*.md", parse_skill_md),
+    "command_md": ("custom_commands", "*.md", parse_command_md),
+}
+
+# Maximum number of workspaces kept in the index cache
+_MAX_INDEXED_WORKSPACES = 256
+
+FileStamp = Tuple[int, int]
+
+
+def _stat_file(path: Path) -> Optional[FileStamp]:
+    """Return (mtime_ns, size) for a regular file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ProjectConfigIndex:
+    """
+    Per-workspace index of parsed configuration files
+
+    Each refresh stats the configuration files (one scandir per directory)
+    and re-parses only files whose mtime or size changed. When nothing
+    changed, the previously assembled ProjectConfig is returned as is.
+    """
+
+    def __init__(self, workspace_path: str):
+        self.workspace = Path(workspace_path)
+        self.parse_count = 0
+        self._entries: Dict[Path, Tuple[FileStamp, Any]] = {}
+        self._signature: Optional[tuple] = None
+        self._config: Optional[ProjectConfig] = None
+        self._lock = threading.Lock()
+
+    def _scan(self) -> Dict[str, List[Tuple[Path, FileStamp]]]:
+        """Collect the current configuration files and their stamps"""
+        found: Dict[str, List[Tuple[Path, FileStamp]]] = {}
+        for kind, (name, _) in _CONFIG_FILES.items():
+            path = self.workspace / name
+            stamp = _stat_file(path)
+            found[kind] = [(path, stamp)] if stamp else []
+
+        for kind, (dirname, pattern, _) in _CONFIG_DIRS.items():
+            files: List[Tuple[Path, FileStamp]] = []
+            try:
+                with os.scandir(self.workspace / dirname) as entries:
+                    for entry in entries:
+                        if fnmatch(entry.name, pattern) and entry.is_file():
+                            stat = entry.stat()
+                            files.append((Path(entry.path), (stat.st_mtime_ns, stat.st_size)))
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+            found[kind] = sorted(files)
+        return found
+
+    def refresh(self) -> ProjectConfig:
+        """
+        Bring the index up to date and return the project configuration
+
+        Returns:
+            Complete project configuration
+        """
+        with self._lock:
+            found = self._scan()
+            signature = tuple(
+                (kind, str(path), stamp)
+                for kind, files in found.items()
+                for path, stamp in files
+            )
+            if self._config is not None and signature == self._signature:
+                return self._config
+
+            parsed: Dict[str, List[Any]] = {}
+            live = set()
+            reparsed = 0
+            for kind, files in found.items():
+                parser = _CONFIG_FILES[kind][1] if kind in _CONFIG_FILES else _CONFIG_DIRS[kind][2]
+                results = []
+                for path, stamp in files:
+                    live.add(path)
+                    entry = self._entries.get(path)
+                    if entry is None or entry[0] != stamp:
+                        entry = (stamp, parser(path))
+                        self._entries[path] = entry
+                        reparsed += 1
+                    results.append(entry[1])
+                parsed[kind] = results
+
+            for path in set(self._entries) - live:
+                del self._entries[path]
+
+            self.parse_count += reparsed
+            self._config = _assemble_project_config(parsed)
+            self._signature = signature
+            logger.info(
+                "Project config index refreshed",
+                workspace=str(self.workspace),
+                files=len(live),
+                reparsed=reparsed,
+            )
+            return self._config
+
+
+def _assemble_project_config(parsed: Dict[str, List[Any]]) -> ProjectConfig:
+    """Build a ProjectConfig from parsed files (same precedence as the load_* functions)"""
+    mcp_servers: Dict[str, MCPServerConfig] = {}
+    for servers in parsed["mcp"]:
+        mcp_servers.update(servers)
+
+    agents: Dict[str, AgentConfig] = {}
+    for agent in parsed["agent_md"] + parsed["agent_py"]:
+        if agent:
+            agents[agent.name] = agent
+    for states in parsed["agents_json"]:
+        agents = _apply_agent_states(agents, states)
+
+    skills: Dict[str, SkillConfig] = {}
+    for skills_json in parsed["skills_json"]:
+        skills.update(skills_json)
+    for skill in parsed["skill_md"]:
+        if skill:
+            skills[skill.name] = skill
+
+    commands: Dict[str, CommandConfig] = {}
+    for commands_json in parsed["commands_json"]:
+        commands.update(commands_json)
+    for command in parsed["command_md"]:
+        if command:
+            commands[command.name] = command
+
+    return ProjectConfig(
+        mcp_servers=mcp_servers,
+        agents=agents,
+        skills=skills,
+        commands=commands,
+    )
+
+
+_config_indexes: "OrderedDict[str, ProjectConfigIndex]" = OrderedDict()
+_config_indexes_lock = threading.Lock()
+
+
+def get_config_index(workspace_path: str) -> ProjectConfigIndex:
+    """
+    Get (or create) the configuration index for a workspace
+
+    Args:
+        workspace_path: Path to the project workspace
+
+    Returns:
+        Configuration index for the workspace
+    """
+    key = str(Path(workspace_path))
+    with _config_indexes_lock:
+        index = _config_indexes.get(key)
+        if index is None:
+            index = ProjectConfigIndex(key)
+            _config_indexes[key] = index
+            while len(_config_indexes) > _MAX_INDEXED_WORKSPACES:
+                _config_indexes.popitem(last=False)
+        else:
+            _config_indexes.move_to_end(key)
+        return index
+
+
 def load_project_config(workspace_path: str) -> ProjectConfig:
     """
     Load complete project configuration
 
+    Uses the workspace's configuration index, so only changed files are re-parsed.
+    The returned configuration is shared between callers and must not be mutated.
+
     Args:
         workspace_path: Path to the project workspace
 
     Returns:
         Complete project configuration
     """
-    return ProjectConfig(
-        mcp_servers=load_mcp_config(workspace_path),
-        agents=load_agents_config(workspace_path),
-        skills=load_skills_config(workspace_path),
-        commands=load_commands_config(workspace_path),
-    )
+    return get_config_index(workspace_path).refresh()
+
+
+async def load_project_config_async(workspace_path: str) -> ProjectConfig:
+    """
+    Load complete project configuration without blocking the event loop
+
+    The index refresh (stat calls and any re-parsing) runs in a thread executor.
+
+    Args:
+        workspace_path: Path to the project workspace
+
+    Returns:
+        Complete project configuration
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, load_project_config, workspace_path)
 
 
 def generate_enhanced_system_prompt(
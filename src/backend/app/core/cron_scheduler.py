@@ -13,12 +13,13 @@ from dataclasses import dataclass, field
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, JobExecutionEvent
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.logger import get_logger
-from app.utils.database import get_session_context
+from app.utils.database import get_read_session_context, get_session_context
 from app.models.database import CronLogModel
 from app.config import settings
 
@@ -196,6 +197,29 @@ class CronScheduler:
             )
             return False
 
+    def add_system_job(self, job_id: str, func: Any, interval_minutes: int) -> None:
+        """
+        Add an internal maintenance job running at a fixed interval
+
+        System jobs are not tied to a project and are not listed in
+        project schedules.
+
+        Args:
+            job_id: Unique job ID (prefixed with "system:")
+            func: Coroutine function to execute
+            interval_minutes: Interval between runs in minutes
+        """
+        self.scheduler.add_job(
+            func,
+            trigger=IntervalTrigger(minutes=interval_minutes),
+            id=f"system:{job_id}",
+            name=job_id,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+        logger.info("Added system job", job_id=job_id, interval_minutes=interval_minutes)
+
     async def _execute_command(self, schedule: CronScheduleConfig) -> None:
         """
         Execute a scheduled command
@@ -206,7 +230,7 @@ class CronScheduler:
         from pathlib import Path
         from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
         from app.core.config_loader import (
-            load_project_config,
+            load_project_config_async,
             generate_enhanced_system_prompt,
             get_enabled_tools,
         )
@@ -243,7 +267,7 @@ class CronScheduler:
                 project_api_key = project.api_key
 
             # Load project configuration
-            project_config = load_project_config(workspace_path)
+            project_config = await load_project_config_async(workspace_path)
             system_prompt = generate_enhanced_system_prompt(workspace_path, project_config)
             tools = get_enabled_tools(project_config)
 
@@ -413,7 +437,7 @@ class CronScheduler:
         logs: List[Dict[str, Any]] = []
 
         try:
-            async with get_session_context() as session:
+            async with get_read_session_context([project_id]) as session:
                 # Query logs for jobs matching the project_id prefix
                 stmt = (
                     select(CronLogModel)
@@ -487,7 +511,7 @@ class CronScheduler:
         logs: List[Dict[str, Any]] = []
 
         try:
-            async with get_session_context() as session:
+            async with get_read_session_context() as session:
                 stmt = (
                     select(CronLogModel)
                     .order_by(desc(CronLogModel.created_at))
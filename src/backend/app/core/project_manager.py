@@ -16,6 +16,8 @@ from app.config import settings
 from app.models.database import ProjectModel, SessionModel
 from app.models.errors import MaxProjectsExceededError, ProjectNotFoundError
 from app.models.projects import Project, ProjectStatus
+from app.services.project_config_cache import mark_project_config_changed
+from app.services.public_access_cache import mark_public_access_changed
 from app.utils.helpers import generate_id, jst_now
 from app.utils.logger import get_logger
 
@@ -221,6 +223,9 @@ class ProjectManager:
         stmt = delete(ProjectModel).where(ProjectModel.id == project_id)
         await self.session.execute(stmt)
         await self.session.flush()
+        # 一括DELETEはORMのフラッシュを経由しないため明示的に登録
+        mark_project_config_changed(self.session.sync_session, project_id)
+        mark_public_access_changed(self.session.sync_session, project_id)
 
         logger.info("Project deleted", project_id=project_id)
 
@@ -8,7 +8,7 @@ import json
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, delete, func, and_
+from sqlalchemy import select, delete, func, and_, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -17,6 +17,14 @@ from app.models.database import SessionModel, MessageModel
 from app.models.errors import MaxSessionsExceededError, ProjectNotFoundError, SessionNotFoundError
 from app.models.messages import ChatMessage, MessageRole
 from app.models.sessions import Session, SessionStatus
+from app.services.archive_service import SessionArchiveService
+from app.services.usage_service import UsageService
+from app.utils.compression import (
+    TEXT_COMPRESSION_MARKER,
+    compress_text,
+    decompress_text,
+    is_compressed_text,
+)
 from app.utils.helpers import generate_id, jst_now
 from app.utils.logger import get_logger
 
@@ -46,14 +54,20 @@ class SessionManager:
         self.session = session
         self.max_sessions_per_project = settings.max_sessions_per_project
         self.session_timeout = settings.session_timeout
+        self.archive = SessionArchiveService(session)
+        self.compression_enabled = settings.message_compression_enabled
+        self.compression_threshold = settings.message_compression_threshold
 
     def _model_to_pydantic(self, model: SessionModel) -> Session:
         """SQLAlchemyモデルをPydanticモデルに変換"""
         return Session.model_validate(model)
 
     def _message_model_to_pydantic(self, model: MessageModel) -> ChatMessage:
-        """MessageモデルをPydanticモデルに変換"""
-        return ChatMessage.model_validate(model)
+        """MessageモデルをPydanticモデルに変換（圧縮済み本文は復元）"""
+        message = ChatMessage.model_validate(model)
+        if is_compressed_text(message.content):
+            message.content = decompress_text(message.content)
+        return message
 
     async def create_session(
         self,
@@ -209,15 +223,25 @@ class SessionManager:
             await self.session.flush()
 
     async def update_usage(
-        self, session_id: str, tokens: int, cost_usd: float
+        self, session_id: str, tokens: int, cost_usd: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_creation_tokens: int = 0,
     ) -> Optional[Session]:
         """
         セッションの使用量を更新
 
+        同一トランザクションでプロジェクトの日次ロールアップにも加算します。
+
         Args:
             session_id: セッションID
             tokens: 追加トークン数
             cost_usd: 追加コスト (USD)
+            input_tokens: 入力トークン数
+            output_tokens: 出力トークン数
+            cache_read_tokens: キャッシュ読み取りトークン数
+            cache_creation_tokens: キャッシュ作成トークン数
 
         Returns:
             Optional[Session]: 更新されたセッション
@@ -235,6 +259,16 @@ class SessionManager:
         session_model.updated_at = datetime.now(timezone.utc)
         session_model.last_activity_at = datetime.now(timezone.utc)
 
+        await UsageService(self.session).record_usage(
+            session_model.project_id,
+            cost_usd,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_creation_tokens=cache_creation_tokens,
+            total_tokens=tokens,
+        )
+
         await self.session.flush()
         return self._model_to_pydantic(session_model)
 
@@ -309,6 +343,10 @@ class SessionManager:
         if not session_model:
             return None
 
+        # アーカイブ済みセッションは新規アクティビティ前に復元
+        if is_processing and session_model.archived_at is not None:
+            await self.archive.rehydrate_session(session_model)
+
         session_model.is_processing = is_processing
         if is_processing:
             session_model.processing_started_at = datetime.now(timezone.utc)
@@ -343,26 +381,36 @@ class SessionManager:
             return row[0], row[1]
         return False, None
 
-    async def reset_stale_processing_sessions(self, timeout_minutes: int = 30) -> int:
+    async def reset_stale_processing_sessions(
+        self, timeout_minutes: int = 30, limit: Optional[int] = None
+    ) -> int:
         """
         タイムアウトした処理中セッションをリセット
 
         Args:
             timeout_minutes: タイムアウト時間（分）
+            limit: 1回にリセットする最大件数（指定時は主キーで対象を絞り、ロック範囲を限定）
 
         Returns:
             int: リセットしたセッション数
         """
-        from sqlalchemy import update
-
         timeout_threshold = datetime.now(timezone.utc) - timedelta(minutes=timeout_minutes)
+        conditions = [
+            SessionModel.is_processing == True,
+            SessionModel.processing_started_at < timeout_threshold,
+        ]
+        if limit is not None:
+            result = await self.session.execute(
+                select(SessionModel.id).where(*conditions).limit(limit)
+            )
+            session_ids = result.scalars().all()
+            if not session_ids:
+                return 0
+            conditions.append(SessionModel.id.in_(session_ids))
 
         stmt = (
             update(SessionModel)
-            .where(
-                SessionModel.is_processing == True,
-                SessionModel.processing_started_at < timeout_threshold
-            )
+            .where(*conditions)
             .values(
                 is_processing=False,
                 processing_started_at=None,
@@ -385,9 +433,14 @@ class SessionManager:
         Args:
             session_id: セッションID
         """
+        archive_state = await self._get_archive_state(session_id)
+
         stmt = delete(SessionModel).where(SessionModel.id == session_id)
         await self.session.execute(stmt)
         await self.session.flush()
+
+        if archive_state and archive_state[1] is not None:
+            self.archive.delete_segment_after_commit(archive_state[0], session_id)
         logger.info("Session deleted", session_id=session_id)
 
     async def _count_sessions(self, project_id: str) -> int:
@@ -398,6 +451,140 @@ class SessionManager:
         result = await self.session.execute(stmt)
         return result.scalar() or 0
 
+    def _message_conditions(
+        self, session_id: str,
+        role: Optional[MessageRole] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        search: Optional[str] = None,
+    ) -> list:
+        """メッセージ検索条件を構築"""
+        conditions = [MessageModel.session_id == session_id]
+
+        if role:
+            role_value = role.value if hasattr(role, 'value') else str(role)
+            conditions.append(MessageModel.role == role_value)
+
+        if start_date:
+            conditions.append(MessageModel.created_at >= start_date)
+
+        if end_date:
+            conditions.append(MessageModel.created_at <= end_date)
+
+        if search:
+            # 圧縮行は候補として取得し、展開後に再判定する
+            conditions.append(or_(
+                MessageModel.content.like(f"%{search}%"),
+                MessageModel.content.like(f"{TEXT_COMPRESSION_MARKER}%"),
+            ))
+
+        return conditions
+
+    @staticmethod
+    def _filter_search(messages: List[ChatMessage], search: str) -> List[ChatMessage]:
+        """本文検索（MySQLの既定照合順序に合わせて大文字小文字を区別しない）"""
+        needle = search.lower()
+        return [m for m in messages if needle in m.content.lower()]
+
+    async def get_message_storage_stats(self, session_id: str) -> dict:
+        """
+        メッセージ本文のストレージ使用量と圧縮による削減量を取得
+
+        Args:
+            session_id: セッションID
+
+        Returns:
+            dict: message_count, compressed_count, stored_bytes, original_bytes, saved_bytes
+        """
+        plain_stmt = select(
+            func.count(MessageModel.id), func.coalesce(func.sum(func.length(MessageModel.content)), 0)
+        ).where(
+            MessageModel.session_id == session_id,
+            MessageModel.content.notlike(f"{TEXT_COMPRESSION_MARKER}%"),
+        )
+        plain_count, plain_bytes = (await self.session.execute(plain_stmt)).one()
+
+        compressed_stmt = select(MessageModel.content).where(
+            MessageModel.session_id == session_id,
+            MessageModel.content.like(f"{TEXT_COMPRESSION_MARKER}%"),
+        )
+        compressed = (await self.session.execute(compressed_stmt)).scalars().all()
+        stored_bytes = sum(len(c.encode("utf-8")) for c in compressed)
+        original_bytes = sum(len(decompress_text(c).encode("utf-8")) for c in compressed)
+
+        return {
+            "message_count": plain_count + len(compressed),
+            "compressed_count": len(compressed),
+            "stored_bytes": int(plain_bytes) + stored_bytes,
+            "original_bytes": int(plain_bytes) + original_bytes,
+            "saved_bytes": original_bytes - stored_bytes,
+        }
+
+    # アーカイブ管理
+    async def _get_archive_state(self, session_id: str) -> Optional[Tuple[str, Optional[datetime]]]:
+        """(project_id, archived_at) を取得（セッションが存在しない場合 None）"""
+        stmt = select(SessionModel.project_id, SessionModel.archived_at).where(
+            SessionModel.id == session_id
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return (row[0], row[1]) if row else None
+
+    async def rehydrate_if_archived(self, session_id: str) -> int:
+        """
+        アーカイブ済みセッションをmessagesテーブルに復元
+
+        Args:
+            session_id: セッションID
+
+        Returns:
+            int: 復元したメッセージ数（アーカイブされていない場合 0）
+        """
+        stmt = select(SessionModel).where(
+            SessionModel.id == session_id, SessionModel.archived_at.isnot(None)
+        )
+        result = await self.session.execute(stmt)
+        session_model = result.scalar_one_or_none()
+
+        if not session_model:
+            return 0
+        return await self.archive.rehydrate_session(session_model)
+
+    async def _get_archived_messages(
+        self, project_id: str, session_id: str,
+        role: Optional[MessageRole] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        search: Optional[str] = None,
+    ) -> List[ChatMessage]:
+        """アーカイブセグメントからメッセージを読み出し、DBクエリと同じ条件でフィルタ"""
+        records = await self.archive.read_messages(project_id, session_id)
+
+        def _naive_utc(value: datetime) -> datetime:
+            # DBのDATETIMEはタイムゾーンなし（UTC）のため比較用に揃える
+            if value.tzinfo is not None:
+                return value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+
+        if role:
+            role_value = role.value if hasattr(role, 'value') else str(role)
+            records = [r for r in records if r["role"] == role_value]
+
+        if start_date or end_date:
+            start = _naive_utc(start_date) if start_date else None
+            end = _naive_utc(end_date) if end_date else None
+            filtered = []
+            for r in records:
+                created_at = _naive_utc(datetime.fromisoformat(r["created_at"]))
+                if (start is None or created_at >= start) and (end is None or created_at <= end):
+                    filtered.append(r)
+            records = filtered
+
+        messages = [ChatMessage.model_validate(r) for r in records]
+        if search:
+            messages = self._filter_search(messages, search)
+        return messages
+
     # メッセージ履歴管理
     async def save_message(
         self, session_id: str, role: MessageRole, content: str, tokens: Optional[int] = None,
@@ -422,11 +609,19 @@ class SessionManager:
         message_id = generate_id()
         now = datetime.now(timezone.utc)
 
+        # 大きな本文（tool_use/tool_result を含むJSON等）は圧縮して保存
+        stored_content = content
+        original_bytes = stored_bytes = None
+        if self.compression_enabled:
+            stored_content, original_bytes = compress_text(content, self.compression_threshold)
+            if stored_content is not content:
+                stored_bytes = len(stored_content)
+
         message_model = MessageModel(
             id=message_id,
             session_id=session_id,
             role=role.value if hasattr(role, 'value') else str(role),
-            content=content,
+            content=stored_content,
             tokens=tokens,
             created_at=now,
         )
@@ -436,8 +631,21 @@ class SessionManager:
             try:
                 self.session.add(message_model)
                 await self.session.flush()
-                logger.info("Message saved", session_id=session_id, message_id=message_id)
-                return self._message_model_to_pydantic(message_model)
+                if stored_bytes is not None:
+                    logger.info(
+                        "Message saved",
+                        session_id=session_id,
+                        message_id=message_id,
+                        original_bytes=original_bytes,
+                        stored_bytes=stored_bytes,
+                        saved_bytes=original_bytes - stored_bytes,
+                    )
+                else:
+                    logger.info("Message saved", session_id=session_id, message_id=message_id)
+                # 圧縮済みの本文を再展開しないよう元の内容をそのまま返す
+                message = ChatMessage.model_validate(message_model)
+                message.content = content
+                return message
             except SQLAlchemyError as e:
                 last_error = e
                 logger.warning(
@@ -505,25 +713,31 @@ class SessionManager:
         Returns:
             List[ChatMessage]: メッセージリスト
         """
-        conditions = [MessageModel.session_id == session_id]
-
-        if role:
-            role_value = role.value if hasattr(role, 'value') else str(role)
-            conditions.append(MessageModel.role == role_value)
-
-        if start_date:
-            conditions.append(MessageModel.created_at >= start_date)
-
-        if end_date:
-            conditions.append(MessageModel.created_at <= end_date)
+        archive_state = await self._get_archive_state(session_id)
+        if archive_state and archive_state[1] is not None:
+            messages = await self._get_archived_messages(
+                archive_state[0], session_id, role, start_date, end_date, search
+            )
+            end = offset + limit if limit else None
+            return messages[offset:end]
 
-        if search:
-            conditions.append(MessageModel.content.like(f"%{search}%"))
+        conditions = self._message_conditions(session_id, role, start_date, end_date, search)
 
+        # IDはUUID v7（時系列順）のため、同一時刻のメッセージもID順で安定ソートされる
         stmt = select(MessageModel).where(
             and_(*conditions)
-        ).order_by(MessageModel.created_at.asc()).offset(offset)
+        ).order_by(MessageModel.created_at.asc(), MessageModel.id.asc())
+
+        if search:
+            # 圧縮行はDB側で検索できないため、展開後に絞り込んでからページングする
+            result = await self.session.execute(stmt)
+            messages = self._filter_search(
+                [self._message_model_to_pydantic(m) for m in result.scalars().all()], search
+            )
+            end = offset + limit if limit else None
+            return messages[offset:end]
 
+        stmt = stmt.offset(offset)
         if limit:
             stmt = stmt.limit(limit)
 
@@ -552,20 +766,20 @@ class SessionManager:
         Returns:
             int: メッセージ総件数
         """
-        conditions = [MessageModel.session_id == session_id]
-
-        if role:
-            role_value = role.value if hasattr(role, 'value') else str(role)
-            conditions.append(MessageModel.role == role_value)
-
-        if start_date:
-            conditions.append(MessageModel.created_at >= start_date)
+        archive_state = await self._get_archive_state(session_id)
+        if archive_state and archive_state[1] is not None:
+            messages = await self._get_archived_messages(
+                archive_state[0], session_id, role, start_date, end_date, search
+            )
+            return len(messages)
 
-        if end_date:
-            conditions.append(MessageModel.created_at <= end_date)
+        conditions = self._message_conditions(session_id, role, start_date, end_date, search)
 
         if search:
-            conditions.append(MessageModel.content.like(f"%{search}%"))
+            stmt = select(MessageModel.content).where(and_(*conditions))
+            result = await self.session.execute(stmt)
+            needle = search.lower()
+            return sum(1 for c in result.scalars().all() if needle in decompress_text(c).lower())
 
         stmt = select(func.count(MessageModel.id)).where(and_(*conditions))
         result = await self.session.execute(stmt)
@@ -593,6 +807,23 @@ class SessionManager:
         Returns:
             Tuple[List[ChatMessage], int]: (メッセージリスト, 総件数)
         """
+        # アーカイブ済みの場合はセグメントを1回だけ読む
+        archive_state = await self._get_archive_state(session_id)
+        if archive_state and archive_state[1] is not None:
+            all_messages = await self._get_archived_messages(
+                archive_state[0], session_id, role, start_date, end_date, search
+            )
+            end = offset + limit if limit else None
+            return all_messages[offset:end], len(all_messages)
+
+        if search:
+            # 検索時は展開・絞り込みを1回で済ませる
+            all_messages = await self.get_messages(
+                session_id, None, 0, role, start_date, end_date, search
+            )
+            end = offset + limit if limit else None
+            return all_messages[offset:end], len(all_messages)
+
         messages = await self.get_messages(
             session_id, limit, offset, role, start_date, end_date, search
         )
@@ -610,6 +841,16 @@ class SessionManager:
         """
         stmt = delete(MessageModel).where(MessageModel.session_id == session_id)
         await self.session.execute(stmt)
+
+        archive_state = await self._get_archive_state(session_id)
+        if archive_state and archive_state[1] is not None:
+            await self.session.execute(
+                update(SessionModel)
+                .where(SessionModel.id == session_id)
+                .values(archived_at=None)
+            )
+            self.archive.delete_segment_after_commit(archive_state[0], session_id)
+
         await self.session.flush()
         logger.info("Messages deleted", session_id=session_id)
 
@@ -4,6 +4,8 @@ FastAPI Application Entry Point
 Web版Claude Code バックエンドアプリケーション
 """
 
+import os
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
@@ -11,13 +13,23 @@ from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import agents, auth, commands, cron, files, health, mcp, models, project_config, projects, public_access, public_api, sessions, shares, skills, templates
+from app.api.middleware import RateLimitMiddleware
+from app.api.routes import agents, auth, commands, cron, files, health, mcp, models, project_config, projects, public_access, public_api, sessions, shares, skills, templates, usage
 from app.api.websocket.handlers import handle_chat_websocket
-from app.api.websocket.public_handlers import handle_public_chat_websocket
+from app.api.websocket.public_handlers import handle_public_chat_websocket, public_connection_manager
 from app.config import settings
 from app.core.cron_scheduler import get_cron_scheduler, shutdown_cron_scheduler
 from app.models.errors import AppException, ErrorResponse
+from app.services.archive_service import run_session_archival
+from app.services.maintenance_service import get_maintenance_service, shutdown_maintenance_service
+from app.services.project_config_cache import get_project_config_cache, shutdown_project_config_cache
+from app.services.public_access_cache import get_public_access_cache, shutdown_public_access_cache
+from app.services.rate_limiter import shutdown_rate_limiter
+from app.services.spend_reservation import shutdown_spend_reservations
+from app.services.usage_ledger import get_usage_ledger, shutdown_usage_ledger
+from app.services.usage_service import reconcile_budget_cache
 from app.utils.database import init_database, close_database, get_session_context
+from app.utils.redis_client import shutdown_redis
 from app.utils.logger import get_logger, setup_logging
 
 # ロギング設定
@@ -34,6 +46,19 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """
     # 起動時処理
     logger.info("Starting application", version="1.0.0")
+    startup_started = time.perf_counter()
+    phase_started = startup_started
+
+    def log_phase(phase: str) -> None:
+        """起動フェーズごとの所要時間をログ出力"""
+        nonlocal phase_started
+        now = time.perf_counter()
+        logger.info(
+            "Startup phase completed",
+            phase=phase,
+            duration_ms=round((now - phase_started) * 1000, 1),
+        )
+        phase_started = now
 
     # データベース初期化 (MySQL/SQLAlchemy)
     try:
@@ -42,19 +67,60 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     except Exception as e:
         logger.error("Failed to connect to database", error=str(e))
         raise
+    log_phase("database")
 
     # ワークスペースディレクトリ作成
-    import os
-
     os.makedirs(settings.workspace_base, exist_ok=True)
     logger.info("Workspace directory initialized", path=settings.workspace_base)
+    log_phase("workspace")
 
     # Cronスケジューラー起動
     try:
         scheduler = await get_cron_scheduler()
         logger.info("Cron scheduler initialized")
+
+        # 非アクティブセッションのアーカイブジョブ
+        if settings.archive_enabled:
+            scheduler.add_system_job(
+                "session_archive",
+                run_session_archival,
+                settings.archive_interval_minutes,
+            )
+
+        # 予算キャッシュのリコンシリエーション（ワーカー間の差分補正）
+        if settings.budget_cache_enabled:
+            scheduler.add_system_job(
+                "budget_reconcile",
+                reconcile_budget_cache,
+                settings.budget_reconcile_interval_minutes,
+            )
     except Exception as e:
         logger.error("Failed to initialize cron scheduler", error=str(e))
+    log_phase("cron")
+
+    # 使用量台帳フラッシャー起動
+    get_usage_ledger().start()
+
+    # 定期メンテナンス（処理中フラグ・期限切れ公開セッション・Cronログ・孤立ワークスペース）
+    if settings.maintenance_enabled:
+        get_maintenance_service().start()
+
+    # プロジェクト設定キャッシュの無効化通知購読（REDIS_URL 設定時）
+    try:
+        await get_project_config_cache().start()
+    except Exception as e:
+        logger.error("Failed to start config invalidation listener", error=str(e))
+
+    # 公開トークン解決キャッシュの無効化通知購読（REDIS_URL 設定時）
+    try:
+        await get_public_access_cache().start()
+    except Exception as e:
+        logger.error("Failed to start public access invalidation listener", error=str(e))
+
+    logger.info(
+        "Application started",
+        duration_ms=round((time.perf_counter() - startup_started) * 1000, 1),
+    )
 
     yield
 
@@ -65,10 +131,35 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     await shutdown_cron_scheduler()
     logger.info("Cron scheduler stopped")
 
+    # 定期メンテナンス停止
+    await shutdown_maintenance_service()
+
+    # 公開チャットの処理中タスクを中断し、SDKクライアントを終了
+    await public_connection_manager.cancel_all_chat_tasks()
+    await public_connection_manager.close_all_sdk_clients()
+
+    # 使用量台帳の残りを書き込み
+    await shutdown_usage_ledger()
+
+    # 予算予約マネージャー停止
+    await shutdown_spend_reservations()
+
+    # プロジェクト設定キャッシュの通知購読停止
+    await shutdown_project_config_cache()
+
+    # 公開トークン解決キャッシュの通知購読停止
+    await shutdown_public_access_cache()
+
+    # レートリミッター停止
+    await shutdown_rate_limiter()
+
     # データベース接続クローズ
     await close_database()
     logger.info("Database connection closed")
 
+    # 共有Redis接続クローズ（上記サービスの停止後）
+    await shutdown_redis()
+
 
 # FastAPI アプリケーション初期化
 app = FastAPI(
@@ -80,6 +171,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# レート制限（CORSの内側に置き、429応答にもCORSヘッダーを付与する）
+app.add_middleware(RateLimitMiddleware)
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -129,6 +223,7 @@ app.include_router(project_config.router, prefix=settings.api_prefix)
 app.include_router(templates.router, prefix=settings.api_prefix)
 app.include_router(models.router, prefix=settings.api_prefix)
 app.include_router(public_api.router, prefix=settings.api_prefix)
+app.include_router(usage.router, prefix=settings.api_prefix)
 
 
 # WebSocketエンドポイント
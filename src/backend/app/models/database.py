@@ -6,19 +6,21 @@ SQLAlchemy Database Models
 
 from datetime import datetime, timezone
 from typing import Optional
-import uuid
 
-from app.utils.helpers import jst_now
+from app.utils.helpers import generate_id, jst_now
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
     Integer,
     JSON,
+    LargeBinary,
     String,
     Text,
     Index,
@@ -42,7 +44,7 @@ class UserModel(Base):
     """
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     display_name = Column(String(100), nullable=True)
@@ -63,7 +65,7 @@ class ProjectModel(Base):
     """プロジェクトテーブル"""
     __tablename__ = "projects"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(String(36), primary_key=True, default=generate_id)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -103,7 +105,7 @@ class ProjectShareModel(Base):
     """プロジェクト共有テーブル"""
     __tablename__ = "project_shares"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     permission_level = Column(
@@ -130,7 +132,7 @@ class SessionModel(Base):
     """セッションテーブル"""
     __tablename__ = "sessions"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=True)
     status = Column(
@@ -150,6 +152,8 @@ class SessionModel(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     last_activity_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # コールドストレージ退避（NULL=messagesテーブルに保持）
+    archived_at = Column(DateTime, nullable=True)
 
     # Relationships
     project = relationship("ProjectModel", back_populates="sessions")
@@ -158,6 +162,7 @@ class SessionModel(Base):
     __table_args__ = (
         Index("ix_sessions_project_status", "project_id", "status"),
         Index("ix_sessions_last_activity", "last_activity_at"),
+        Index("ix_sessions_archive_candidates", "archived_at", "last_activity_at"),
     )
 
 
@@ -165,7 +170,7 @@ class MessageModel(Base):
     """メッセージテーブル"""
     __tablename__ = "messages"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(String(36), primary_key=True, default=generate_id)  # UUID v7（時系列順）
     session_id = Column(String(36), ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(
         Enum("user", "assistant", "system", name="message_role"),
@@ -201,6 +206,62 @@ class CronLogModel(Base):
     )
 
 
+# ============================================
+# Usage Models
+# ============================================
+
+
+class ProjectUsageDailyModel(Base):
+    """
+    プロジェクト日次使用量テーブル
+
+    JST日付単位のロールアップ。使用量記録時に加算更新されます。
+    """
+    __tablename__ = "project_usage_daily"
+
+    project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    usage_date = Column(Date, primary_key=True)  # JST日付
+    input_tokens = Column(BigInteger, default=0, nullable=False)
+    output_tokens = Column(BigInteger, default=0, nullable=False)
+    cache_read_tokens = Column(BigInteger, default=0, nullable=False)
+    cache_creation_tokens = Column(BigInteger, default=0, nullable=False)
+    total_tokens = Column(BigInteger, default=0, nullable=False)
+    cost_usd = Column(Float, default=0.0, nullable=False)
+    message_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class UsageLedgerModel(Base):
+    """
+    使用量台帳テーブル（追記専用）
+
+    1ターン（ResultMessage）ごとの使用量を記録します。
+    セッション・プロジェクト削除後も分析用に保持するため外部キーは設定しません。
+    """
+    __tablename__ = "usage_ledger"
+
+    # SQLite では INTEGER PRIMARY KEY のみ自動採番されるため型を切り替える
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    project_id = Column(String(36), nullable=False)
+    session_id = Column(String(36), nullable=False)
+    user_id = Column(String(36), nullable=True)
+    model = Column(String(50), nullable=True)
+    input_tokens = Column(Integer, default=0, nullable=False)
+    output_tokens = Column(Integer, default=0, nullable=False)
+    cache_read_tokens = Column(Integer, default=0, nullable=False)
+    cache_creation_tokens = Column(Integer, default=0, nullable=False)
+    cost_usd = Column(Float, default=0.0, nullable=False)
+    duration_ms = Column(Integer, default=0, nullable=False)
+    tool_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        Index("ix_usage_ledger_project_created", "project_id", "created_at"),
+        Index("ix_usage_ledger_session_created", "session_id", "created_at"),
+        Index("ix_usage_ledger_user_created", "user_id", "created_at"),
+    )
+
+
 # ============================================
 # Project Configuration Models (MCP, Agent, Skill, Command)
 # ============================================
@@ -210,7 +271,7 @@ class ProjectMCPServerModel(Base):
     """プロジェクトMCPサーバー設定テーブル"""
     __tablename__ = "project_mcp_servers"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     command = Column(String(500), nullable=False)
@@ -234,7 +295,7 @@ class ProjectAgentModel(Base):
     """プロジェクトエージェント設定テーブル"""
     __tablename__ = "project_agents"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
@@ -259,7 +320,7 @@ class ProjectSkillModel(Base):
     """プロジェクトスキル設定テーブル"""
     __tablename__ = "project_skills"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
@@ -282,7 +343,7 @@ class ProjectCommandModel(Base):
     """プロジェクトコマンド設定テーブル"""
     __tablename__ = "project_commands"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
@@ -311,7 +372,7 @@ class ProjectTemplateModel(Base):
     """プロジェクトテンプレートテーブル"""
     __tablename__ = "project_templates"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
@@ -338,7 +399,7 @@ class ProjectTemplateFileModel(Base):
     """プロジェクトテンプレートファイルテーブル"""
     __tablename__ = "project_template_files"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     template_id = Column(String(36), ForeignKey("project_templates.id", ondelete="CASCADE"), nullable=False, index=True)
     file_path = Column(String(500), nullable=False)  # 相対パス (例: "src/main.py", "README.md")
     content = Column(Text, nullable=True)  # ファイル内容 (バイナリは非対応)
@@ -362,7 +423,7 @@ class ProjectPublicAccessModel(Base):
     """プロジェクト外部公開設定テーブル"""
     __tablename__ = "project_public_access"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     project_id = Column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, unique=True)
     access_token = Column(String(64), nullable=False, unique=True, index=True)  # 公開用トークン
     enabled = Column(Boolean, default=False, nullable=False)  # 公開有効フラグ
@@ -370,6 +431,8 @@ class ProjectPublicAccessModel(Base):
     allowed_ips = Column(JSON, nullable=True)  # 許可IPリスト（NULL=制限なし）
     max_sessions_per_day = Column(Integer, nullable=True)  # 1日あたり最大セッション数
     max_messages_per_session = Column(Integer, nullable=True)  # セッションあたり最大メッセージ数
+    session_count_date = Column(Date, nullable=True)  # session_count_today の集計日（UTC）
+    session_count_today = Column(Integer, default=0, nullable=False)  # 当日の作成セッション数
     expires_at = Column(DateTime, nullable=True)  # 公開期限（NULL=無期限）
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -387,10 +450,11 @@ class CommandPublicSettingModel(Base):
     """コマンド公開設定テーブル"""
     __tablename__ = "command_public_settings"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     command_id = Column(String(36), ForeignKey("project_commands.id", ondelete="CASCADE"), nullable=False, unique=True)
     is_public = Column(Boolean, default=False, nullable=False)  # 外部公開フラグ
     priority = Column(Integer, default=0, nullable=False)  # 表示優先順位
+    result_cache_ttl_seconds = Column(Integer, nullable=True)  # 実行結果キャッシュの有効期間（NULL = 無効）
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
@@ -406,13 +470,14 @@ class PublicSessionModel(Base):
     """外部公開セッションテーブル"""
     __tablename__ = "public_sessions"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=generate_id)
     public_access_id = Column(String(36), ForeignKey("project_public_access.id", ondelete="CASCADE"), nullable=False)
     command_id = Column(String(36), ForeignKey("project_commands.id", ondelete="SET NULL"), nullable=True)
     ip_address = Column(String(45), nullable=False)  # IPv6対応
     user_agent = Column(String(500), nullable=True)
     message_count = Column(Integer, default=0, nullable=False)
     sdk_session_id = Column(String(100), nullable=True, index=True)  # Claude SDK セッションID
+    sdk_session_shared = Column(Boolean, default=False, nullable=False)  # 結果キャッシュと共有中（次回は分岐して再開）
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     last_activity_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
@@ -424,3 +489,22 @@ class PublicSessionModel(Base):
         Index("ix_public_sessions_public_access", "public_access_id"),
         Index("ix_public_sessions_created", "created_at"),
     )
+
+
+class PublicAccessDailyStatsModel(Base):
+    """
+    外部公開日次統計テーブル
+
+    UTC日付単位のロールアップ。公開セッション作成・メッセージ送信時に加算更新されます。
+    visitor_sketch はクライアントIPの HyperLogLog レジスタです。
+    """
+    __tablename__ = "public_access_daily_stats"
+
+    public_access_id = Column(
+        String(36), ForeignKey("project_public_access.id", ondelete="CASCADE"), primary_key=True
+    )
+    stat_date = Column(Date, primary_key=True)  # UTC日付
+    session_count = Column(Integer, default=0, nullable=False)
+    message_count = Column(Integer, default=0, nullable=False)
+    visitor_sketch = Column(LargeBinary, nullable=True)  # NULL=未構築（移行前のデータ）
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
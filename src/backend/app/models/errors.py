@@ -26,6 +26,7 @@ class ErrorCode(str, Enum):
     NOT_FOUND = "not_found"
     ALREADY_EXISTS = "already_exists"
     CONFLICT = "conflict"
+    RATE_LIMITED = "rate_limited"
 
     # セッション・プロジェクトエラー
     SESSION_NOT_FOUND = "session_not_found"
@@ -52,3 +52,6 @@ class Session(BaseModel):
     last_activity_at: datetime = Field(
         default_factory=_utc_now, description="最終アクティビティ日時"
     )
+    archived_at: Optional[datetime] = Field(
+        default=None, description="アーカイブ日時（NULL=未アーカイブ）"
+    )
@@ -68,6 +68,9 @@ class CommandPublicSettingBase(BaseModel):
     """コマンド公開設定ベース"""
     is_public: bool = Field(default=False, description="外部公開フラグ")
     priority: int = Field(default=0, ge=0, description="表示優先順位")
+    result_cache_ttl_seconds: Optional[int] = Field(
+        default=None, ge=0, le=604800, description="実行結果キャッシュの有効期間（秒、未設定は無効）"
+    )
 
 
 class CommandPublicSettingUpdate(CommandPublicSettingBase):
@@ -82,6 +85,7 @@ class CommandPublicSettingResponse(BaseModel):
     command_description: Optional[str]
     is_public: bool
     priority: int
+    result_cache_ttl_seconds: Optional[int] = None
 
     model_config = {"from_attributes": True}
 
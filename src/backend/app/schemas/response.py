@@ -51,6 +51,7 @@ class SessionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     last_activity_at: datetime
+    archived_at: Optional[datetime] = None  # コールドストレージ退避日時
 
 
 class ProjectListResponse(BaseModel):
@@ -79,6 +80,37 @@ class HealthCheckResponse(BaseModel):
     timestamp: str = Field(..., description="タイムスタンプ")
 
 
+class DatabaseHealthResponse(BaseModel):
+    """データベース接続プール状態レスポンス"""
+
+    primary: Optional[Dict[str, Any]] = Field(default=None, description="プライマリのプール状態")
+    replica: Optional[Dict[str, Any]] = Field(default=None, description="読み取りレプリカのプール・遅延状態")
+    read_routing: Dict[str, int] = Field(default_factory=dict, description="読み取り振り分け件数")
+    timestamp: str = Field(..., description="タイムスタンプ")
+
+
+class PublicResultCacheHealthResponse(BaseModel):
+    """公開コマンド結果キャッシュ状態レスポンス"""
+
+    entries: int = Field(..., description="キャッシュ済み件数")
+    hits: int = Field(..., description="ヒット数")
+    misses: int = Field(..., description="ミス数")
+    stores: int = Field(..., description="登録数")
+    evictions: int = Field(..., description="LRU による追い出し数")
+    hit_rate: float = Field(..., description="ヒット率")
+    timestamp: str = Field(..., description="タイムスタンプ")
+
+
+class MaintenanceHealthResponse(BaseModel):
+    """定期メンテナンス状態レスポンス"""
+
+    enabled: bool = Field(..., description="定期メンテナンスが有効か")
+    tasks: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict, description="タスクごとの実行回数・所要時間・処理件数"
+    )
+    timestamp: str = Field(..., description="タイムスタンプ")
+
+
 class ConfigResponse(BaseModel):
     """クライアント設定レスポンス"""
 
@@ -179,6 +211,45 @@ class UsageStatsResponse(BaseModel):
     cost_monthly: float = Field(description="過去30日のコスト（USD）")
 
 
+class UsageMetrics(BaseModel):
+    """使用量集計値"""
+
+    input_tokens: int = Field(default=0, description="入力トークン数")
+    output_tokens: int = Field(default=0, description="出力トークン数")
+    cache_read_tokens: int = Field(default=0, description="キャッシュ読み取りトークン数")
+    cache_creation_tokens: int = Field(default=0, description="キャッシュ作成トークン数")
+    cost_usd: float = Field(default=0.0, description="コスト（USD）")
+    duration_ms: int = Field(default=0, description="処理時間合計（ミリ秒）")
+    tool_count: int = Field(default=0, description="ツール呼び出し数")
+    turns: int = Field(default=0, description="ターン数")
+
+
+class UsagePoint(UsageMetrics):
+    """時間バケット単位の使用量"""
+
+    bucket: str = Field(description="バケット開始時刻（JST、YYYY-MM-DD HH:MM:SS）")
+
+
+class UsageSeries(BaseModel):
+    """使用量系列"""
+
+    key: Optional[str] = Field(default=None, description="グループキー（group_by未指定時はnull）")
+    points: List[UsagePoint] = Field(default_factory=list, description="バケット別使用量")
+    totals: UsageMetrics = Field(description="系列合計")
+
+
+class UsageAnalyticsResponse(BaseModel):
+    """使用量分析レスポンス"""
+
+    project_ids: List[str] = Field(description="対象プロジェクトID")
+    interval: str = Field(description="バケット間隔（hour/day/week）")
+    group_by: Optional[str] = Field(default=None, description="グループ化キー")
+    start: str = Field(description="集計開始日時（UTC）")
+    end: str = Field(description="集計終了日時（UTC）")
+    series: List[UsageSeries] = Field(default_factory=list, description="使用量系列")
+    totals: UsageMetrics = Field(description="全体合計")
+
+
 class CostLimitCheckResponse(BaseModel):
     """利用制限チェックレスポンス"""
 
@@ -0,0 +1,342 @@
+"""
+Session Archive Service
+
+非アクティブセッションのメッセージをコールドストレージへ退避するサービス
+
+セッション単位で messages を圧縮NDJSONセグメント
+（{archive_path}/{project_id}/{session_id}.ndjson.zst）に書き出し、
+sessions テーブルにはスタブ行（archived_at 付き）のみを残します。
+リハイドレート・削除時のセグメント削除はコミット後に行うため、
+トランザクションがロールバックされてもアーカイブは失われません。
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.database import MessageModel, SessionModel
+from app.utils.compression import (
+    CODEC_EXTENSIONS,
+    compress_text,
+    decompress_text,
+    default_codec,
+    iter_compressed_lines,
+    write_compressed_lines,
+)
+from app.utils.database import get_session_context
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# メッセージ削除の IN 句あたりの件数
+_DELETE_CHUNK_SIZE = 1000
+
+# コミット後に削除するセグメントファイル（session.info のキー）
+_SESSION_INFO_KEY = "archive_segments_to_delete"
+
+
+def _message_to_record(message: MessageModel) -> dict:
+    """MessageモデルをNDJSONレコードに変換"""
+    return {
+        "id": message.id,
+        "session_id": message.session_id,
+        "role": message.role,
+        # セグメント自体が圧縮されるため本文は展開して格納
+        "content": decompress_text(message.content),
+        "tokens": message.tokens,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+def _record_to_row(record: dict) -> dict:
+    """NDJSONレコードをmessagesテーブルの行に変換"""
+    created_at = record.get("created_at")
+    content = record["content"]
+    if settings.message_compression_enabled:
+        content, _ = compress_text(content, settings.message_compression_threshold)
+    return {
+        "id": record["id"],
+        "session_id": record["session_id"],
+        "role": record["role"],
+        "content": content,
+        "tokens": record.get("tokens"),
+        "created_at": datetime.fromisoformat(created_at) if created_at else datetime.now(timezone.utc),
+    }
+
+
+class SessionArchiveService:
+    """
+    セッションアーカイブサービス
+
+    責務:
+    - 非アクティブセッションのメッセージをセグメントファイルへ退避
+    - アーカイブ済みメッセージの読み出し
+    - 新規アクティビティ時のリハイドレート（messagesテーブルへの復元）
+    """
+
+    def __init__(self, session: AsyncSession, archive_base: Optional[str] = None):
+        """
+        Args:
+            session: SQLAlchemy AsyncSession
+            archive_base: アーカイブ基底ディレクトリ
+        """
+        self.session = session
+        self.archive_base = Path(archive_base or settings.archive_path)
+
+    # ============================================
+    # Segment Files
+    # ============================================
+
+    def _segment_path(self, project_id: str, session_id: str, codec: str) -> Path:
+        """セグメントファイルパス取得"""
+        return self.archive_base / project_id / f"{session_id}.ndjson{CODEC_EXTENSIONS[codec]}"
+
+    def find_segment(self, project_id: str, session_id: str) -> Optional[Path]:
+        """既存のセグメントファイルを探す（コーデック不問）"""
+        for codec in CODEC_EXTENSIONS:
+            path = self._segment_path(project_id, session_id, codec)
+            if path.exists():
+                return path
+        return None
+
+    def _read_segment(self, path: Optional[Path]) -> List[dict]:
+        """セグメントファイルを読み込む（同期I/O、スレッドで実行）"""
+        if path is None:
+            return []
+        return [json.loads(line) for line in iter_compressed_lines(path)]
+
+    async def read_messages(self, project_id: str, session_id: str) -> List[dict]:
+        """
+        アーカイブ済みメッセージを読み出す
+
+        Args:
+            project_id: プロジェクトID
+            session_id: セッションID
+
+        Returns:
+            List[dict]: 作成日時順のメッセージレコード
+        """
+        path = self.find_segment(project_id, session_id)
+        return await asyncio.to_thread(self._read_segment, path)
+
+    def delete_segment_after_commit(self, project_id: str, session_id: str) -> None:
+        """
+        コミット成功時にセグメントファイルを削除するよう登録
+
+        ロールバックされた場合はアーカイブ状態が戻るため、ファイルも残します。
+
+        Args:
+            project_id: プロジェクトID
+            session_id: セッションID
+        """
+        path = self.find_segment(project_id, session_id)
+        if path is not None:
+            self.session.sync_session.info.setdefault(_SESSION_INFO_KEY, []).append(path)
+
+    # ============================================
+    # Archive / Rehydrate
+    # ============================================
+
+    async def archive_session(
+        self,
+        session_id: str,
+        project_id: str,
+        inactive_before: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """
+        セッションのメッセージをアーカイブ
+
+        まず条件付き UPDATE で archived_at を設定して行ロックを取得し
+        （未アーカイブ・処理中でない・inactive_before より前から非アクティブ）、
+        条件を満たさなくなっていれば中止します。
+        セグメントに書き出したメッセージIDのみを削除し、その間に追加された
+        メッセージが残っている場合はロールバックしてセグメントも破棄します。
+
+        Args:
+            session_id: セッションID
+            project_id: プロジェクトID
+            inactive_before: 最終アクティビティの上限（候補抽出時のしきい値）
+
+        Returns:
+            Optional[int]: アーカイブしたメッセージ数（対象外になっていた場合 None）
+        """
+        conditions = [
+            SessionModel.id == session_id,
+            SessionModel.archived_at.is_(None),
+            SessionModel.is_processing == False,
+        ]
+        if inactive_before is not None:
+            conditions.append(SessionModel.last_activity_at < inactive_before)
+
+        claimed = await self.session.execute(
+            update(SessionModel)
+            .where(*conditions)
+            .values(archived_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            await self.session.rollback()
+            logger.info("Session no longer eligible for archival", session_id=session_id)
+            return None
+
+        result = await self.session.execute(
+            select(MessageModel)
+            .where(MessageModel.session_id == session_id)
+            .order_by(MessageModel.created_at.asc(), MessageModel.id.asc())
+        )
+        records = [_message_to_record(m) for m in result.scalars().all()]
+
+        path = self._segment_path(project_id, session_id, default_codec())
+        size = await asyncio.to_thread(
+            write_compressed_lines,
+            path,
+            (json.dumps(r, ensure_ascii=False) for r in records),
+        )
+
+        message_ids = [r["id"] for r in records]
+        for start in range(0, len(message_ids), _DELETE_CHUNK_SIZE):
+            await self.session.execute(
+                delete(MessageModel)
+                .where(MessageModel.id.in_(message_ids[start:start + _DELETE_CHUNK_SIZE]))
+                .execution_options(synchronize_session=False)
+            )
+
+        # 読み出し後に追加されたメッセージがあれば中止（セグメントに含まれないため）
+        remaining = await self.session.scalar(
+            select(func.count()).select_from(MessageModel).where(MessageModel.session_id == session_id)
+        )
+        if remaining:
+            await self.session.rollback()
+            await asyncio.to_thread(path.unlink, True)
+            logger.info(
+                "Session archival aborted, new messages arrived",
+                session_id=session_id,
+                new_messages=remaining,
+            )
+            return None
+
+        await self.session.commit()
+
+        logger.info(
+            "Session archived",
+            session_id=session_id,
+            project_id=project_id,
+            message_count=len(records),
+            segment_bytes=size,
+        )
+        return len(records)
+
+    async def rehydrate_session(self, session_model: SessionModel) -> int:
+        """
+        アーカイブ済みセッションをmessagesテーブルに復元
+
+        Args:
+            session_model: 対象セッション
+
+        Returns:
+            int: 復元したメッセージ数
+        """
+        if session_model.archived_at is None:
+            return 0
+
+        records = await self.read_messages(session_model.project_id, session_model.id)
+        if records:
+            await self.session.execute(
+                insert(MessageModel), [_record_to_row(r) for r in records]
+            )
+        session_model.archived_at = None
+        await self.session.flush()
+
+        # コミット後にセグメントを削除
+        self.delete_segment_after_commit(session_model.project_id, session_model.id)
+
+        logger.info(
+            "Session rehydrated",
+            session_id=session_model.id,
+            project_id=session_model.project_id,
+            message_count=len(records),
+        )
+        return len(records)
+
+    async def archive_inactive_sessions(
+        self,
+        inactive_days: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        非アクティブセッションをまとめてアーカイブ
+
+        Args:
+            inactive_days: 最終アクティビティからの経過日数
+            limit: 1回あたりの最大セッション数
+
+        Returns:
+            int: アーカイブしたセッション数
+        """
+        inactive_days = inactive_days if inactive_days is not None else settings.archive_inactive_days
+        limit = limit if limit is not None else settings.archive_batch_size
+        threshold = datetime.now(timezone.utc) - timedelta(days=inactive_days)
+
+        result = await self.session.execute(
+            select(SessionModel.id, SessionModel.project_id)
+            .where(
+                SessionModel.archived_at.is_(None),
+                SessionModel.is_processing == False,
+                SessionModel.last_activity_at < threshold,
+            )
+            .order_by(SessionModel.last_activity_at.asc())
+            .limit(limit)
+        )
+        candidates = result.all()
+
+        archived = 0
+        for session_id, project_id in candidates:
+            try:
+                if await self.archive_session(session_id, project_id, inactive_before=threshold) is not None:
+                    archived += 1
+            except Exception as e:
+                await self.session.rollback()
+                logger.error(
+                    "Failed to archive session",
+                    session_id=session_id,
+                    error=str(e),
+                )
+
+        if archived:
+            logger.info("Archived inactive sessions", count=archived, inactive_days=inactive_days)
+        return archived
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_committed_segments(session: Session) -> None:
+    """コミット済みのリハイドレート・削除に対応するセグメントを削除"""
+    for path in session.info.pop(_SESSION_INFO_KEY, None) or ():
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Failed to delete archive segment", path=str(path), error=str(e))
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_rolled_back_segments(session: Session) -> None:
+    """ロールバック時はアーカイブ状態が戻るためセグメントを残す"""
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+async def run_session_archival() -> int:
+    """
+    アーカイブジョブのエントリポイント（スケジューラから呼び出し）
+
+    Returns:
+        int: アーカイブしたセッション数
+    """
+    async with get_session_context() as db_session:
+        service = SessionArchiveService(db_session)
+        return await service.archive_inactive_sessions()
@@ -0,0 +1,427 @@
+"""
+Maintenance Service
+
+定期メンテナンス（掃除）ジョブ
+
+次のタスクを一定間隔で順に実行します。
+
+- stale_processing: タイムアウトした処理中フラグのリセット
+- visitor_sketch_backfill: 移行前の公開アクセス日次統計のユニーク訪問者スケッチ構築
+  （公開セッションの削除より前に実行）
+- expired_public_sessions: 保持期間を過ぎた公開セッションの削除
+  （maintenance_public_session_retention_days 設定時のみ）
+- cron_log_retention: 保持期間を過ぎた Cron 実行ログの削除
+- orphaned_workspaces: 公開セッション用ワークスペース・削除済みプロジェクトの
+  ワークスペースと SDK セッション状態の削除
+
+DB の更新・削除は主キーで maintenance_batch_size 件ずつ、バッチごとに
+トランザクションを分けて実行し、バッチ間で待機します（長時間のロックと
+負荷の集中を避けるため）。1回の実行で処理しきれない分は次回に持ち越します。
+各タスクの所要時間と処理件数は stats() で参照できます。
+
+全ワーカーでループが動きますが、各回は MySQL の GET_LOCK を取得できた
+1ワーカーのみが実行し、他のワーカーはその回をスキップします。
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text
+
+from app.config import settings
+from app.core.session_manager import SessionManager
+from app.models.database import CronLogModel, ProjectModel, PublicSessionModel
+from app.services.public_access_service import PublicAccessService
+from app.services.public_workspace_overlay import get_public_workspace_overlays, run_public_workspace_gc
+from app.utils.database import get_engine, get_session_context
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ID（generate_id）の長さ
+_ID_LENGTH = 36
+
+# 複数ワーカーでの重複実行を防ぐロック名
+MAINTENANCE_LOCK_NAME = "maintenance_sweep"
+
+
+@dataclass
+class MaintenanceTaskStats:
+    """メンテナンスタスクの実行状況"""
+    runs: int = 0
+    last_started_at: Optional[str] = None
+    last_duration_ms: float = 0.0
+    last_rows: int = 0
+    total_rows: int = 0
+    last_error: Optional[str] = None
+
+
+def _sdk_state_dir_name(path: str) -> str:
+    """SDK（CLI）のセッション状態ディレクトリ名（作業ディレクトリの英数字以外を - に置換）"""
+    return re.sub(r"[^a-zA-Z0-9]", "-", path)
+
+
+class MaintenanceService:
+    """
+    メンテナンスサービス
+
+    責務:
+    - 掃除タスクの定期実行（ワーカー間で排他）
+    - 主キーによる分割 UPDATE / DELETE とバッチ間の待機
+    - タスクごとの所要時間・処理件数の記録
+    """
+
+    def __init__(
+        self,
+        interval_minutes: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+        batch_pause_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            interval_minutes: 実行間隔（分）
+            batch_size: 1バッチの最大件数
+            max_batches: 1回の実行でタスクごとに処理する最大バッチ数
+            batch_pause_seconds: バッチ間の待機時間（秒）
+        """
+        self.interval_minutes = interval_minutes or settings.maintenance_interval_minutes
+        self.batch_size = batch_size or settings.maintenance_batch_size
+        self.max_batches = max_batches or settings.maintenance_max_batches
+        self.batch_pause_seconds = (
+            batch_pause_seconds
+            if batch_pause_seconds is not None
+            else settings.maintenance_batch_pause_ms / 1000
+        )
+        self.tasks: Dict[str, Callable[[], Awaitable[int]]] = {
+            "stale_processing": self.reset_stale_processing,
+            "visitor_sketch_backfill": self.backfill_visitor_sketches,
+            "expired_public_sessions": self.delete_expired_public_sessions,
+            "cron_log_retention": self.delete_old_cron_logs,
+            "orphaned_workspaces": self.remove_orphaned_workspaces,
+        }
+        self._stats: Dict[str, MaintenanceTaskStats] = {
+            name: MaintenanceTaskStats() for name in self.tasks
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """定期実行を開始"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Maintenance service started", interval_minutes=self.interval_minutes)
+
+    async def stop(self) -> None:
+        """定期実行を停止"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Maintenance service stopped")
+
+    async def _run(self) -> None:
+        """実行ループ"""
+        while True:
+            try:
+                await self.run_exclusive()
+            except Exception as e:
+                logger.error("Maintenance sweep failed", error=str(e), exc_info=True)
+            await asyncio.sleep(self.interval_minutes * 60)
+
+    async def run_exclusive(self) -> Optional[Dict[str, int]]:
+        """
+        他のワーカーが実行中でなければ全タスクを実行
+
+        GET_LOCK は接続単位のため、実行中は専用の接続でロックを保持します
+        （ワーカーが停止すると接続の切断で解放されます）。
+
+        Returns:
+            Optional[Dict[str, int]]: タスクごとの処理件数（他のワーカーが実行中の場合 None）
+        """
+        async with get_engine().connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = await conn.scalar(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": MAINTENANCE_LOCK_NAME}
+            )
+            if locked != 1:
+                logger.debug("Maintenance sweep running in another worker, skipped")
+                return None
+            try:
+                return await self.run_once()
+            finally:
+                await conn.scalar(text("SELECT RELEASE_LOCK(:name)"), {"name": MAINTENANCE_LOCK_NAME})
+
+    async def run_once(self) -> Dict[str, int]:
+        """
+        全タスクを1回ずつ実行
+
+        Returns:
+            Dict[str, int]: タスクごとの処理件数（失敗したタスクは含まない）
+        """
+        results: Dict[str, int] = {}
+        for name, task in self.tasks.items():
+            stats = self._stats[name]
+            stats.runs += 1
+            stats.last_started_at = datetime.now(timezone.utc).isoformat()
+            started = time.perf_counter()
+            try:
+                rows = await task()
+            except Exception as e:
+                stats.last_error = str(e)
+                logger.error("Maintenance task failed", task=name, error=str(e), exc_info=True)
+                continue
+            finally:
+                stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            stats.last_rows = rows
+            stats.total_rows += rows
+            stats.last_error = None
+            results[name] = rows
+            if rows:
+                logger.info(
+                    "Maintenance task completed",
+                    task=name,
+                    rows=rows,
+                    duration_ms=stats.last_duration_ms,
+                )
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """タスクごとの実行状況"""
+        return {name: asdict(stats) for name, stats in self._stats.items()}
+
+    async def _in_batches(self, run_batch: Callable[[Any], Awaitable[int]]) -> int:
+        """
+        バッチ処理を繰り返す
+
+        Args:
+            run_batch: 1バッチを処理して件数を返す関数（DBセッションを受け取る）
+
+        Returns:
+            int: 合計件数
+        """
+        total = 0
+        for batch in range(self.max_batches):
+            if batch:
+                await asyncio.sleep(self.batch_pause_seconds)
+            async with get_session_context() as db_session:
+                rows = await run_batch(db_session)
+            total += rows
+            if rows < self.batch_size:
+                break
+        return total
+
+    async def _delete_in_batches(self, model: Any, *conditions: Any) -> int:
+        """条件に一致する行を主キーで分割して削除"""
+
+        async def run_batch(db_session: Any) -> int:
+            result = await db_session.execute(
+                select(model.id).where(*conditions).limit(self.batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                return 0
+            await db_session.execute(
+                delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            return len(ids)
+
+        return await self._in_batches(run_batch)
+
+    async def reset_stale_processing(self) -> int:
+        """タイムアウトした処理中フラグをリセット"""
+
+        async def run_batch(db_session: Any) -> int:
+            return await SessionManager(db_session).reset_stale_processing_sessions(
+                timeout_minutes=settings.maintenance_stale_processing_minutes,
+                limit=self.batch_size,
+            )
+
+        return await self._in_batches(run_batch)
+
+    async def backfill_visitor_sketches(self) -> int:
+        """移行前の日次統計に public_sessions からユニーク訪問者スケッチを保存"""
+
+        async def run_batch(db_session: Any) -> int:
+            return await PublicAccessService(db_session).backfill_visitor_sketches(limit=self.batch_size)
+
+        return await self._in_batches(run_batch)
+
+    async def delete_expired_public_sessions(self) -> int:
+        """最終アクティビティから保持期間を過ぎた公開セッションを削除（未設定時は何もしない）"""
+        if settings.maintenance_public_session_retention_days <= 0:
+            return 0
+        threshold = datetime.now(timezone.utc) - timedelta(
+            days=settings.maintenance_public_session_retention_days
+        )
+        return await self._delete_in_batches(
+            PublicSessionModel, PublicSessionModel.last_activity_at < threshold
+        )
+
+    async def delete_old_cron_logs(self) -> int:
+        """保持期間を過ぎた Cron 実行ログを削除"""
+        threshold = datetime.now(timezone.utc) - timedelta(days=settings.cron_log_retention_days)
+        return await self._delete_in_batches(CronLogModel, CronLogModel.created_at < threshold)
+
+    async def remove_orphaned_workspaces(self) -> int:
+        """
+        孤立したワークスペースと SDK セッション状態を削除
+
+        - 期限切れ・削除済み公開セッションのワークスペース（常に実行）
+        - 削除済みプロジェクトのワークスペース
+          （maintenance_remove_orphaned_project_workspaces 有効時のみ）
+        - 上記の作業ディレクトリに対応する SDK セッション状態
+
+        プロジェクトが1件もない場合（DB の取り違えなど）はプロジェクト単位の削除を行いません。
+        作成直後のディレクトリを消さないよう、更新から maintenance_orphan_grace_hours
+        経過したものだけが対象です。
+
+        Returns:
+            int: 削除したディレクトリ数
+        """
+        removed = await run_public_workspace_gc()
+
+        workspace_candidates = await asyncio.to_thread(
+            self._stale_dirs, Path(settings.workspace_base), ""
+        )
+        state_candidates = await asyncio.to_thread(
+            self._stale_dirs, self._sdk_state_root(), _sdk_state_dir_name(settings.workspace_base) + "-"
+        )
+        deleted = await self._find_deleted_projects(set(workspace_candidates) | set(state_candidates))
+
+        if settings.maintenance_remove_orphaned_project_workspaces:
+            for project_id in deleted:
+                if project_id in workspace_candidates:
+                    await asyncio.to_thread(shutil.rmtree, workspace_candidates[project_id], True)
+                    logger.info("Removed orphaned project workspace", project_id=project_id)
+                    removed += 1
+        for project_id in deleted:
+            if project_id in state_candidates:
+                await asyncio.to_thread(shutil.rmtree, state_candidates[project_id], True)
+                removed += 1
+
+        removed += await asyncio.to_thread(self._remove_orphaned_overlay_state)
+        return removed
+
+    @staticmethod
+    def _sdk_state_root() -> Path:
+        """SDK セッション状態の配置先"""
+        return Path(os.path.expanduser(settings.sdk_state_path))
+
+    @staticmethod
+    def _stale_dirs(root: Path, prefix: str) -> Dict[str, Path]:
+        """
+        prefix + ID 形式の名前で、猶予期間より前から更新のないディレクトリ
+
+        Args:
+            root: 走査するディレクトリ
+            prefix: 名前の接頭辞
+
+        Returns:
+            Dict[str, Path]: ID -> ディレクトリ
+        """
+        if not root.is_dir():
+            return {}
+        grace = time.time() - settings.maintenance_orphan_grace_hours * 3600
+        found: Dict[str, Path] = {}
+        for entry in root.iterdir():
+            name = entry.name
+            if (
+                name.startswith(prefix)
+                and len(name) == len(prefix) + _ID_LENGTH
+                and entry.is_dir()
+                and entry.stat().st_mtime < grace
+            ):
+                found[name[len(prefix):]] = entry
+        return found
+
+    async def _find_deleted_projects(self, candidates: set) -> List[str]:
+        """
+        存在しないプロジェクトID（最大 batch_size 件）
+
+        Args:
+            candidates: 確認するプロジェクトID
+
+        Returns:
+            List[str]: 削除済みのプロジェクトID
+        """
+        if not candidates:
+            return []
+        candidate_list = sorted(candidates)
+        existing: set = set()
+        async with get_session_context() as db_session:
+            if not await db_session.scalar(select(func.count()).select_from(ProjectModel)):
+                logger.warning("No projects found, skipping orphaned workspace detection")
+                return []
+            for start in range(0, len(candidate_list), self.batch_size):
+                result = await db_session.execute(
+                    select(ProjectModel.id).where(
+                        ProjectModel.id.in_(candidate_list[start:start + self.batch_size])
+                    )
+                )
+                existing.update(result.scalars().all())
+        return [pid for pid in candidate_list if pid not in existing][:self.batch_size]
+
+    def _remove_orphaned_overlay_state(self) -> int:
+        """
+        ワークスペースが回収済みの公開セッションの SDK セッション状態を削除（ワーカースレッド）
+
+        Returns:
+            int: 削除したディレクトリ数
+        """
+        overlays = get_public_workspace_overlays()
+        # 作業ディレクトリは <overlay_path>/<session_id>/merged
+        prefix = _sdk_state_dir_name(str(overlays.base_path)) + "-"
+        suffix = "-merged"
+        root = self._sdk_state_root()
+        if not root.is_dir():
+            return 0
+        live = set(overlays.list_sessions())
+        grace = time.time() - settings.maintenance_orphan_grace_hours * 3600
+
+        removed = 0
+        for entry in root.iterdir():
+            name = entry.name
+            if not (name.startswith(prefix) and name.endswith(suffix)):
+                continue
+            session_id = name[len(prefix):-len(suffix)]
+            if session_id in live or not entry.is_dir() or entry.stat().st_mtime >= grace:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+            if removed >= self.batch_size:
+                break
+        if removed:
+            logger.info("Removed orphaned public SDK session state", count=removed)
+        return removed
+
+
+# グローバルインスタンス
+_maintenance_service: Optional[MaintenanceService] = None
+
+
+def get_maintenance_service() -> MaintenanceService:
+    """メンテナンスサービスを取得"""
+    global _maintenance_service
+
+    if _maintenance_service is None:
+        _maintenance_service = MaintenanceService()
+    return _maintenance_service
+
+
+async def shutdown_maintenance_service() -> None:
+    """メンテナンスサービスを停止"""
+    global _maintenance_service
+
+    if _maintenance_service:
+        await _maintenance_service.stop()
+        _maintenance_service = None
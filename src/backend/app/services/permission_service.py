@@ -4,9 +4,9 @@ Permission Service
 プロジェクトアクセス権限管理サービス
 """
 
-from typing import Optional
+from typing import Iterable, Optional, Set
 
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, union
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.database import ProjectModel, ProjectShareModel, UserModel
@@ -56,6 +56,37 @@ class PermissionService:
         permission = await self.get_permission_level(user_id, project_id)
         return permission is not None
 
+    async def filter_accessible_projects(
+        self, user_id: str, project_ids: Iterable[str]
+    ) -> Set[str]:
+        """
+        指定プロジェクトのうちユーザーがアクセスできるものを1クエリで取得
+
+        can_access_project と同じ条件（オーナーまたは共有）で判定します。
+
+        Args:
+            user_id: ユーザーID
+            project_ids: プロジェクトID一覧
+
+        Returns:
+            Set[str]: アクセス可能なプロジェクトID
+        """
+        project_ids = set(project_ids)
+        if not project_ids:
+            return set()
+
+        owned = select(ProjectModel.id).where(
+            ProjectModel.id.in_(project_ids),
+            ProjectModel.user_id == user_id,
+            ProjectModel.status != "deleted"
+        )
+        shared = select(ProjectShareModel.project_id).where(
+            ProjectShareModel.project_id.in_(project_ids),
+            ProjectShareModel.user_id == user_id
+        )
+        result = await self.session.execute(union(owned, shared))
+        return set(result.scalars().all())
+
     async def is_owner(self, user_id: str, project_id: str) -> bool:
         """
         ユーザーがプロジェクトのオーナーかどうか確認
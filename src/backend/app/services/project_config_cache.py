@@ -0,0 +1,243 @@
+"""
+Project Config Cache
+
+構築済みプロジェクト設定（ConfigBundle）のプロセス内キャッシュ
+
+チャット/公開メッセージごとに発生するプロジェクト取得と設定一覧クエリを
+省略します。プロジェクト単位のバージョンカウンターで整合性を管理し、
+プロジェクト・MCP Server・Agent・Skill・Command への書き込みが
+コミットされるとバージョンを進めます（読み込み中に更新された結果は登録されません）。
+REDIS_URL 設定時は無効化を Pub/Sub で他ワーカーへ通知します。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.database import (
+    ProjectAgentModel,
+    ProjectCommandModel,
+    ProjectMCPServerModel,
+    ProjectModel,
+    ProjectSkillModel,
+)
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+# 無効化通知用のPub/Subチャンネル
+INVALIDATION_CHANNEL = "project_config:invalidate"
+
+# 書き込み時に無効化対象となるモデル
+_CONFIG_MODELS = (
+    ProjectMCPServerModel,
+    ProjectAgentModel,
+    ProjectSkillModel,
+    ProjectCommandModel,
+)
+
+_SESSION_INFO_KEY = "config_invalidations"
+
+
+class ProjectConfigCache:
+    """
+    プロジェクト設定キャッシュ
+
+    責務:
+    - プロジェクト単位のバージョン管理
+    - バージョン一致・TTL内の ConfigBundle の返却
+    - 無効化のワーカー間通知（Redis Pub/Sub）
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 1000):
+        """
+        Args:
+            ttl_seconds: エントリの有効期間（通知の取りこぼし対策）
+            max_entries: 最大エントリ数
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.project_config_cache_ttl_seconds
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[int, float, Any]] = {}
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def version(self, project_id: str) -> int:
+        """プロジェクトの現在のバージョン"""
+        return self._versions.get(project_id, 0)
+
+    def get(self, project_id: str) -> Optional[Any]:
+        """
+        キャッシュ済みの ConfigBundle を取得
+
+        Args:
+            project_id: プロジェクトID
+
+        Returns:
+            Optional[ConfigBundle]: 有効なエントリ（なければ None）
+        """
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        version, stored_at, bundle = entry
+        if version != self.version(project_id) or time.monotonic() - stored_at > self.ttl_seconds:
+            self._entries.pop(project_id, None)
+            return None
+        return bundle
+
+    def set(self, project_id: str, version: int, bundle: Any) -> None:
+        """
+        ConfigBundle を登録
+
+        Args:
+            project_id: プロジェクトID
+            version: 読み込み開始時のバージョン（以降に更新されていれば登録しない）
+            bundle: 設定バンドル
+        """
+        if version != self.version(project_id):
+            return
+        if project_id not in self._entries and len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k][1])
+            del self._entries[oldest]
+        self._entries[project_id] = (version, time.monotonic(), bundle)
+
+    def invalidate(self, project_ids: Iterable[str], broadcast: bool = True) -> None:
+        """
+        バージョンを進めてエントリを破棄
+
+        Args:
+            project_ids: プロジェクトID
+            broadcast: 他ワーカーへ通知するか
+        """
+        project_ids = list(project_ids)
+        for project_id in project_ids:
+            self._versions[project_id] = self.version(project_id) + 1
+            self._entries.pop(project_id, None)
+
+        if broadcast and self._redis is not None and project_ids:
+            try:
+                asyncio.get_running_loop().create_task(self._publish(project_ids))
+            except RuntimeError:
+                pass
+
+    def clear(self) -> None:
+        """全エントリを破棄"""
+        self.invalidate(list(self._entries), broadcast=False)
+
+    async def _publish(self, project_ids: list) -> None:
+        """無効化を他ワーカーへ通知"""
+        try:
+            for project_id in project_ids:
+                await self._redis.publish(INVALIDATION_CHANNEL, project_id)
+        except Exception as e:
+            logger.warning("Failed to publish config invalidation", error=str(e))
+
+    async def start(self) -> None:
+        """他ワーカーからの無効化通知の購読を開始（REDIS_URL 未設定時は何もしない）"""
+        if not settings.redis_url or self._listener is not None:
+            return
+        self._redis = get_redis()
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Project config invalidation listener started")
+
+    async def _listen(self) -> None:
+        """無効化通知の受信ループ（切断時は再接続）"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                try:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        project_id = message["data"]
+                        if isinstance(project_id, bytes):
+                            project_id = project_id.decode()
+                        # 自ワーカーの通知も受信するが、バージョンが進むだけで無害
+                        self.invalidate([project_id], broadcast=False)
+                finally:
+                    # 共有クライアントの接続をプールに返却
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 切断中の更新を取りこぼす可能性があるため全件破棄
+                logger.warning("Config invalidation listener disconnected", error=str(e))
+                self.clear()
+                await asyncio.sleep(5)
+
+    async def stop(self) -> None:
+        """購読を停止"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._redis = None
+
+
+# グローバルキャッシュインスタンス
+_config_cache: Optional[ProjectConfigCache] = None
+
+
+def get_project_config_cache() -> ProjectConfigCache:
+    """プロジェクト設定キャッシュを取得"""
+    global _config_cache
+
+    if _config_cache is None:
+        _config_cache = ProjectConfigCache()
+    return _config_cache
+
+
+async def shutdown_project_config_cache() -> None:
+    """プロジェクト設定キャッシュの通知購読を停止"""
+    global _config_cache
+
+    if _config_cache:
+        await _config_cache.stop()
+        _config_cache = None
+
+
+def mark_project_config_changed(session: Session, project_id: str) -> None:
+    """
+    コミット時にプロジェクト設定キャッシュを無効化するよう登録
+
+    ORMのフラッシュは自動で登録されます。一括DELETE等で
+    ORMを経由しない書き込みを行った場合に明示的に呼び出します。
+
+    Args:
+        session: データベースセッション（AsyncSession の場合は sync_session）
+        project_id: プロジェクトID
+    """
+    session.info.setdefault(_SESSION_INFO_KEY, set()).add(project_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_config_changes(session: Session, flush_context) -> None:
+    """設定に関わるエンティティの書き込みを記録"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ProjectModel):
+            mark_project_config_changed(session, obj.id)
+        elif isinstance(obj, _CONFIG_MODELS):
+            mark_project_config_changed(session, obj.project_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    """コミット済みの設定変更でキャッシュを無効化"""
+    project_ids = session.info.pop(_SESSION_INFO_KEY, None)
+    if project_ids:
+        get_project_config_cache().invalidate(project_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_config_changes(session: Session) -> None:
+    """ロールバックされた変更は無効化しない"""
+    session.info.pop(_SESSION_INFO_KEY, None)
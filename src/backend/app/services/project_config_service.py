@@ -5,15 +5,16 @@ MCP Server, Agent, Skill, Command のCRUD操作
 """
 
 import os
-import shutil
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import JSON, Boolean, String, Text, literal, null, select, type_coerce, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.database import (
+    ProjectModel,
     ProjectMCPServerModel,
     ProjectAgentModel,
     ProjectSkillModel,
@@ -34,10 +35,50 @@ from app.schemas.project_config import (
     CommandResponse,
     ProjectConfigJSON,
 )
+from app.utils.fs_sync import SyncResult, sync_directory_async
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 差分同期のマニフェスト（.claude/ 直下）
+SKILLS_SYNC_MANIFEST = ".skills-sync.json"
+COMMANDS_SYNC_MANIFEST = ".commands-sync.json"
+
+# UNION ALL で取得する設定カラム（存在しないテーブルでは NULL）
+_CONFIG_UNION_COLUMNS = {
+    "id": String(36),
+    "project_id": String(36),
+    "name": String(100),
+    "enabled": Boolean(),
+    "description": String(500),
+    "category": String(50),
+    "command": String(500),
+    "args": JSON(),
+    "env": JSON(),
+    "enabled_tools": JSON(),
+    "model": String(50),
+    "tools": JSON(),
+    "system_prompt": Text(),
+    "content": Text(),
+}
+
+# 種別 -> (モデル, ProjectConfigRows の属性名)
+_CONFIG_SOURCES = {
+    "mcp_server": (ProjectMCPServerModel, "mcp_servers"),
+    "agent": (ProjectAgentModel, "agents"),
+    "skill": (ProjectSkillModel, "skills"),
+    "command": (ProjectCommandModel, "commands"),
+}
+
+
+@dataclass
+class ProjectConfigRows:
+    """1クエリで取得したプロジェクト設定（名前順）"""
+    mcp_servers: List[ProjectMCPServerModel] = field(default_factory=list)
+    agents: List[ProjectAgentModel] = field(default_factory=list)
+    skills: List[ProjectSkillModel] = field(default_factory=list)
+    commands: List[ProjectCommandModel] = field(default_factory=list)
+
 
 class ProjectConfigService:
     """プロジェクト設定サービス"""
@@ -53,74 +94,67 @@ class ProjectConfigService:
         """ワークスペースパス取得"""
         return Path(settings.workspace_base) / project_id
 
-    async def sync_skills_to_filesystem(self, project_id: str) -> None:
+    async def sync_skills_to_filesystem(self, project_id: str) -> SyncResult:
         """
         スキルをファイルシステムに同期
 
-        DBの有効なスキルを .claude/skills/ に書き出し
+        DBの有効なスキルを .claude/skills/ に差分同期
+        （変更されたファイルのみアトミックに書き込み、削除されたもののみ削除）
+
+        Returns:
+            SyncResult: 書き込み・削除したファイル数
         """
         workspace_path = self._get_workspace_path(project_id)
         skills_dir = workspace_path / ".claude" / "skills"
 
-        # 既存のスキルディレクトリをクリア
-        if skills_dir.exists():
-            shutil.rmtree(skills_dir)
-
         # 有効なスキルを取得
         skills = await self.list_skills(project_id, enabled_only=True)
 
-        if not skills:
-            logger.info("No skills to sync", project_id=project_id)
-            return
-
+        files: Dict[str, str] = {}
         for skill in skills:
             skill_name = skill.name.replace(" ", "-").lower()
             if not skill_name:
                 continue
 
-            skill_folder = skills_dir / skill_name
-            skill_folder.mkdir(parents=True, exist_ok=True)
-
-            # SKILL.md を作成
-            skill_file = skill_folder / "SKILL.md"
-            skill_content = f"""---
+            # SKILL.md
+            files[f"{skill_name}/SKILL.md"] = f"""---
 description: {skill.description or ''}
 category: {skill.category or 'custom'}
 ---
 
 {skill.content or ''}
 """
-            skill_file.write_text(skill_content, encoding="utf-8")
 
+        result = await sync_directory_async(
+            skills_dir, files, workspace_path / ".claude" / SKILLS_SYNC_MANIFEST
+        )
         logger.info(
             "Skills synced to filesystem",
             project_id=project_id,
-            count=len(skills),
+            count=len(files),
+            written=result.written,
+            deleted=result.deleted,
             path=str(skills_dir),
         )
+        return result
 
-    async def sync_commands_to_filesystem(self, project_id: str) -> None:
+    async def sync_commands_to_filesystem(self, project_id: str) -> SyncResult:
         """
         コマンドをファイルシステムに同期
 
-        DBの有効なコマンドを .claude/commands/ に書き出し
+        DBの有効なコマンドを .claude/commands/ に差分同期
+        （変更されたファイルのみアトミックに書き込み、削除されたもののみ削除）
+
+        Returns:
+            SyncResult: 書き込み・削除したファイル数
         """
         workspace_path = self._get_workspace_path(project_id)
         commands_dir = workspace_path / ".claude" / "commands"
 
-        # 既存のコマンドディレクトリをクリア
-        if commands_dir.exists():
-            shutil.rmtree(commands_dir)
-
         # 有効なコマンドを取得
         commands = await self.list_commands(project_id, enabled_only=True)
 
-        if not commands:
-            logger.info("No commands to sync", project_id=project_id)
-            return
-
-        commands_dir.mkdir(parents=True, exist_ok=True)
-
+        files: Dict[str, str] = {}
         for cmd in commands:
             cmd_name = cmd.name.replace(" ", "-").lower()
             if not cmd_name:
@@ -129,26 +163,29 @@ category: {skill.category or 'custom'}
             # カテゴリ別サブディレクトリ
             category = cmd.category or ""
             if category and category != "custom":
-                cmd_folder = commands_dir / category
-                cmd_folder.mkdir(parents=True, exist_ok=True)
-                cmd_file = cmd_folder / f"{cmd_name}.md"
+                relative_path = f"{category}/{cmd_name}.md"
             else:
-                cmd_file = commands_dir / f"{cmd_name}.md"
+                relative_path = f"{cmd_name}.md"
 
-            cmd_content = f"""---
+            files[relative_path] = f"""---
 description: {cmd.description or ''}
 ---
 
 {cmd.content or ''}
 """
-            cmd_file.write_text(cmd_content, encoding="utf-8")
 
+        result = await sync_directory_async(
+            commands_dir, files, workspace_path / ".claude" / COMMANDS_SYNC_MANIFEST
+        )
         logger.info(
             "Commands synced to filesystem",
             project_id=project_id,
-            count=len(commands),
+            count=len(files),
+            written=result.written,
+            deleted=result.deleted,
             path=str(commands_dir),
         )
+        return result
 
     # ============================================
     # MCP Server CRUD
@@ -481,16 +518,93 @@ description: {cmd.description or ''}
     # Aggregate Methods
     # ============================================
 
+    async def load_project_with_config(
+        self, project_id: str, enabled_only: bool = False
+    ) -> Optional[Tuple[ProjectModel, ProjectConfigRows]]:
+        """
+        プロジェクトと全設定（MCP Server, Agent, Skill, Command）を1クエリで取得
+
+        4テーブルを UNION ALL した結果をプロジェクトに LEFT JOIN します。
+        設定行はセッションに追加されない読み取り専用のモデルとして返します。
+
+        Args:
+            project_id: プロジェクトID
+            enabled_only: 有効な設定のみ取得するか
+
+        Returns:
+            Optional[Tuple[ProjectModel, ProjectConfigRows]]: プロジェクトが存在しない場合 None
+        """
+        selects = []
+        for kind, (model, _) in _CONFIG_SOURCES.items():
+            table_columns = model.__table__.c
+            columns = [literal(kind).label("kind")]
+            for name, type_ in _CONFIG_UNION_COLUMNS.items():
+                column = table_columns.get(name)
+                columns.append(
+                    (column if column is not None else type_coerce(null(), type_)).label(name)
+                )
+            stmt = select(*columns).where(table_columns.project_id == project_id)
+            if enabled_only:
+                stmt = stmt.where(table_columns.enabled == True)
+            selects.append(stmt)
+        config = union_all(*selects).subquery("config")
+
+        query = (
+            select(ProjectModel, config)
+            .outerjoin(config, config.c.project_id == ProjectModel.id)
+            .where(ProjectModel.id == project_id)
+            .order_by(config.c.kind, config.c.category, config.c.name)
+        )
+        result = await self.session.execute(query)
+
+        project: Optional[ProjectModel] = None
+        rows = ProjectConfigRows()
+        for row in result:
+            project = row[0]
+            if row.kind is None:
+                continue
+            model, attr = _CONFIG_SOURCES[row.kind]
+            values = {
+                name: getattr(row, name)
+                for name in _CONFIG_UNION_COLUMNS
+                if name in model.__table__.c
+            }
+            getattr(rows, attr).append(model(**values))
+
+        if project is None:
+            return None
+        return project, rows
+
+    async def get_project_with_config_json(
+        self, project_id: str
+    ) -> Optional[Tuple[ProjectModel, ProjectConfigJSON]]:
+        """
+        プロジェクトと AgentSdkClient 用の有効な設定を1クエリで取得
+
+        Returns:
+            Optional[Tuple[ProjectModel, ProjectConfigJSON]]: プロジェクトが存在しない場合 None
+        """
+        loaded = await self.load_project_with_config(project_id, enabled_only=True)
+        if loaded is None:
+            return None
+        project, rows = loaded
+        return project, self._to_config_json(rows)
+
     async def get_project_config_json(self, project_id: str) -> ProjectConfigJSON:
         """
         AgentSdkClient用のプロジェクト設定をJSON形式で取得
 
         有効な設定のみを返す
         """
-        mcp_servers = await self.list_mcp_servers(project_id, enabled_only=True)
-        agents = await self.list_agents(project_id, enabled_only=True)
-        skills = await self.list_skills(project_id, enabled_only=True)
-        commands = await self.list_commands(project_id, enabled_only=True)
+        loaded = await self.load_project_with_config(project_id, enabled_only=True)
+        return self._to_config_json(loaded[1] if loaded else ProjectConfigRows())
+
+    def _to_config_json(self, rows: ProjectConfigRows) -> ProjectConfigJSON:
+        """取得済みの設定行を ProjectConfigJSON に変換"""
+        mcp_servers = rows.mcp_servers
+        agents = rows.agents
+        skills = rows.skills
+        commands = rows.commands
 
         return ProjectConfigJSON(
             mcp_servers=[
@@ -0,0 +1,364 @@
+"""
+Public Access Cache
+
+公開トークン解決結果のプロセス内キャッシュ
+
+公開APIの各リクエストで発生する ProjectPublicAccessModel + ProjectModel の
+取得を省略します。存在しないトークンも短時間キャッシュ（ネガティブキャッシュ）し、
+無効なリンクへの連続アクセスでもDBに到達しないようにします。
+公開設定・プロジェクトへの書き込みがコミットされると該当エントリを即時破棄します。
+REDIS_URL 設定時は無効化を Pub/Sub で他ワーカーへ通知します（未設定時は
+他ワーカーでの変更は TTL 経過で反映されるため、セッション作成はキャッシュを使用しません）。
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.database import ProjectModel, ProjectPublicAccessModel
+from app.utils.ip_allowlist import IPAllowlist
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+_SESSION_INFO_KEY = "public_access_invalidations"
+
+# 無効化通知用のPub/Subチャンネル
+INVALIDATION_CHANNEL = "public_access:invalidate"
+
+
+@dataclass(frozen=True)
+class PublicProjectInfo:
+    """公開プロジェクトの表示情報"""
+    id: str
+    name: str
+    description: Optional[str]
+
+
+@dataclass(frozen=True)
+class PublicAccessSnapshot:
+    """
+    トークン解決結果（ProjectPublicAccessModel の読み取り専用スナップショット）
+
+    セッションに紐付かないため、リクエスト間で共有しても安全です。
+    """
+    id: str
+    project_id: str
+    access_token: str
+    enabled: bool
+    password_hash: Optional[str]
+    allowed_ips: Optional[Tuple[str, ...]]
+    max_sessions_per_day: Optional[int]
+    max_messages_per_session: Optional[int]
+    expires_at: Optional[datetime]
+    project: Optional[PublicProjectInfo]
+    ip_allowlist: Optional[IPAllowlist] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_model(cls, model: ProjectPublicAccessModel) -> "PublicAccessSnapshot":
+        """
+        ORMモデルからスナップショットを作成
+
+        Args:
+            model: 外部公開設定（project をロード済み）
+
+        Returns:
+            PublicAccessSnapshot: スナップショット
+        """
+        project = model.project
+        return cls(
+            id=model.id,
+            project_id=model.project_id,
+            access_token=model.access_token,
+            enabled=model.enabled,
+            password_hash=model.password_hash,
+            allowed_ips=tuple(model.allowed_ips) if model.allowed_ips else None,
+            # 保存済みの不正エントリは従来どおり無視する
+            ip_allowlist=(
+                IPAllowlist.compile(model.allowed_ips, strict=False) if model.allowed_ips else None
+            ),
+            max_sessions_per_day=model.max_sessions_per_day,
+            max_messages_per_session=model.max_messages_per_session,
+            expires_at=model.expires_at,
+            project=(
+                PublicProjectInfo(id=project.id, name=project.name, description=project.description)
+                if project is not None else None
+            ),
+        )
+
+
+class PublicAccessCache:
+    """
+    公開トークン解決キャッシュ
+
+    責務:
+    - トークン -> スナップショット（または未登録）の TTL 付き LRU キャッシュ
+    - トークン・プロジェクト単位の無効化
+    - 無効化のワーカー間通知（Redis Pub/Sub）
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        max_entries: int = 10000,
+    ):
+        """
+        Args:
+            ttl_seconds: 解決済みトークンの有効期間
+            negative_ttl_seconds: 未登録トークンの有効期間
+            max_entries: 最大エントリ数
+        """
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else settings.public_access_cache_ttl_seconds
+        )
+        self.negative_ttl_seconds = (
+            negative_ttl_seconds if negative_ttl_seconds is not None
+            else settings.public_access_negative_cache_ttl_seconds
+        )
+        self.max_entries = max_entries
+        # token -> (期限, スナップショット or None)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[PublicAccessSnapshot]]]" = OrderedDict()
+        # project_id -> tokens
+        self._tokens_by_project: Dict[str, Set[str]] = {}
+        # 世代番号（読み込み中に無効化された結果を登録しないため）
+        self._generation = 0
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def generation(self) -> int:
+        """現在の世代番号"""
+        return self._generation
+
+    def lookup(self, token: str) -> Tuple[bool, Optional[PublicAccessSnapshot]]:
+        """
+        キャッシュを参照
+
+        Args:
+            token: 公開アクセストークン
+
+        Returns:
+            Tuple[bool, Optional[PublicAccessSnapshot]]: (ヒットしたか, スナップショット)
+            未登録トークンのネガティブキャッシュは (True, None)
+        """
+        entry = self._entries.get(token)
+        if entry is None:
+            return False, None
+        expires_at, snapshot = entry
+        if time.monotonic() >= expires_at:
+            self._discard(token)
+            return False, None
+        self._entries.move_to_end(token)
+        return True, snapshot
+
+    def store(
+        self, token: str, snapshot: Optional[PublicAccessSnapshot], generation: int
+    ) -> None:
+        """
+        解決結果を登録
+
+        Args:
+            token: 公開アクセストークン
+            snapshot: スナップショット（未登録トークンの場合 None）
+            generation: 読み込み開始時の世代番号（以降に無効化されていれば登録しない）
+        """
+        if generation != self._generation:
+            return
+        ttl = self.ttl_seconds if snapshot is not None else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        self._discard(token)
+        while len(self._entries) >= self.max_entries:
+            self._discard(next(iter(self._entries)))
+        self._entries[token] = (time.monotonic() + ttl, snapshot)
+        if snapshot is not None:
+            self._tokens_by_project.setdefault(snapshot.project_id, set()).add(token)
+
+    def _discard(self, token: str) -> None:
+        """エントリを削除"""
+        entry = self._entries.pop(token, None)
+        if entry is None or entry[1] is None:
+            return
+        project_id = entry[1].project_id
+        tokens = self._tokens_by_project.get(project_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_project[project_id]
+
+    def invalidate(
+        self,
+        tokens: Iterable[str] = (),
+        project_ids: Iterable[str] = (),
+        broadcast: bool = True,
+    ) -> None:
+        """
+        トークン・プロジェクト単位でエントリを破棄
+
+        Args:
+            tokens: 公開アクセストークン
+            project_ids: プロジェクトID（そのプロジェクトの全トークン）
+            broadcast: 他ワーカーへ通知するか
+        """
+        tokens = list(tokens)
+        project_ids = list(project_ids)
+        self._generation += 1
+        for token in tokens:
+            self._discard(token)
+        for project_id in project_ids:
+            for token in list(self._tokens_by_project.get(project_id, ())):
+                self._discard(token)
+
+        if broadcast and self._redis is not None and (tokens or project_ids):
+            try:
+                asyncio.get_running_loop().create_task(self._publish(tokens, project_ids))
+            except RuntimeError:
+                pass
+
+    def clear(self) -> None:
+        """全エントリを破棄"""
+        self._generation += 1
+        self._entries.clear()
+        self._tokens_by_project.clear()
+
+    async def _publish(self, tokens: list, project_ids: list) -> None:
+        """無効化を他ワーカーへ通知"""
+        try:
+            await self._redis.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"tokens": tokens, "project_ids": project_ids}),
+            )
+        except Exception as e:
+            logger.warning("Failed to publish public access invalidation", error=str(e))
+
+    async def start(self) -> None:
+        """他ワーカーからの無効化通知の購読を開始（REDIS_URL 未設定時は何もしない）"""
+        if not settings.redis_url or self._listener is not None:
+            return
+        self._redis = get_redis()
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Public access invalidation listener started")
+
+    async def _listen(self) -> None:
+        """無効化通知の受信ループ（切断時は再接続）"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                try:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            payload = json.loads(message["data"])
+                        except (TypeError, ValueError):
+                            continue
+                        # 自ワーカーの通知も受信するが、世代が進むだけで無害
+                        self.invalidate(
+                            payload.get("tokens", ()),
+                            payload.get("project_ids", ()),
+                            broadcast=False,
+                        )
+                finally:
+                    # 共有クライアントの接続をプールに返却
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 切断中の更新を取りこぼす可能性があるため全件破棄
+                logger.warning("Public access invalidation listener disconnected", error=str(e))
+                self.clear()
+                await asyncio.sleep(5)
+
+    async def stop(self) -> None:
+        """購読を停止"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._redis = None
+
+
+# グローバルキャッシュインスタンス
+_public_access_cache: Optional[PublicAccessCache] = None
+
+
+def get_public_access_cache() -> PublicAccessCache:
+    """公開トークン解決キャッシュを取得"""
+    global _public_access_cache
+
+    if _public_access_cache is None:
+        _public_access_cache = PublicAccessCache()
+    return _public_access_cache
+
+
+async def shutdown_public_access_cache() -> None:
+    """公開トークン解決キャッシュの通知購読を停止"""
+    global _public_access_cache
+
+    if _public_access_cache:
+        await _public_access_cache.stop()
+        _public_access_cache = None
+
+
+def _pending(session: Session) -> Tuple[Set[str], Set[str]]:
+    """セッションに記録した無効化対象（tokens, project_ids）"""
+    return session.info.setdefault(_SESSION_INFO_KEY, (set(), set()))
+
+
+def mark_public_access_changed(session: Session, project_id: str) -> None:
+    """
+    コミット時にプロジェクトの公開トークンを無効化するよう登録
+
+    ORMのフラッシュは自動で登録されます。一括DELETE等で
+    ORMを経由しない書き込みを行った場合に明示的に呼び出します。
+
+    Args:
+        session: データベースセッション（AsyncSession の場合は sync_session）
+        project_id: プロジェクトID
+    """
+    _pending(session)[1].add(project_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_public_access_changes(session: Session, flush_context) -> None:
+    """公開設定・プロジェクトの書き込みを記録（再生成前のトークンも含む）"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ProjectPublicAccessModel):
+            tokens, project_ids = _pending(session)
+            history = inspect(obj).attrs.access_token.history
+            tokens.update(t for t in (history.deleted or ()) if t)
+            if obj.access_token:
+                tokens.add(obj.access_token)
+            if obj.project_id:
+                project_ids.add(obj.project_id)
+        elif isinstance(obj, ProjectModel):
+            mark_public_access_changed(session, obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_public_access(session: Session) -> None:
+    """コミット済みの変更でキャッシュを無効化"""
+    pending = session.info.pop(_SESSION_INFO_KEY, None)
+    if pending and _public_access_cache is not None:
+        tokens, project_ids = pending
+        _public_access_cache.invalidate(tokens, project_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_public_access_changes(session: Session) -> None:
+    """ロールバックされた変更は無効化しない"""
+    session.info.pop(_SESSION_INFO_KEY, None)
@@ -5,13 +5,13 @@ Public Access Service
 """
 
 import secrets
-import ipaddress
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from typing import Optional
 import bcrypt
 import jwt
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_, case, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -21,13 +21,22 @@ from app.models.database import (
     ProjectCommandModel,
     ProjectPublicAccessModel,
     CommandPublicSettingModel,
+    PublicAccessDailyStatsModel,
     PublicSessionModel,
 )
+from app.services.public_access_cache import PublicAccessSnapshot, get_public_access_cache
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.ip_allowlist import IPAllowlist, validate_allowed_ips
 
 
 settings = get_settings()
 
 
+def _utc_today() -> date:
+    """当日（UTC）の日付"""
+    return datetime.now(timezone.utc).date()
+
+
 class PublicAccessService:
     """外部公開サービス"""
 
@@ -57,7 +66,13 @@ class PublicAccessService:
         max_messages_per_session: Optional[int] = None,
         expires_at: Optional[datetime] = None,
     ) -> ProjectPublicAccessModel:
-        """外部公開設定を作成"""
+        """外部公開設定を作成
+
+        Raises:
+            ValueError: 設定済みの場合、または許可IPリストに不正なエントリを含む場合
+        """
+        allowed_ips = validate_allowed_ips(allowed_ips)
+
         # 既存チェック
         existing = await self.get_public_access(project_id)
         if existing:
@@ -102,7 +117,14 @@ class PublicAccessService:
         expires_at: Optional[datetime] = None,
         clear_expires_at: bool = False,
     ) -> Optional[ProjectPublicAccessModel]:
-        """外部公開設定を更新"""
+        """外部公開設定を更新
+
+        Raises:
+            ValueError: 許可IPリストに不正なエントリを含む場合
+        """
+        if allowed_ips is not None:
+            allowed_ips = validate_allowed_ips(allowed_ips) or []
+
         public_access = await self.get_public_access(project_id)
         if not public_access:
             return None
@@ -186,6 +208,9 @@ class PublicAccessService:
                 "command_description": cmd.description,
                 "is_public": cmd.public_setting.is_public if cmd.public_setting else False,
                 "priority": cmd.public_setting.priority if cmd.public_setting else 0,
+                "result_cache_ttl_seconds": (
+                    cmd.public_setting.result_cache_ttl_seconds if cmd.public_setting else None
+                ),
             }
             for cmd in commands
         ]
@@ -195,6 +220,7 @@ class PublicAccessService:
         command_id: str,
         is_public: bool,
         priority: int = 0,
+        result_cache_ttl_seconds: Optional[int] = None,
     ) -> Optional[CommandPublicSettingModel]:
         """コマンド公開設定を更新（なければ作成）"""
         # コマンド存在確認
@@ -216,11 +242,13 @@ class PublicAccessService:
         if setting:
             setting.is_public = is_public
             setting.priority = priority
+            setting.result_cache_ttl_seconds = result_cache_ttl_seconds
         else:
             setting = CommandPublicSettingModel(
                 command_id=command_id,
                 is_public=is_public,
                 priority=priority,
+                result_cache_ttl_seconds=result_cache_ttl_seconds,
             )
             self.db.add(setting)
 
@@ -267,102 +295,223 @@ class PublicAccessService:
         return list(sessions), total
 
     async def get_public_access_stats(self, project_id: str) -> dict:
-        """アクセス統計を取得"""
-        public_access = await self.get_public_access(project_id)
-        if not public_access:
-            return {
-                "total_sessions": 0,
-                "today_sessions": 0,
-                "total_messages": 0,
-                "unique_ips": 0,
-            }
+        """アクセス統計を取得
 
-        # 今日の開始時刻
-        today_start = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
+        日次統計ロールアップのみを1クエリで参照します（public_sessions は走査しない）。
+        ユニークIP数は日別 HyperLogLog スケッチの合算による推定値です。
+        読み取りのみで、移行前の日付のスケッチはメンテナンスで保存されます。
+        """
+        daily = PublicAccessDailyStatsModel
+        result = await self.db.execute(
+            select(
+                ProjectPublicAccessModel.id,
+                daily.stat_date,
+                daily.session_count,
+                daily.message_count,
+                daily.visitor_sketch,
+            )
+            .select_from(ProjectPublicAccessModel)
+            .outerjoin(daily, daily.public_access_id == ProjectPublicAccessModel.id)
+            .where(ProjectPublicAccessModel.project_id == project_id)
         )
+        rows = [row for row in result.all() if row.stat_date is not None]
+
+        # 移行前の日付はメンテナンスで保存されるまでメモリ上で構築
+        missing: dict[str, list[date]] = {}
+        for row in rows:
+            if row.visitor_sketch is None:
+                missing.setdefault(row.id, []).append(row.stat_date)
+        built: dict[tuple[str, date], bytes] = {}
+        for public_access_id, dates in missing.items():
+            for stat_date, sketch in (await self._build_visitor_sketches(public_access_id, dates)).items():
+                built[(public_access_id, stat_date)] = sketch
+
+        today = _utc_today()
+        visitors = HyperLogLog()
+        for row in rows:
+            sketch = row.visitor_sketch or built.get((row.id, row.stat_date))
+            if sketch:
+                visitors.merge(HyperLogLog(sketch))
 
-        # 総セッション数
-        total_result = await self.db.execute(
-            select(func.count(PublicSessionModel.id)).where(
-                PublicSessionModel.public_access_id == public_access.id
+        return {
+            "total_sessions": sum(row.session_count for row in rows),
+            "today_sessions": sum(row.session_count for row in rows if row.stat_date == today),
+            "total_messages": sum(row.message_count for row in rows),
+            "unique_ips": visitors.estimate(),
+        }
+
+    async def _build_visitor_sketches(
+        self, public_access_id: str, dates: list[date]
+    ) -> dict[date, bytes]:
+        """visitor_sketch が未構築の日付について public_sessions からスケッチを構築（保存しない）"""
+        day = func.date(PublicSessionModel.created_at)
+        result = await self.db.execute(
+            select(day, PublicSessionModel.ip_address)
+            .where(
+                PublicSessionModel.public_access_id == public_access_id,
+                day.in_([d.isoformat() for d in dates]),
             )
+            .distinct()
         )
-        total_sessions = total_result.scalar() or 0
+        ips_by_date: dict[str, list[str]] = {}
+        for session_day, ip_address in result.all():
+            ips_by_date.setdefault(str(session_day)[:10], []).append(ip_address)
 
-        # 今日のセッション数
-        today_result = await self.db.execute(
-            select(func.count(PublicSessionModel.id)).where(
-                and_(
-                    PublicSessionModel.public_access_id == public_access.id,
-                    PublicSessionModel.created_at >= today_start,
-                )
-            )
+        return {
+            stat_date: HyperLogLog.from_values(ips_by_date.get(stat_date.isoformat(), ())).to_bytes()
+            for stat_date in dates
+        }
+
+    async def backfill_visitor_sketches(self, limit: int) -> int:
+        """移行前の日次統計の visitor_sketch を構築して保存（メンテナンスから呼び出し）
+
+        コミットは呼び出し側で行います。
+
+        Args:
+            limit: 1回で処理する最大行数
+
+        Returns:
+            int: 処理した行数
+        """
+        daily = PublicAccessDailyStatsModel
+        result = await self.db.execute(
+            select(daily.public_access_id, daily.stat_date)
+            .where(daily.visitor_sketch.is_(None))
+            .order_by(daily.public_access_id, daily.stat_date)
+            .limit(limit)
         )
-        today_sessions = today_result.scalar() or 0
+        pending: dict[str, list[date]] = {}
+        for public_access_id, stat_date in result.all():
+            pending.setdefault(public_access_id, []).append(stat_date)
+
+        for public_access_id, dates in pending.items():
+            sketches = await self._build_visitor_sketches(public_access_id, dates)
+            for stat_date, sketch in sketches.items():
+                await self.db.execute(
+                    update(daily)
+                    .where(
+                        daily.public_access_id == public_access_id,
+                        daily.stat_date == stat_date,
+                        daily.visitor_sketch.is_(None),
+                    )
+                    .values(visitor_sketch=sketch)
+                    .execution_options(synchronize_session=False)
+                )
+        return sum(len(dates) for dates in pending.values())
 
-        # 総メッセージ数
-        msg_result = await self.db.execute(
-            select(func.sum(PublicSessionModel.message_count)).where(
-                PublicSessionModel.public_access_id == public_access.id
+    async def _record_daily_session(self, public_access_id: str, ip_address: str) -> None:
+        """日次統計にセッションと訪問者を加算
+
+        スケッチの読み込み〜書き込みは行ロック下で行います
+        （同一公開設定のセッション作成は当日カウンターの更新で直列化済み）。
+        """
+        today = _utc_today()
+        result = await self.db.execute(
+            select(PublicAccessDailyStatsModel)
+            .where(
+                PublicAccessDailyStatsModel.public_access_id == public_access_id,
+                PublicAccessDailyStatsModel.stat_date == today,
             )
+            .with_for_update()
         )
-        total_messages = msg_result.scalar() or 0
-
-        # ユニークIP数
-        ip_result = await self.db.execute(
-            select(func.count(func.distinct(PublicSessionModel.ip_address))).where(
-                PublicSessionModel.public_access_id == public_access.id
+        stats = result.scalar_one_or_none()
+        if stats is None:
+            self.db.add(PublicAccessDailyStatsModel(
+                public_access_id=public_access_id,
+                stat_date=today,
+                session_count=1,
+                message_count=0,
+                visitor_sketch=HyperLogLog.from_values([ip_address]).to_bytes(),
+            ))
+            return
+
+        stats.session_count = PublicAccessDailyStatsModel.session_count + 1
+        # NULL（移行前の日付）はメンテナンスで public_sessions から構築する
+        if stats.visitor_sketch is not None:
+            sketch = HyperLogLog(stats.visitor_sketch)
+            if sketch.add(ip_address):
+                stats.visitor_sketch = sketch.to_bytes()
+
+    async def _record_daily_messages(self, public_access_id: str, delta: int) -> None:
+        """日次統計のメッセージ数を加減算（同一トランザクション内）"""
+        today = _utc_today()
+        stmt = (
+            update(PublicAccessDailyStatsModel)
+            .where(
+                PublicAccessDailyStatsModel.public_access_id == public_access_id,
+                PublicAccessDailyStatsModel.stat_date == today,
             )
+            .values(message_count=PublicAccessDailyStatsModel.message_count + delta)
+            .execution_options(synchronize_session=False)
         )
-        unique_ips = ip_result.scalar() or 0
+        result = await self.db.execute(stmt)
+        if result.rowcount or delta < 0:
+            return
 
-        return {
-            "total_sessions": total_sessions,
-            "today_sessions": today_sessions,
-            "total_messages": total_messages,
-            "unique_ips": unique_ips,
-        }
+        # 当日の行がない場合は作成（同時作成と競合したら加算し直す）
+        try:
+            async with self.db.begin_nested():
+                self.db.add(PublicAccessDailyStatsModel(
+                    public_access_id=public_access_id,
+                    stat_date=today,
+                    session_count=0,
+                    message_count=delta,
+                    visitor_sketch=HyperLogLog().to_bytes(),
+                ))
+        except IntegrityError:
+            await self.db.execute(stmt)
 
     # ============================================
     # Public API (認証不要)
     # ============================================
 
     async def get_public_access_by_token(
-        self, token: str
-    ) -> Optional[ProjectPublicAccessModel]:
-        """トークンから公開設定を取得"""
+        self, token: str, use_cache: bool = True
+    ) -> Optional[PublicAccessSnapshot]:
+        """トークンから公開設定を取得
+
+        解決結果（存在しないトークンを含む）は短時間キャッシュされ、
+        公開設定・プロジェクトの更新コミット時に破棄されます。
+
+        Args:
+            token: 公開アクセストークン
+            use_cache: キャッシュを参照するか（False の場合もDBの結果で更新）
+
+        Returns:
+            公開設定のスナップショット、またはNone（トークンが存在しない場合）
+        """
+        cache = get_public_access_cache()
+        if use_cache:
+            hit, snapshot = cache.lookup(token)
+            if hit:
+                return snapshot
+
+        generation = cache.generation
         result = await self.db.execute(
             select(ProjectPublicAccessModel)
             .options(selectinload(ProjectPublicAccessModel.project))
             .where(ProjectPublicAccessModel.access_token == token)
         )
-        return result.scalar_one_or_none()
+        public_access = result.scalar_one_or_none()
+        snapshot = PublicAccessSnapshot.from_model(public_access) if public_access else None
+        cache.store(token, snapshot, generation)
+        return snapshot
 
     def check_ip_allowed(
         self, public_access: ProjectPublicAccessModel, client_ip: str
     ) -> bool:
-        """IPアドレスが許可されているかチェック"""
+        """IPアドレスが許可されているかチェック
+
+        トークン解決キャッシュのスナップショットはコンパイル済みの
+        許可リストを保持しているため、リクエストごとの再解析は発生しません。
+        """
         if not public_access.allowed_ips:
             return True
 
-        try:
-            client_addr = ipaddress.ip_address(client_ip)
-            for allowed in public_access.allowed_ips:
-                try:
-                    # CIDR記法対応
-                    if "/" in allowed:
-                        network = ipaddress.ip_network(allowed, strict=False)
-                        if client_addr in network:
-                            return True
-                    else:
-                        if client_addr == ipaddress.ip_address(allowed):
-                            return True
-                except ValueError:
-                    continue
-            return False
-        except ValueError:
-            return False
+        allowlist = getattr(public_access, "ip_allowlist", None)
+        if allowlist is None:
+            allowlist = IPAllowlist.compile(public_access.allowed_ips, strict=False)
+        return allowlist.contains(client_ip)
 
     def check_expired(self, public_access: ProjectPublicAccessModel) -> bool:
         """期限切れかチェック"""
@@ -373,25 +522,61 @@ class PublicAccessService:
     async def check_session_limit(
         self, public_access: ProjectPublicAccessModel
     ) -> bool:
-        """今日のセッション上限に達しているかチェック"""
+        """今日のセッション上限に達しているかチェック
+
+        当日セッション数カウンター（主キー参照1回）で判定します。
+        作成時の判定は create_public_session がアトミックに行います。
+        """
         if not public_access.max_sessions_per_day:
             return False
 
-        today_start = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
+        result = await self.db.execute(
+            select(
+                ProjectPublicAccessModel.session_count_date,
+                ProjectPublicAccessModel.session_count_today,
+            ).where(ProjectPublicAccessModel.id == public_access.id)
         )
+        row = result.one_or_none()
+        if not row or row.session_count_date != _utc_today():
+            return False
+
+        return row.session_count_today >= public_access.max_sessions_per_day
+
+    async def _claim_session_slot(self, public_access_id: str) -> bool:
+        """当日セッション数の上限判定と加算を条件付きUPDATE1回で行う
 
+        Returns:
+            枠を確保できた場合 True（上限到達時は False）
+        """
+        today = _utc_today()
+        model = ProjectPublicAccessModel
         result = await self.db.execute(
-            select(func.count(PublicSessionModel.id)).where(
-                and_(
-                    PublicSessionModel.public_access_id == public_access.id,
-                    PublicSessionModel.created_at >= today_start,
-                )
+            update(model)
+            .where(
+                model.id == public_access_id,
+                or_(
+                    model.max_sessions_per_day.is_(None),
+                    model.session_count_date.is_(None),
+                    model.session_count_date != today,
+                    model.session_count_today < model.max_sessions_per_day,
+                ),
             )
+            # MySQL は SET を左から評価するため、日付の更新より先にカウンターを計算する
+            .ordered_values(
+                (
+                    model.session_count_today,
+                    case(
+                        (model.session_count_date == today, model.session_count_today + 1),
+                        else_=1,
+                    ),
+                ),
+                (model.session_count_date, today),
+                # カウンター更新で設定の更新日時を変えない
+                (model.updated_at, model.updated_at),
+            )
+            .execution_options(synchronize_session=False)
         )
-        today_count = result.scalar() or 0
-
-        return today_count >= public_access.max_sessions_per_day
+        return result.rowcount == 1
 
     def verify_password(
         self, public_access: ProjectPublicAccessModel, password: str
@@ -465,6 +650,9 @@ class PublicAccessService:
 
         Returns:
             作成されたセッション、またはNone（コマンドが無効な場合）
+
+        Raises:
+            ValueError: 当日のセッション上限に達している場合
         """
         # コマンドIDが指定された場合、公開されているか確認
         if command_id:
@@ -483,6 +671,11 @@ class PublicAccessService:
             if not command:
                 return None
 
+        # 当日セッション数の上限判定と加算（セッション作成と同一トランザクション）
+        if not await self._claim_session_slot(public_access.id):
+            await self.db.rollback()
+            raise ValueError("Daily session limit reached")
+
         session = PublicSessionModel(
             public_access_id=public_access.id,
             command_id=command_id,  # Noneの場合はフリーチャット
@@ -490,6 +683,7 @@ class PublicAccessService:
             user_agent=user_agent,
             message_count=0,
         )
+        await self._record_daily_session(public_access.id, ip_address)
 
         self.db.add(session)
         await self.db.commit()
@@ -505,41 +699,93 @@ class PublicAccessService:
             select(PublicSessionModel)
             .options(
                 selectinload(PublicSessionModel.public_access),
-                selectinload(PublicSessionModel.command),
+                selectinload(PublicSessionModel.command).selectinload(
+                    ProjectCommandModel.public_setting
+                ),
             )
             .where(PublicSessionModel.id == session_id)
         )
         return result.scalar_one_or_none()
 
-    async def increment_message_count(self, session_id: str) -> bool:
-        """メッセージカウントをインクリメント"""
+    async def increment_message_count(
+        self,
+        session_id: str,
+        max_messages: Optional[int] = None,
+        public_access_id: Optional[str] = None,
+    ) -> bool:
+        """メッセージカウントをインクリメント
+
+        上限判定と加算を条件付きUPDATE1回で行うため、
+        同一セッションへの同時送信でも上限を超えません。
+
+        Args:
+            session_id: 公開セッションID
+            max_messages: セッションあたり最大メッセージ数（None は無制限）
+            public_access_id: 外部公開設定ID（指定時は日次統計にも加算）
+
+        Returns:
+            加算できた場合 True（セッションが存在しない・上限到達時は False）
+        """
+        conditions = [PublicSessionModel.id == session_id]
+        if max_messages:
+            conditions.append(PublicSessionModel.message_count < max_messages)
+
         result = await self.db.execute(
-            select(PublicSessionModel).where(PublicSessionModel.id == session_id)
+            update(PublicSessionModel)
+            .where(*conditions)
+            .values(
+                message_count=PublicSessionModel.message_count + 1,
+                last_activity_at=datetime.now(timezone.utc),
+            )
+            .execution_options(synchronize_session=False)
         )
-        session = result.scalar_one_or_none()
-        if not session:
-            return False
-
-        session.message_count += 1
-        session.last_activity_at = datetime.now(timezone.utc)
+        counted = result.rowcount == 1
+        if counted and public_access_id:
+            await self._record_daily_messages(public_access_id, 1)
+        await self.db.commit()
+        return counted
 
+    async def decrement_message_count(
+        self, session_id: str, public_access_id: Optional[str] = None
+    ) -> None:
+        """処理に失敗したメッセージのカウントを戻す"""
+        result = await self.db.execute(
+            update(PublicSessionModel)
+            .where(
+                PublicSessionModel.id == session_id,
+                PublicSessionModel.message_count > 0,
+            )
+            .values(message_count=PublicSessionModel.message_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1 and public_access_id:
+            await self._record_daily_messages(public_access_id, -1)
         await self.db.commit()
-        return True
 
     async def check_message_limit(self, session: PublicSessionModel) -> bool:
-        """メッセージ上限に達しているかチェック"""
-        if not session.public_access:
-            # リレーションがロードされていない場合は再取得
+        """メッセージ上限に達しているかチェック（表示用）"""
+        if "public_access" in session.__dict__:
+            max_messages = (
+                session.public_access.max_messages_per_session
+                if session.public_access else None
+            )
+            message_count = session.message_count
+        else:
+            # リレーションがロードされていない場合は上限とカウントのみ取得
             result = await self.db.execute(
-                select(PublicSessionModel)
-                .options(selectinload(PublicSessionModel.public_access))
+                select(
+                    PublicSessionModel.message_count,
+                    ProjectPublicAccessModel.max_messages_per_session,
+                )
+                .join(ProjectPublicAccessModel)
                 .where(PublicSessionModel.id == session.id)
             )
-            session = result.scalar_one_or_none()
-            if not session:
+            row = result.one_or_none()
+            if not row:
                 return True
+            message_count, max_messages = row
 
-        if not session.public_access.max_messages_per_session:
+        if not max_messages:
             return False
 
-        return session.message_count >= session.public_access.max_messages_per_session
+        return message_count >= max_messages
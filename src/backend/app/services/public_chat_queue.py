@@ -0,0 +1,312 @@
+"""
+Public Chat Queue
+
+公開チャットの同時実行数制御
+
+公開アクセス（トークン）ごとにエージェントの同時実行数を制限し、
+上限を超えたメッセージはセッションをまたいだ FIFO で待機させます。
+各セッションの処理中メッセージは1件までのため、先着順がそのまま
+セッション間の公平性になります。待機中は順番が変わるたびに通知します。
+
+REDIS_URL 設定時は実行枠と待機順を Redis で共有し、ワーカー数によらず
+トークンごとの同時実行数を守ります（実行中はリースを延長し、
+ワーカーが停止した場合はリース期限切れで枠が解放されます）。
+未設定時の上限はワーカープロセスごとに適用されます。
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+# 待機順の通知先（セッションID, 1始まりの順番）
+PositionCallback = Callable[[str, int], Awaitable[None]]
+
+# 共有実行枠のリース期間・延長間隔・待機中の再試行間隔（秒）
+_SHARED_LEASE_SECONDS = 30
+_SHARED_RENEW_INTERVAL = 10
+_SHARED_POLL_INTERVAL = 0.5
+
+# KEYS[1]: 実行中 ZSET（member -> リース期限 ms）
+# KEYS[2]: 待機 ZSET（member -> 待機開始 ms）
+# KEYS[3]: 待機者の生存期限 ZSET（member -> 期限 ms）
+# ARGV: now_ms, lease_ms, max_concurrent, max_waiting, member
+# 戻り値: 0 = 取得, N > 0 = 待機順, -1 = 待機キューが上限
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local max_waiting = tonumber(ARGV[4])
+local member = ARGV[5]
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+for _, dead in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], dead)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+local free = limit - redis.call('ZCARD', KEYS[1])
+if not redis.call('ZSCORE', KEYS[2], member) then
+    if redis.call('ZCARD', KEYS[2]) >= math.max(free, 0) + max_waiting then
+        return -1
+    end
+    redis.call('ZADD', KEYS[2], now, member)
+end
+local rank = redis.call('ZRANK', KEYS[2], member)
+if rank < free then
+    redis.call('ZREM', KEYS[2], member)
+    redis.call('ZREM', KEYS[3], member)
+    redis.call('ZADD', KEYS[1], now + lease, member)
+    redis.call('PEXPIRE', KEYS[1], lease)
+    return 0
+end
+redis.call('ZADD', KEYS[3], now + lease, member)
+redis.call('PEXPIRE', KEYS[2], lease)
+redis.call('PEXPIRE', KEYS[3], lease)
+return rank - math.max(free, 0) + 1
+"""
+
+
+class QueueFullError(Exception):
+    """待機キューが上限に達している"""
+    pass
+
+
+@dataclass(eq=False)
+class _Waiter:
+    """待機中のメッセージ"""
+    session_id: str
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    granted: bool = False
+
+
+@dataclass
+class _AccessQueue:
+    """公開アクセスごとの実行状態"""
+    running: int = 0
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+
+
+class PublicChatQueue:
+    """
+    公開チャットの実行枠
+
+    責務:
+    - 公開アクセスごとの同時実行数の制限
+    - 上限超過時の FIFO 待機と順番の通知
+    - キャンセル時の待機解除・実行枠の返却
+    - 実行枠のワーカー間共有（Redis、障害時はワーカー内の上限で継続）
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_waiting: Optional[int] = None,
+        redis_client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            max_concurrent: 公開アクセスごとの同時実行数
+            max_waiting: 公開アクセスごとの最大待機数
+            redis_client: 実行枠を共有する Redis（省略時は共有クライアント、REDIS_URL 未設定時は共有しない）
+        """
+        self.max_concurrent = max_concurrent or settings.public_chat_concurrency_per_token
+        self.max_waiting = max_waiting if max_waiting is not None else settings.public_chat_queue_max_waiting
+        self._queues: Dict[str, _AccessQueue] = {}
+        self._redis = redis_client if redis_client is not None else get_redis()
+        if self._redis is not None:
+            self._acquire_script = self._redis.register_script(_ACQUIRE_SCRIPT)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        access_id: str,
+        session_id: str,
+        on_position: Optional[PositionCallback] = None,
+    ) -> AsyncIterator[None]:
+        """
+        実行枠を確保（空きがなければ順番待ち）
+
+        Args:
+            access_id: 公開アクセスID
+            session_id: 公開セッションID
+            on_position: 待機順の通知先（待機開始時と順番が進むたびに呼ばれる）
+
+        Raises:
+            QueueFullError: 待機キューが上限に達している場合
+        """
+        member = None
+        if self._redis is not None:
+            try:
+                member = await self._acquire_shared(access_id, session_id, on_position)
+            except (QueueFullError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # 共有できない間はワーカー内の上限で継続
+                logger.warning("Shared chat queue unavailable", access_id=access_id, error=str(e))
+
+        if member is None:
+            await self._acquire(access_id, session_id, on_position)
+            try:
+                yield
+            finally:
+                self._release(access_id)
+            return
+
+        renewer = asyncio.create_task(self._renew_shared(access_id, member))
+        try:
+            yield
+        finally:
+            renewer.cancel()
+            await self._discard_shared(access_id, member)
+
+    def stats(self, access_id: str) -> dict:
+        """公開アクセスの実行数・待機数（ワーカー内の実行枠）"""
+        queue = self._queues.get(access_id)
+        if queue is None:
+            return {"running": 0, "waiting": 0}
+        return {"running": queue.running, "waiting": len(queue.waiters)}
+
+    async def _acquire(
+        self, access_id: str, session_id: str, on_position: Optional[PositionCallback]
+    ) -> None:
+        """実行枠を確保"""
+        queue = self._queues.setdefault(access_id, _AccessQueue())
+        if queue.running < self.max_concurrent and not queue.waiters:
+            queue.running += 1
+            return
+
+        if len(queue.waiters) >= self.max_waiting:
+            self._discard_if_idle(access_id, queue)
+            raise QueueFullError(f"Queue is full ({self.max_waiting} waiting)")
+
+        waiter = _Waiter(session_id=session_id)
+        queue.waiters.append(waiter)
+        logger.info(
+            "Public chat queued",
+            access_id=access_id,
+            session_id=session_id,
+            position=len(queue.waiters),
+        )
+
+        try:
+            last_position = None
+            while not waiter.granted:
+                position = queue.waiters.index(waiter) + 1
+                if on_position and position != last_position:
+                    last_position = position
+                    await on_position(session_id, position)
+                if not waiter.granted:
+                    await waiter.changed.wait()
+                    waiter.changed.clear()
+        except BaseException:
+            if waiter.granted:
+                # 枠を受け取った直後のキャンセルは次の待機者へ引き渡す
+                self._release(access_id)
+            else:
+                queue.waiters.remove(waiter)
+                self._notify(queue)
+                self._discard_if_idle(access_id, queue)
+            raise
+
+    @staticmethod
+    def _shared_keys(access_id: str) -> list:
+        """共有実行枠のキー（実行中, 待機, 待機者の生存期限）"""
+        prefix = f"public_chat_queue:{access_id}"
+        return [f"{prefix}:running", f"{prefix}:waiting", f"{prefix}:alive"]
+
+    async def _acquire_shared(
+        self, access_id: str, session_id: str, on_position: Optional[PositionCallback]
+    ) -> str:
+        """
+        共有実行枠を確保（空きが出るまで待機順を通知しながら再試行）
+
+        Returns:
+            str: 実行枠の保持者ID（返却時に使用）
+        """
+        member = f"{session_id}:{uuid.uuid4().hex}"
+        keys = self._shared_keys(access_id)
+        last_position = None
+        try:
+            while True:
+                position = int(await self._acquire_script(
+                    keys=keys,
+                    args=[
+                        int(time.time() * 1000),
+                        _SHARED_LEASE_SECONDS * 1000,
+                        self.max_concurrent,
+                        self.max_waiting,
+                        member,
+                    ],
+                ))
+                if position == 0:
+                    return member
+                if position < 0:
+                    raise QueueFullError(f"Queue is full ({self.max_waiting} waiting)")
+                if last_position is None:
+                    logger.info(
+                        "Public chat queued",
+                        access_id=access_id,
+                        session_id=session_id,
+                        position=position,
+                    )
+                if on_position and position != last_position:
+                    await on_position(session_id, position)
+                last_position = position
+                await asyncio.sleep(_SHARED_POLL_INTERVAL)
+        except BaseException:
+            # 待機を取り消す（応答を受け取る前に取得済みだった枠も返却）
+            await self._discard_shared(access_id, member)
+            raise
+
+    async def _renew_shared(self, access_id: str, member: str) -> None:
+        """実行中の共有実行枠のリースを延長"""
+        running_key = self._shared_keys(access_id)[0]
+        lease_ms = _SHARED_LEASE_SECONDS * 1000
+        while True:
+            await asyncio.sleep(_SHARED_RENEW_INTERVAL)
+            try:
+                await self._redis.zadd(running_key, {member: int(time.time() * 1000) + lease_ms}, xx=True)
+                await self._redis.pexpire(running_key, lease_ms)
+            except Exception as e:
+                logger.warning("Failed to renew shared chat slot", access_id=access_id, error=str(e))
+
+    async def _discard_shared(self, access_id: str, member: str) -> None:
+        """共有実行枠・待機を返却（失敗時はリース期限切れで解放）"""
+        try:
+            for key in self._shared_keys(access_id):
+                await self._redis.zrem(key, member)
+        except Exception as e:
+            logger.warning("Failed to release shared chat slot", access_id=access_id, error=str(e))
+
+    def _release(self, access_id: str) -> None:
+        """実行枠を返却（待機者がいればそのまま引き渡す）"""
+        queue = self._queues.get(access_id)
+        if queue is None:
+            return
+        if queue.waiters:
+            waiter = queue.waiters.popleft()
+            waiter.granted = True
+            waiter.changed.set()
+            self._notify(queue)
+        else:
+            queue.running -= 1
+            self._discard_if_idle(access_id, queue)
+
+    @staticmethod
+    def _notify(queue: _AccessQueue) -> None:
+        """待機者に順番の変化を通知"""
+        for waiter in queue.waiters:
+            waiter.changed.set()
+
+    def _discard_if_idle(self, access_id: str, queue: _AccessQueue) -> None:
+        """実行中・待機中がなければ状態を破棄"""
+        if queue.running <= 0 and not queue.waiters:
+            self._queues.pop(access_id, None)
@@ -0,0 +1,169 @@
+"""
+Public Result Cache
+
+公開コマンドの実行結果キャッシュ
+
+公開リンクでは少数の固定コマンドに多数の匿名ユーザーが同一（またはほぼ同一）の
+入力を送るため、コマンド単位でオプトインした場合に限り、
+（コマンド, 正規化した入力, プロジェクト設定バージョン）のハッシュをキーとして
+ストリームの内容を保存し、次回以降はエージェントを実行せずに再生します。
+会話履歴に依存しないよう、セッションの最初のメッセージのみが対象です。
+元の実行のSDKセッションIDも保存し、キャッシュから応答したセッションの
+次のメッセージはそのSDKセッションを分岐（fork）して再開するため、文脈が引き継がれます。
+"""
+
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from app.config import settings
+
+
+def normalize_input(content: str) -> str:
+    """
+    キャッシュキー用に入力を正規化
+
+    Unicode互換正規化（NFKC）、大文字小文字の統一、連続空白の圧縮を行います。
+
+    Args:
+        content: ユーザーメッセージ
+
+    Returns:
+        str: 正規化した入力
+    """
+    return " ".join(unicodedata.normalize("NFKC", content).casefold().split())
+
+
+def make_cache_key(
+    command_id: str, command_content: Optional[str], content: str, config_version: int
+) -> str:
+    """
+    キャッシュキーを生成
+
+    Args:
+        command_id: コマンドID
+        command_content: コマンドのプロンプト（変更時に別キーとする）
+        content: ユーザーメッセージ
+        config_version: プロジェクト設定のバージョン
+
+    Returns:
+        str: SHA-256 ハッシュ
+    """
+    digest = hashlib.sha256()
+    for part in (command_id, command_content or "", normalize_input(content), str(config_version)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """キャッシュ済みの実行結果"""
+    events: list = field(default_factory=list)  # 再生するストリームイベント（text / tool_use）
+    full_response: str = ""
+    usage: dict = field(default_factory=dict)  # 元の実行の使用量
+    sdk_session_id: Optional[str] = None  # 元の実行のSDKセッションID（分岐して再開する）
+
+    @property
+    def size(self) -> int:
+        """応答テキストの文字数"""
+        return len(self.full_response)
+
+
+class PublicResultCache:
+    """
+    公開コマンド結果キャッシュ
+
+    責務:
+    - TTL 付き・エントリ数上限付きの LRU キャッシュ
+    - ヒット/ミスのメトリクス
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_response_chars: Optional[int] = None):
+        """
+        Args:
+            max_entries: 最大エントリ数
+            max_response_chars: キャッシュする応答の最大文字数
+        """
+        self.max_entries = max_entries or settings.public_result_cache_max_entries
+        self.max_response_chars = max_response_chars or settings.public_result_cache_max_response_chars
+        # key -> (期限, 結果)
+        self._entries: "OrderedDict[str, Tuple[float, CachedResult]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """
+        キャッシュ済みの結果を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[CachedResult]: 有効な結果（なければ None）
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, result: CachedResult, ttl_seconds: int) -> bool:
+        """
+        結果を登録
+
+        Args:
+            key: キャッシュキー
+            result: 実行結果
+            ttl_seconds: 有効期間（秒）
+
+        Returns:
+            bool: 登録した場合 True（空・上限超過の応答は登録しない）
+        """
+        if ttl_seconds <= 0 or not result.full_response or result.size > self.max_response_chars:
+            return False
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = (time.monotonic() + ttl_seconds, result)
+        self.stores += 1
+        return True
+
+    def clear(self) -> None:
+        """全エントリを破棄"""
+        self._entries.clear()
+
+    def metrics(self) -> dict:
+        """ヒット率などのメトリクス"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# グローバルキャッシュインスタンス
+_result_cache: Optional[PublicResultCache] = None
+
+
+def get_public_result_cache() -> PublicResultCache:
+    """公開コマンド結果キャッシュを取得"""
+    global _result_cache
+
+    if _result_cache is None:
+        _result_cache = PublicResultCache()
+    return _result_cache
@@ -0,0 +1,295 @@
+"""
+Public Workspace Overlay
+
+公開セッションごとのコピーオンライト・ワークスペース
+
+公開セッションのエージェントがプロジェクトのワークスペースを直接変更しないよう、
+セッションごとに作業ディレクトリを用意します。作成方法は次の順で試行し、
+使えない方式は以降スキップします。
+
+- overlayfs: ワークスペースを lowerdir とするオーバーレイをマウント
+  （サイズによらず即時、変更は upperdir のみに書き込まれる）
+- reflink: ``cp --reflink=always`` によるブロック共有コピー
+  （データはコピーせず、書き込まれたブロックのみ複製）
+- copy: 通常のコピー（最初のメッセージ送信時にワーカースレッドで作成）
+
+ハードリンクは書き込みが元のファイルに反映されるため使用しません。
+期限切れ・削除済みセッションのディレクトリは定期メンテナンスで回収します。
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.database import PublicSessionModel
+from app.utils.database import get_session_context
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 作成方式（auto は上から順に試行）
+STRATEGIES = ("overlayfs", "reflink", "copy")
+
+# セッションディレクトリ内の構成
+_MARKER_FILE = ".overlay.json"
+_MERGED_DIR = "merged"
+_UPPER_DIR = "upper"
+_WORK_DIR = "work"
+
+# mount / cp のタイムアウト（秒）
+_COMMAND_TIMEOUT = 30
+
+
+class PublicWorkspaceOverlays:
+    """
+    公開セッション用ワークスペースの管理
+
+    責務:
+    - セッションごとの作業ディレクトリの作成（方式の自動選択）
+    - 削除（アンマウントを含む）
+    - 期限切れ・孤立したディレクトリの回収
+    """
+
+    def __init__(self, base_path: Optional[str] = None, mode: Optional[str] = None):
+        """
+        Args:
+            base_path: セッションディレクトリの配置先
+            mode: 作成方式（auto / overlayfs / reflink / copy、none は無効）
+        """
+        self.base_path = Path(base_path or settings.public_workspace_overlay_path)
+        self.mode = mode or settings.public_workspace_isolation
+        # 使用できないと判明した方式（プロセス内で再試行しない）
+        self._unavailable: set = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """セッションごとのワークスペースが有効か"""
+        return self.mode != "none"
+
+    def _strategies(self) -> list:
+        """試行する方式"""
+        if self.mode == "auto":
+            candidates = list(STRATEGIES)
+        else:
+            candidates = [self.mode]
+            if self.mode != "copy":
+                candidates.append("copy")
+        return [s for s in candidates if s not in self._unavailable]
+
+    def session_root(self, session_id: str) -> Path:
+        """セッションディレクトリ"""
+        return self.base_path / session_id
+
+    async def ensure(self, session_id: str, workspace_path: str) -> str:
+        """
+        セッションの作業ディレクトリを取得（なければ作成）
+
+        Args:
+            session_id: 公開セッションID
+            workspace_path: プロジェクトのワークスペース
+
+        Returns:
+            str: エージェントの作業ディレクトリ
+        """
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            return await asyncio.to_thread(self._ensure_sync, session_id, workspace_path)
+
+    def _ensure_sync(self, session_id: str, workspace_path: str) -> str:
+        """作業ディレクトリを作成（ワーカースレッド）"""
+        root = self.session_root(session_id)
+        merged = root / _MERGED_DIR
+        marker = _read_marker(root)
+        if marker:
+            # 再起動などでマウントが外れていれば upperdir を引き継いで再マウント
+            if marker.get("strategy") == "overlayfs" and not os.path.ismount(merged):
+                if not self._mount_overlay(Path(marker["lower"]), root):
+                    raise RuntimeError(f"Failed to remount workspace overlay for {session_id}")
+            return str(merged)
+
+        lower = Path(workspace_path)
+        lower.mkdir(parents=True, exist_ok=True)
+        if root.exists():
+            # 作成途中で中断したディレクトリ
+            self._remove_sync(session_id)
+
+        started = datetime.now(timezone.utc)
+        for strategy in self._strategies():
+            root.mkdir(parents=True, exist_ok=True)
+            if self._create(strategy, lower, root):
+                _write_marker(root, {"strategy": strategy, "lower": str(lower)})
+                logger.info(
+                    "Public workspace overlay created",
+                    session_id=session_id,
+                    strategy=strategy,
+                    duration_ms=round((datetime.now(timezone.utc) - started).total_seconds() * 1000, 1),
+                )
+                return str(merged)
+            shutil.rmtree(root, ignore_errors=True)
+
+        raise RuntimeError(f"No workspace overlay strategy available for {session_id}")
+
+    def _create(self, strategy: str, lower: Path, root: Path) -> bool:
+        """指定した方式で作成"""
+        merged = root / _MERGED_DIR
+        try:
+            if strategy == "overlayfs":
+                ok = self._mount_overlay(lower, root)
+            elif strategy == "reflink":
+                merged.mkdir()
+                result = subprocess.run(
+                    ["cp", "-a", "--reflink=always", f"{lower}/.", str(merged)],
+                    capture_output=True,
+                    timeout=_COMMAND_TIMEOUT,
+                )
+                ok = result.returncode == 0
+            else:
+                shutil.copytree(lower, merged, symlinks=True)
+                return True
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning("Workspace overlay strategy failed", strategy=strategy, error=str(e))
+            ok = False
+
+        if not ok and strategy != "copy":
+            logger.info("Workspace overlay strategy unavailable", strategy=strategy)
+            self._unavailable.add(strategy)
+        return ok
+
+    def _mount_overlay(self, lower: Path, root: Path) -> bool:
+        """overlayfs をマウント（権限がなければ False）"""
+        for name in (_UPPER_DIR, _WORK_DIR, _MERGED_DIR):
+            (root / name).mkdir(exist_ok=True)
+        options = f"lowerdir={lower},upperdir={root / _UPPER_DIR},workdir={root / _WORK_DIR}"
+        result = subprocess.run(
+            ["mount", "-t", "overlay", "overlay", "-o", options, str(root / _MERGED_DIR)],
+            capture_output=True,
+            timeout=_COMMAND_TIMEOUT,
+        )
+        return result.returncode == 0
+
+    async def remove(self, session_id: str) -> bool:
+        """
+        セッションの作業ディレクトリを削除
+
+        Args:
+            session_id: 公開セッションID
+
+        Returns:
+            bool: 削除した場合 True
+        """
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            removed = await asyncio.to_thread(self._remove_sync, session_id)
+        self._locks.pop(session_id, None)
+        return removed
+
+    def _remove_sync(self, session_id: str) -> bool:
+        """作業ディレクトリを削除（ワーカースレッド）"""
+        root = self.session_root(session_id)
+        if not root.exists():
+            return False
+        merged = root / _MERGED_DIR
+        if os.path.ismount(merged):
+            result = subprocess.run(
+                ["umount", str(merged)], capture_output=True, timeout=_COMMAND_TIMEOUT
+            )
+            if result.returncode != 0:
+                # マウントを残したままディレクトリを削除しない（次回の回収で再試行）
+                logger.warning(
+                    "Failed to unmount workspace overlay",
+                    session_id=session_id,
+                    error=result.stderr.decode(errors="replace"),
+                )
+                return False
+        shutil.rmtree(root, ignore_errors=True)
+        return True
+
+    def list_sessions(self) -> list:
+        """作業ディレクトリが存在するセッションID"""
+        if not self.base_path.is_dir():
+            return []
+        return [entry.name for entry in self.base_path.iterdir() if entry.is_dir()]
+
+    async def collect_garbage(self, live_session_ids: Iterable[str]) -> int:
+        """
+        有効なセッション以外の作業ディレクトリを削除
+
+        Args:
+            live_session_ids: 期限内の公開セッションID
+
+        Returns:
+            int: 削除した数
+        """
+        live = set(live_session_ids)
+        removed = 0
+        for session_id in self.list_sessions():
+            if session_id not in live and await self.remove(session_id):
+                removed += 1
+        if removed:
+            logger.info("Collected public workspace overlays", removed=removed)
+        return removed
+
+
+def _read_marker(root: Path) -> Optional[dict]:
+    """作成済みマーカーを読み込み"""
+    try:
+        return json.loads((root / _MARKER_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(root: Path, data: dict) -> None:
+    """作成済みマーカーを書き込み"""
+    (root / _MARKER_FILE).write_text(json.dumps(data))
+
+
+# グローバルインスタンス
+_overlays: Optional[PublicWorkspaceOverlays] = None
+
+
+def get_public_workspace_overlays() -> PublicWorkspaceOverlays:
+    """公開セッション用ワークスペース管理を取得"""
+    global _overlays
+
+    if _overlays is None:
+        _overlays = PublicWorkspaceOverlays()
+    return _overlays
+
+
+async def run_public_workspace_gc() -> int:
+    """
+    期限切れ公開セッションの作業ディレクトリ回収（メンテナンスから呼び出し）
+
+    最終アクティビティから public_session_ttl_hours を過ぎたセッションと、
+    削除済みセッションのディレクトリを削除します。
+
+    Returns:
+        int: 削除した数
+    """
+    overlays = get_public_workspace_overlays()
+    session_ids = overlays.list_sessions()
+    if not session_ids:
+        return 0
+
+    threshold = datetime.now(timezone.utc) - timedelta(hours=settings.public_session_ttl_hours)
+    live: set = set()
+    async with get_session_context() as db_session:
+        # IN 句が長くなりすぎないよう分割
+        for start in range(0, len(session_ids), 500):
+            result = await db_session.execute(
+                select(PublicSessionModel.id).where(
+                    PublicSessionModel.id.in_(session_ids[start:start + 500]),
+                    PublicSessionModel.last_activity_at >= threshold,
+                )
+            )
+            live.update(result.scalars().all())
+    return await overlays.collect_garbage(live)
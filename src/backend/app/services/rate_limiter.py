@@ -0,0 +1,234 @@
+"""
+Rate Limiter
+
+トークンバケットによるレート制限
+
+キーごとに容量（1分あたりの上限回数）のバケットを持ち、
+1秒あたり 上限/60 個のトークンを補充します。上限値までのバーストを許容しつつ、
+持続的なリクエストは1分あたりの上限に収まります。
+
+バックエンド:
+- memory: ワーカープロセス内（単一ワーカー向け、I/Oなし）
+- redis: Luaスクリプトによるアトミック判定（複数ワーカー向け）
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """レート制限値"""
+    per_minute: int
+
+    @property
+    def capacity(self) -> int:
+        """バケット容量（最大バースト）"""
+        return self.per_minute
+
+    @property
+    def refill_per_second(self) -> float:
+        """1秒あたりの補充量"""
+        return self.per_minute / 60.0
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """レート制限の判定結果"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Retry-After ヘッダー用の秒数（切り上げ、最小1秒）"""
+        return max(1, math.ceil(self.retry_after))
+
+
+def get_group_limit(group: str) -> Optional[RateLimit]:
+    """
+    ルートグループのレート制限値を取得
+
+    Args:
+        group: グループ名（api / auth / public / chat_ws / public_ws）
+
+    Returns:
+        Optional[RateLimit]: 制限値（無効化または 0 の場合 None）
+    """
+    if not settings.rate_limit_enabled:
+        return None
+    per_minute = {
+        "api": settings.rate_limit_per_minute,
+        "auth": settings.rate_limit_auth_per_minute,
+        "public": settings.rate_limit_public_per_minute,
+        "chat_ws": settings.rate_limit_chat_messages_per_minute,
+        "public_ws": settings.rate_limit_public_messages_per_minute,
+    }.get(group, 0)
+    return RateLimit(per_minute) if per_minute > 0 else None
+
+
+class _MemoryBackend:
+    """ワーカープロセス内のバケットストア"""
+
+    def __init__(self, max_keys: int = 100000) -> None:
+        # key -> (tokens, updated_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._max_keys = max_keys
+
+    async def take(
+        self, key: str, capacity: int, refill_per_second: float, cost: int
+    ) -> Tuple[bool, float, float]:
+        # awaitを挟まないため、補充・判定・消費はイベントループ上でアトミック
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens, retry_after
+
+
+# KEYS[1]: バケットHASH（tokens, ts）
+# ARGV: now_ms, capacity, refill_per_ms, cost
+_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local refill = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class _RedisBackend:
+    """Redisによる複数ワーカー共有のバケットストア"""
+
+    def __init__(self, client) -> None:
+        self._redis = client
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+
+    async def take(
+        self, key: str, capacity: int, refill_per_second: float, cost: int
+    ) -> Tuple[bool, float, float]:
+        refill_per_ms = refill_per_second / 1000
+        allowed, tokens = await self._take(
+            keys=[f"ratelimit:{key}"],
+            args=[int(time.time() * 1000), capacity, refill_per_ms, cost],
+        )
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return bool(allowed), tokens, retry_after
+
+
+class RateLimiter:
+    """
+    レート制限
+
+    責務:
+    - キー単位のトークンバケット判定
+    - バックエンド障害時のフェイルオープン
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: "memory" または "redis"
+        """
+        backend = backend or settings.rate_limit_backend
+        if backend == "redis":
+            if not settings.redis_url:
+                raise ValueError("REDIS_URL is required for the redis rate limit backend")
+            self._backend = _RedisBackend(get_redis())
+        else:
+            self._backend = _MemoryBackend()
+        self.backend_name = backend
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitResult:
+        """
+        リクエスト1回分のトークンを消費
+
+        Args:
+            key: バケットキー（グループ名とユーザー/トークン/IPなど）
+            limit: 制限値
+            cost: 消費トークン数
+
+        Returns:
+            RateLimitResult: 判定結果
+        """
+        try:
+            allowed, tokens, retry_after = await self._backend.take(
+                key, limit.capacity, limit.refill_per_second, cost
+            )
+        except Exception as e:
+            # レート制限の障害でサービス全体を止めない
+            logger.warning("Rate limiter backend error", key=key, error=str(e))
+            return RateLimitResult(allowed=True, limit=limit.per_minute, remaining=limit.capacity)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit.per_minute,
+            remaining=max(0, int(tokens)),
+            retry_after=retry_after,
+        )
+
+    async def hit_group(self, group: str, key: str) -> Optional[RateLimitResult]:
+        """
+        ルートグループの上限でトークンを消費
+
+        Args:
+            group: グループ名
+            key: グループ内のキー
+
+        Returns:
+            Optional[RateLimitResult]: 判定結果（制限なしの場合 None）
+        """
+        limit = get_group_limit(group)
+        if limit is None:
+            return None
+        return await self.hit(f"{group}:{key}", limit)
+
+
+# グローバルレートリミッターインスタンス
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """レートリミッターを取得"""
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+async def shutdown_rate_limiter() -> None:
+    """レートリミッターを停止（Redis接続は shutdown_redis でクローズ）"""
+    global _rate_limiter
+
+    _rate_limiter = None
@@ -0,0 +1,324 @@
+"""
+Spend Reservation
+
+ターン開始時の予算予約（同時実行時の利用制限超過を防止）
+
+check_cost_limits は読み取りのみのため、同一プロジェクトで複数ターンを
+同時に開始すると全てが通過して上限を超えてしまいます。
+ターン開始時に推定コストをアトミックに予約し、ResultMessage 受信時に
+実コストで精算することで、並列実行を許しつつ上限を厳密に守ります。
+
+バックエンド:
+- memory: ワーカープロセス内（単一ワーカー向け、I/Oなし）
+- redis: Luaスクリプトによるアトミック予約（複数ワーカー向け）
+"""
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+# 期間別コスト/上限のキー
+_LIMIT_KEYS = (
+    ("cost_daily", "limit_daily"),
+    ("cost_weekly", "limit_weekly"),
+    ("cost_monthly", "limit_monthly"),
+)
+
+# EWMAの平滑化係数
+_EWMA_ALPHA = 0.3
+
+# 推定コストの安全係数
+_ESTIMATE_FACTOR = 1.5
+
+
+@dataclass
+class SpendReservation:
+    """予算予約"""
+    id: str
+    project_id: str
+    amount: float
+    settled: bool = False
+
+    @property
+    def is_noop(self) -> bool:
+        """上限未設定のプロジェクト（予約不要）"""
+        return self.amount <= 0
+
+
+def remaining_budget(cost_check: dict) -> Optional[float]:
+    """
+    check_cost_limits の結果から残り予算（最も厳しい期間）を算出
+
+    Args:
+        cost_check: UsageService.check_cost_limits の戻り値
+
+    Returns:
+        Optional[float]: 残り予算（USD、上限未設定の場合 None）
+    """
+    remaining = None
+    for cost_key, limit_key in _LIMIT_KEYS:
+        limit = cost_check.get(limit_key)
+        if limit is None:
+            continue
+        headroom = limit - (cost_check.get(cost_key) or 0.0)
+        remaining = headroom if remaining is None else min(remaining, headroom)
+    return remaining
+
+
+class _MemoryBackend:
+    """ワーカープロセス内の予約ストア"""
+
+    def __init__(self) -> None:
+        # project_id -> {reservation_id: (amount, expires_at)}
+        self._reservations: Dict[str, Dict[str, Tuple[float, float]]] = {}
+
+    def _active(self, project_id: str) -> Dict[str, Tuple[float, float]]:
+        """期限切れを除いた予約一覧"""
+        now = time.monotonic()
+        entries = self._reservations.get(project_id, {})
+        for reservation_id in [k for k, (_, expires) in entries.items() if expires <= now]:
+            del entries[reservation_id]
+        return entries
+
+    async def try_reserve(
+        self, project_id: str, reservation_id: str, amount: float, headroom: float, ttl: float
+    ) -> bool:
+        # awaitを挟まないため、チェックと登録はイベントループ上でアトミック
+        entries = self._active(project_id)
+        reserved = sum(a for a, _ in entries.values())
+        if reserved > 0 and reserved + amount > headroom:
+            return False
+        self._reservations.setdefault(project_id, {})[reservation_id] = (
+            amount, time.monotonic() + ttl
+        )
+        return True
+
+    async def settle(
+        self, project_id: str, reservation_id: str, actual: float, grace: float
+    ) -> None:
+        # 同一プロセスでは実コストが予算キャッシュへ即時反映されるため解放のみ
+        self._reservations.get(project_id, {}).pop(reservation_id, None)
+
+    async def reserved_total(self, project_id: str) -> float:
+        return sum(a for a, _ in self._active(project_id).values())
+
+
+# KEYS[1]: 予約ZSET（member=予約ID, score=期限ms） KEYS[2]: 予約額HASH
+# KEYS[3]: 精算済みZSET KEYS[4]: 精算済み額HASH
+# ARGV: now_ms, headroom, amount, reservation_id, expires_ms, key_ttl_ms
+_RESERVE_SCRIPT = """
+local function sum_active(zset, hash)
+    local expired = redis.call('ZRANGEBYSCORE', zset, '-inf', ARGV[1])
+    for _, member in ipairs(expired) do
+        redis.call('HDEL', hash, member)
+    end
+    redis.call('ZREMRANGEBYSCORE', zset, '-inf', ARGV[1])
+    local total = 0
+    for _, value in ipairs(redis.call('HVALS', hash)) do
+        total = total + tonumber(value)
+    end
+    return total
+end
+local reserved = sum_active(KEYS[1], KEYS[2])
+local settled = sum_active(KEYS[3], KEYS[4])
+if reserved > 0 and reserved + settled + tonumber(ARGV[3]) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[5], ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[4], ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[6])
+redis.call('PEXPIRE', KEYS[2], ARGV[6])
+return 1
+"""
+
+# ARGV: reservation_id, actual, expires_ms, key_ttl_ms
+# 予約は常に削除し、実コストは精算済みとして別管理（actual<=0 の場合は記録しない）
+_SETTLE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if tonumber(ARGV[2]) <= 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[2])
+redis.call('PEXPIRE', KEYS[3], ARGV[4])
+redis.call('PEXPIRE', KEYS[4], ARGV[4])
+return 1
+"""
+
+
+class _RedisBackend:
+    """Redisによる複数ワーカー共有の予約ストア"""
+
+    def __init__(self, client) -> None:
+        self._redis = client
+        self._reserve = self._redis.register_script(_RESERVE_SCRIPT)
+        self._settle = self._redis.register_script(_SETTLE_SCRIPT)
+
+    @staticmethod
+    def _keys(project_id: str) -> list:
+        return [
+            f"budget:reservations:{project_id}",
+            f"budget:reservation_amounts:{project_id}",
+            f"budget:settled:{project_id}",
+            f"budget:settled_amounts:{project_id}",
+        ]
+
+    async def try_reserve(
+        self, project_id: str, reservation_id: str, amount: float, headroom: float, ttl: float
+    ) -> bool:
+        now_ms = int(time.time() * 1000)
+        result = await self._reserve(
+            keys=self._keys(project_id),
+            args=[now_ms, headroom, amount, reservation_id, now_ms + int(ttl * 1000), int(ttl * 2000)],
+        )
+        return bool(result)
+
+    async def settle(
+        self, project_id: str, reservation_id: str, actual: float, grace: float
+    ) -> None:
+        # 予約は解放し、他ワーカーの予算キャッシュに反映されるまで実コストを精算済みとして保持
+        # （精算済み分は実行中判定に含めないため、単独ターンの許可には影響しない）
+        expires_ms = int((time.time() + grace) * 1000)
+        await self._settle(
+            keys=self._keys(project_id),
+            args=[reservation_id, actual if grace > 0 else 0, expires_ms, int(grace * 1000) + 1],
+        )
+
+    async def reserved_total(self, project_id: str) -> float:
+        values = await self._redis.hvals(self._keys(project_id)[1])
+        return sum(float(v) for v in values)
+
+
+class SpendReservationManager:
+    """
+    予算予約マネージャー
+
+    責務:
+    - プロジェクト別の推定ターンコスト（実績のEWMA）
+    - 残り予算に対する予約のアトミックな登録
+    - 実コストでの精算・解放
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: "memory" または "redis"
+        """
+        backend = backend or settings.spend_reservation_backend
+        if backend == "redis":
+            if not settings.redis_url:
+                raise ValueError("REDIS_URL is required for the redis reservation backend")
+            self._backend = _RedisBackend(get_redis())
+        else:
+            self._backend = _MemoryBackend()
+        self.backend_name = backend
+        self._ewma: Dict[str, float] = {}
+
+    def estimate(self, project_id: str) -> float:
+        """プロジェクトの推定ターンコスト"""
+        average = self._ewma.get(project_id)
+        if average is None:
+            return settings.spend_reservation_default_usd
+        return max(settings.spend_reservation_min_usd, average * _ESTIMATE_FACTOR)
+
+    async def reserve(self, project_id: str, cost_check: dict) -> Optional[SpendReservation]:
+        """
+        ターン開始時に推定コストを予約
+
+        実行中の予約がない場合は残り予算が推定コスト未満でも許可します
+        （従来の「上限到達まで利用可」の挙動を維持）。
+
+        Args:
+            project_id: プロジェクトID
+            cost_check: check_cost_limits の結果（can_use=True のもの）
+
+        Returns:
+            Optional[SpendReservation]: 予約（予算不足で拒否された場合 None）
+        """
+        headroom = remaining_budget(cost_check)
+        if headroom is None:
+            return SpendReservation(id="", project_id=project_id, amount=0.0)
+
+        amount = self.estimate(project_id)
+        reservation = SpendReservation(id=uuid.uuid4().hex, project_id=project_id, amount=amount)
+        accepted = await self._backend.try_reserve(
+            project_id, reservation.id, amount, headroom, settings.spend_reservation_ttl_seconds
+        )
+        if not accepted:
+            logger.info(
+                "Spend reservation rejected",
+                project_id=project_id,
+                estimate=amount,
+                headroom=headroom,
+            )
+            return None
+        return reservation
+
+    async def settle(self, reservation: SpendReservation, actual_cost: float) -> None:
+        """
+        ResultMessage 受信後に実コストで精算
+
+        Args:
+            reservation: 予約
+            actual_cost: 実コスト（USD）
+        """
+        if reservation.settled:
+            return
+        reservation.settled = True
+
+        if actual_cost > 0:
+            previous = self._ewma.get(reservation.project_id)
+            self._ewma[reservation.project_id] = (
+                actual_cost if previous is None
+                else _EWMA_ALPHA * actual_cost + (1 - _EWMA_ALPHA) * previous
+            )
+
+        if reservation.is_noop:
+            return
+        grace = settings.budget_reconcile_interval_minutes * 60 + 30
+        await self._backend.settle(reservation.project_id, reservation.id, actual_cost, grace)
+
+    async def release(self, reservation: SpendReservation) -> None:
+        """
+        精算せずに予約を解放（エラー・中断時）
+
+        Args:
+            reservation: 予約
+        """
+        if reservation.settled:
+            return
+        reservation.settled = True
+        if not reservation.is_noop:
+            await self._backend.settle(reservation.project_id, reservation.id, 0.0, 0.0)
+
+    async def reserved_total(self, project_id: str) -> float:
+        """プロジェクトの予約中合計額"""
+        return await self._backend.reserved_total(project_id)
+
+
+# グローバルマネージャーインスタンス
+_reservation_manager: Optional[SpendReservationManager] = None
+
+
+def get_spend_reservations() -> SpendReservationManager:
+    """予算予約マネージャーを取得"""
+    global _reservation_manager
+
+    if _reservation_manager is None:
+        _reservation_manager = SpendReservationManager()
+    return _reservation_manager
+
+
+async def shutdown_spend_reservations() -> None:
+    """予算予約マネージャーを停止（Redis接続は shutdown_redis でクローズ）"""
+    global _reservation_manager
+
+    _reservation_manager = None
@@ -7,7 +7,6 @@ Template Service
 import fnmatch
 import os
 import shutil
-import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -33,6 +32,8 @@ from app.schemas.template import (
     CreateProjectFromTemplateRequest,
     CreateTemplateFromProjectRequest,
 )
+from app.services.project_config_service import ProjectConfigService
+from app.utils.helpers import generate_id
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -151,7 +152,7 @@ class TemplateService:
     ) -> ProjectTemplateModel:
         """テンプレート作成"""
         template = ProjectTemplateModel(
-            id=str(uuid.uuid4()),
+            id=generate_id(),
             user_id=user_id,
             name=data.name,
             description=data.description,
@@ -166,7 +167,7 @@ class TemplateService:
         # ファイルを追加
         for file_data in data.files:
             template_file = ProjectTemplateFileModel(
-                id=str(uuid.uuid4()),
+                id=generate_id(),
                 template_id=template.id,
                 file_path=file_data.file_path,
                 content=file_data.content,
@@ -241,7 +242,7 @@ class TemplateService:
             return None
 
         template_file = ProjectTemplateFileModel(
-            id=str(uuid.uuid4()),
+            id=generate_id(),
             template_id=template_id,
             file_path=file_data.file_path,
             content=file_data.content,
@@ -297,48 +298,20 @@ class TemplateService:
 
         プロジェクトの設定とワークスペースファイルをテンプレート化
         """
-        # プロジェクト取得
-        project_query = select(ProjectModel).where(
-            ProjectModel.id == data.project_id,
-        )
-        project_result = await self.session.execute(project_query)
-        project = project_result.scalar_one_or_none()
-
-        if not project:
+        # プロジェクトと全設定を1クエリで取得
+        loaded = await ProjectConfigService(self.session).load_project_with_config(data.project_id)
+        if not loaded:
             logger.warning("Project not found", project_id=data.project_id)
             return None
-
-        # MCP Servers取得
-        mcp_query = select(ProjectMCPServerModel).where(
-            ProjectMCPServerModel.project_id == data.project_id
-        )
-        mcp_result = await self.session.execute(mcp_query)
-        mcp_servers = mcp_result.scalars().all()
-
-        # Agents取得
-        agent_query = select(ProjectAgentModel).where(
-            ProjectAgentModel.project_id == data.project_id
-        )
-        agent_result = await self.session.execute(agent_query)
-        agents = agent_result.scalars().all()
-
-        # Skills取得
-        skill_query = select(ProjectSkillModel).where(
-            ProjectSkillModel.project_id == data.project_id
-        )
-        skill_result = await self.session.execute(skill_query)
-        skills = skill_result.scalars().all()
-
-        # Commands取得
-        command_query = select(ProjectCommandModel).where(
-            ProjectCommandModel.project_id == data.project_id
-        )
-        command_result = await self.session.execute(command_query)
-        commands = command_result.scalars().all()
+        _, config_rows = loaded
+        mcp_servers = config_rows.mcp_servers
+        agents = config_rows.agents
+        skills = config_rows.skills
+        commands = config_rows.commands
 
         # テンプレート作成
         template = ProjectTemplateModel(
-            id=str(uuid.uuid4()),
+            id=generate_id(),
             user_id=user_id,
             name=data.template_name,
             description=data.template_description,
@@ -400,7 +373,7 @@ class TemplateService:
                 )
                 for file_path, content in files:
                     template_file = ProjectTemplateFileModel(
-                        id=str(uuid.uuid4()),
+                        id=generate_id(),
                         template_id=template.id,
                         file_path=file_path,
                         content=content,
@@ -485,7 +458,7 @@ class TemplateService:
             return None
 
         # プロジェクト作成
-        project_id = str(uuid.uuid4())
+        project_id = generate_id()
         project = ProjectModel(
             id=project_id,
             name=data.project_name,
@@ -501,7 +474,7 @@ class TemplateService:
         # MCP Servers作成
         for mcp_data in template.mcp_servers or []:
             mcp_server = ProjectMCPServerModel(
-                id=str(uuid.uuid4()),
+                id=generate_id(),
                 project_id=project_id,
                 name=mcp_data.get("name", ""),
                 command=mcp_data.get("command", ""),
@@ -515,7 +488,7 @@ class TemplateService:
         # Agents作成
         for agent_data in template.agents or []:
             agent = ProjectAgentModel(
-                id=str(uuid.uuid4()),
+                id=generate_id(),
                 project_id=project_id,
                 name=agent_data.get("name", ""),
                 description=agent_data.get("description"),
@@ -530,7 +503,7 @@ class TemplateService:
         # Skills作成
         for skill_data in template.skills or []:
             skill = ProjectSkillModel(
-                id=str(uuid.uuid4()),
+                id=generate_id(),
                 project_id=project_id,
                 name=skill_data.get("name", ""),
                 description=skill_data.get("description"),
@@ -543,7 +516,7 @@ class TemplateService:
         # Commands作成
         for cmd_data in template.commands or []:
             command = ProjectCommandModel(
-                id=str(uuid.uuid4()),
+                id=generate_id(),
                 project_id=project_id,
                 name=cmd_data.get("name", ""),
                 description=cmd_data.get("description"),
@@ -0,0 +1,148 @@
+"""
+Turn Budget
+
+ストリーミング中のターン単位使用量の積算と上限判定
+
+ResultMessage を待たずに AssistantMessage ごとの usage から
+トークン数・推定コストを積算し、ターン上限またはプロジェクトの
+残り予算を超えた時点で中断できるようにします。
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional, Set
+
+from app.config import settings
+
+# モデル系統別の単価（USD / 100万トークン: 入力, 出力）
+# 推定値のため、判定が甘くならないよう同系統の高い方の単価を採用
+MODEL_PRICING = {
+    "opus": (15.0, 75.0),
+    "sonnet": (3.0, 15.0),
+    "haiku": (1.0, 5.0),
+}
+
+# キャッシュ書き込み/読み込みの入力単価に対する倍率
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+
+def get_model_pricing(model: Optional[str]) -> tuple:
+    """
+    モデル名から単価を取得（不明なモデルは最も高い単価）
+
+    Args:
+        model: モデル名（claude-opus-4-5 / sonnet など）
+
+    Returns:
+        tuple: (入力単価, 出力単価)
+    """
+    name = (model or "").lower()
+    for family, pricing in MODEL_PRICING.items():
+        if family in name:
+            return pricing
+    return MODEL_PRICING["opus"]
+
+
+@dataclass
+class TurnBudget:
+    """
+    ターン単位の使用量トラッカー
+
+    Attributes:
+        model: 使用モデル
+        max_tokens: ターンあたりの最大トークン数（None は無制限）
+        max_cost_usd: ターンあたりの最大コスト（ターン上限とプロジェクト残予算の小さい方）
+    """
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    max_cost_usd: Optional[float] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    exceeded: Optional[str] = None
+    _seen_message_ids: Set[str] = field(default_factory=set, repr=False)
+
+    @classmethod
+    def for_turn(cls, model: Optional[str], remaining_budget: Optional[float]) -> "TurnBudget":
+        """
+        設定値とプロジェクト残予算からトラッカーを作成
+
+        Args:
+            model: 使用モデル
+            remaining_budget: プロジェクトの残り予算（上限未設定の場合 None）
+
+        Returns:
+            TurnBudget: トラッカー
+        """
+        limits = [
+            value for value in (settings.turn_max_cost_usd or None, remaining_budget)
+            if value is not None
+        ]
+        return cls(
+            model=model,
+            max_tokens=settings.turn_max_tokens or None,
+            max_cost_usd=max(min(limits), 0.0) if limits else None,
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        """入力+出力トークン数"""
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cost_usd(self) -> float:
+        """推定コスト（USD）"""
+        input_price, output_price = get_model_pricing(self.model)
+        return (
+            self.input_tokens * input_price
+            + self.cache_creation_tokens * input_price * CACHE_WRITE_MULTIPLIER
+            + self.cache_read_tokens * input_price * CACHE_READ_MULTIPLIER
+            + self.output_tokens * output_price
+        ) / 1_000_000
+
+    def observe(self, sdk_message: Any) -> Optional[str]:
+        """
+        AssistantMessage の usage を積算し、上限超過を判定
+
+        同一APIレスポンスが複数メッセージに分割される場合があるため
+        message_id ごとに1回だけ積算します。
+
+        Args:
+            sdk_message: SDKメッセージ
+
+        Returns:
+            Optional[str]: 初めて上限を超えた場合の理由（"tokens" / "cost"）
+        """
+        usage = getattr(sdk_message, "usage", None)
+        if not usage:
+            return None
+        message_id = getattr(sdk_message, "message_id", None)
+        if message_id:
+            if message_id in self._seen_message_ids:
+                return None
+            self._seen_message_ids.add(message_id)
+
+        self.input_tokens += usage.get("input_tokens", 0) or 0
+        self.output_tokens += usage.get("output_tokens", 0) or 0
+        self.cache_read_tokens += usage.get("cache_read_input_tokens", 0) or 0
+        self.cache_creation_tokens += usage.get("cache_creation_input_tokens", 0) or 0
+
+        if self.exceeded:
+            return None
+        if self.max_tokens is not None and self.total_tokens >= self.max_tokens:
+            self.exceeded = "tokens"
+        elif self.max_cost_usd is not None and self.cost_usd >= self.max_cost_usd:
+            self.exceeded = "cost"
+        return self.exceeded
+
+    def to_usage_info(self) -> dict:
+        """ResultMessage を受信できなかった場合の使用量情報"""
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_input_tokens": self.cache_read_tokens,
+            "cache_creation_input_tokens": self.cache_creation_tokens,
+            "total_cost_usd": round(self.cost_usd, 6),
+            "duration_ms": 0,
+        }
@@ -0,0 +1,236 @@
+"""
+Usage Analytics Service
+
+使用量台帳（usage_ledger）を時間バケット単位で集計するサービス
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.database import UsageLedgerModel
+from app.models.errors import ValidationError
+
+# バケット間隔ごとの最大集計期間（日数）
+INTERVAL_MAX_DAYS = {
+    "hour": 14,
+    "day": 366,
+    "week": 366 * 2,
+}
+
+# グループ化キー -> 台帳カラム
+GROUP_BY_COLUMNS = {
+    "project": UsageLedgerModel.project_id,
+    "model": UsageLedgerModel.model,
+    "user": UsageLedgerModel.user_id,
+    "session": UsageLedgerModel.session_id,
+}
+
+# 集計値カラム
+METRIC_COLUMNS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_tokens",
+    "cache_creation_tokens",
+    "cost_usd",
+    "duration_ms",
+    "tool_count",
+)
+
+
+class _TTLCache:
+    """短期間の集計結果キャッシュ（LRU + TTL）"""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, dict]]" = OrderedDict()
+
+    def get(self, key: Tuple, ttl: float) -> Optional[dict]:
+        """有効期限内の結果を取得"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple, value: dict) -> None:
+        """結果を登録（上限超過時は最も古いエントリを破棄）"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """全件削除"""
+        self._entries.clear()
+
+
+# グローバル結果キャッシュ
+_analytics_cache = _TTLCache()
+
+
+def _bucket_expression(interval: str, dialect: str = "mysql"):
+    """
+    JST基準のバケット開始時刻（'YYYY-MM-DD HH:00:00' 形式の文字列）を返すSQL式
+
+    Args:
+        interval: バケット間隔（hour/day/week、週は月曜始まり）
+        dialect: SQLダイアレクト名（MySQL以外は SQLite の日付関数を使用）
+    """
+    created_at = UsageLedgerModel.created_at
+    if dialect != "mysql":
+        if interval == "hour":
+            return func.strftime("%Y-%m-%d %H:00:00", created_at, "+9 hours")
+        if interval == "day":
+            return func.strftime("%Y-%m-%d 00:00:00", created_at, "+9 hours")
+        # 6日戻してから次の月曜（当日を含む）へ進める
+        return func.strftime("%Y-%m-%d 00:00:00", created_at, "+9 hours", "-6 days", "weekday 1")
+
+    # created_at はUTCで保存されているためJSTに変換してから丸める
+    jst = func.convert_tz(created_at, "+00:00", "+09:00")
+    if interval == "hour":
+        return func.date_format(jst, "%Y-%m-%d %H:00:00")
+    if interval == "day":
+        return func.date_format(jst, "%Y-%m-%d 00:00:00")
+    # 週は月曜始まり
+    return func.date_format(func.subdate(jst, func.weekday(jst)), "%Y-%m-%d 00:00:00")
+
+
+class UsageAnalyticsService:
+    """使用量分析サービス"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _validate(
+        self,
+        project_ids: List[str],
+        interval: str,
+        group_by: Optional[str],
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """パラメータ検証"""
+        if not project_ids:
+            raise ValidationError("At least one project_id is required")
+        if interval not in INTERVAL_MAX_DAYS:
+            raise ValidationError(f"interval must be one of: {', '.join(INTERVAL_MAX_DAYS)}")
+        if group_by is not None and group_by not in GROUP_BY_COLUMNS:
+            raise ValidationError(f"group_by must be one of: {', '.join(GROUP_BY_COLUMNS)}")
+        if start >= end:
+            raise ValidationError("start must be before end")
+        if end - start > timedelta(days=INTERVAL_MAX_DAYS[interval]):
+            raise ValidationError(
+                f"Range too large for interval '{interval}' "
+                f"(max {INTERVAL_MAX_DAYS[interval]} days)"
+            )
+
+    async def get_usage_series(
+        self,
+        project_ids: List[str],
+        interval: str = "day",
+        group_by: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> dict:
+        """
+        時間バケット単位の使用量系列を取得
+
+        Args:
+            project_ids: 対象プロジェクトID一覧
+            interval: バケット間隔（hour/day/week、JST基準）
+            group_by: 系列の分割キー（project/model/user/session、省略時は合算）
+            start: 集計開始日時（省略時は end の30日前、hour は7日前）
+            end: 集計終了日時（省略時は現在）
+
+        Returns:
+            dict: interval, group_by, start, end, series, totals
+        """
+        if end is None:
+            # 現在時刻は分単位で切り上げ、同一分内のリクエストでキャッシュを共有する
+            now = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+            end = now + timedelta(minutes=1)
+        else:
+            end = _to_naive_utc(end)
+        if start is None:
+            start = end - timedelta(days=7 if interval == "hour" else 30)
+        else:
+            start = _to_naive_utc(start)
+        project_ids = sorted(set(project_ids))
+        self._validate(project_ids, interval, group_by, start, end)
+
+        cache_key = (tuple(project_ids), interval, group_by, start, end)
+        cached = _analytics_cache.get(cache_key, settings.usage_analytics_cache_ttl_seconds)
+        if cached is not None:
+            return cached
+
+        dialect = self.session.get_bind().dialect.name
+        bucket = _bucket_expression(interval, dialect).label("bucket")
+        group_column = GROUP_BY_COLUMNS[group_by].label("group_key") if group_by else None
+
+        columns: List[Any] = [bucket]
+        if group_column is not None:
+            columns.append(group_column)
+        columns.extend(
+            func.coalesce(func.sum(getattr(UsageLedgerModel, name)), 0).label(name)
+            for name in METRIC_COLUMNS
+        )
+        columns.append(func.count(UsageLedgerModel.id).label("turns"))
+
+        stmt = (
+            select(*columns)
+            .where(UsageLedgerModel.project_id.in_(project_ids))
+            .where(UsageLedgerModel.created_at >= start)
+            .where(UsageLedgerModel.created_at < end)
+            .group_by(*([bucket, group_column] if group_column is not None else [bucket]))
+            .order_by(bucket)
+        )
+        result = await self.session.execute(stmt)
+
+        series: Dict[Optional[str], dict] = {}
+        totals = _empty_metrics()
+        for row in result:
+            key = row.group_key if group_column is not None else None
+            entry = series.setdefault(key, {"key": key, "points": [], "totals": _empty_metrics()})
+            point = {"bucket": row.bucket}
+            for name in METRIC_COLUMNS + ("turns",):
+                value = float(getattr(row, name)) if name == "cost_usd" else int(getattr(row, name))
+                point[name] = value
+                entry["totals"][name] += value
+                totals[name] += value
+            entry["points"].append(point)
+
+        response = {
+            "project_ids": project_ids,
+            "interval": interval,
+            "group_by": group_by,
+            "start": start.replace(tzinfo=timezone.utc).isoformat(),
+            "end": end.replace(tzinfo=timezone.utc).isoformat(),
+            "series": list(series.values()),
+            "totals": totals,
+        }
+        _analytics_cache.set(cache_key, response)
+        return response
+
+
+def _empty_metrics() -> dict:
+    """集計値の初期値"""
+    metrics = {name: 0 for name in METRIC_COLUMNS + ("turns",)}
+    metrics["cost_usd"] = 0.0
+    return metrics
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """DB比較用にタイムゾーンなしUTCへ変換（naiveはUTCとみなす）"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
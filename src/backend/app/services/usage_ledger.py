@@ -0,0 +1,196 @@
+"""
+Usage Ledger
+
+ターン単位の使用量台帳（追記専用）への非同期バッチ書き込み
+
+チャット処理は record() でバッファに積むだけで、DB書き込みは
+バックグラウンドのフラッシャーが一定間隔・一定件数ごとにまとめて行います。
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.models.database import UsageLedgerModel
+from app.utils.database import get_session_context
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class UsageLedgerEntry:
+    """使用量台帳エントリ（1ターン分）"""
+    project_id: str
+    session_id: str
+    user_id: Optional[str] = None
+    model: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cost_usd: float = 0.0
+    duration_ms: int = 0
+    tool_count: int = 0
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def from_usage_info(
+        cls,
+        usage_info: dict,
+        project_id: str,
+        session_id: str,
+        user_id: Optional[str] = None,
+        model: Optional[str] = None,
+        tool_count: int = 0,
+    ) -> "UsageLedgerEntry":
+        """_stream_response の usage_info から作成"""
+        return cls(
+            project_id=project_id,
+            session_id=session_id,
+            user_id=user_id,
+            model=model,
+            input_tokens=usage_info.get("input_tokens", 0) or 0,
+            output_tokens=usage_info.get("output_tokens", 0) or 0,
+            cache_read_tokens=usage_info.get("cache_read_input_tokens", 0) or 0,
+            cache_creation_tokens=usage_info.get("cache_creation_input_tokens", 0) or 0,
+            cost_usd=usage_info.get("total_cost_usd", 0) or 0.0,
+            duration_ms=usage_info.get("duration_ms", 0) or 0,
+            tool_count=tool_count,
+        )
+
+
+class UsageLedgerWriter:
+    """
+    使用量台帳のバッチライター
+
+    責務:
+    - エントリのバッファリング（I/Oなし）
+    - 一定間隔またはバッチサイズ到達時の一括INSERT
+    - 停止時の残りエントリのフラッシュ
+    """
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_buffer: Optional[int] = None,
+    ):
+        """
+        Args:
+            flush_interval: フラッシュ間隔（秒）
+            batch_size: 1回のINSERTの最大件数（到達時は即時フラッシュ）
+            max_buffer: バッファ上限（超過時は古いエントリを破棄）
+        """
+        self.flush_interval = flush_interval or settings.usage_ledger_flush_interval_seconds
+        self.batch_size = batch_size or settings.usage_ledger_batch_size
+        self.max_buffer = max_buffer or settings.usage_ledger_max_buffer
+        self._buffer: Deque[UsageLedgerEntry] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.dropped = 0
+
+    def record(self, entry: UsageLedgerEntry) -> None:
+        """
+        エントリをバッファに追加（チャット処理から呼び出し、待機しない）
+
+        Args:
+            entry: 使用量台帳エントリ
+        """
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+            logger.warning("Usage ledger buffer full, dropping oldest entry", dropped=self.dropped)
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        """未書き込みのエントリ数"""
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """フラッシャーを起動"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info("Usage ledger flusher started", flush_interval=self.flush_interval)
+
+    async def stop(self) -> None:
+        """フラッシャーを停止し、残りのエントリを書き込む"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+        logger.info("Usage ledger flusher stopped", dropped=self.dropped)
+
+    async def _run(self) -> None:
+        """フラッシュループ"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+        # 停止時は残りをすべて書き込む
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    async def flush(self) -> bool:
+        """
+        バッファのエントリをバッチでINSERT
+
+        Returns:
+            bool: 書き込みに成功したか（失敗時はエントリをバッファに戻す）
+        """
+        while self._buffer:
+            batch: List[UsageLedgerEntry] = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+
+            try:
+                async with get_session_context() as db_session:
+                    await db_session.execute(
+                        insert(UsageLedgerModel), [asdict(entry) for entry in batch]
+                    )
+            except Exception as e:
+                # 次回フラッシュで再試行するため先頭に戻す
+                self._buffer.extendleft(reversed(batch))
+                logger.error("Failed to flush usage ledger", count=len(batch), error=str(e))
+                return False
+
+            logger.debug("Usage ledger flushed", count=len(batch))
+        return True
+
+
+# グローバルライターインスタンス
+_ledger_writer: Optional[UsageLedgerWriter] = None
+
+
+def get_usage_ledger() -> UsageLedgerWriter:
+    """使用量台帳ライターを取得"""
+    global _ledger_writer
+
+    if _ledger_writer is None:
+        _ledger_writer = UsageLedgerWriter()
+    return _ledger_writer
+
+
+async def shutdown_usage_ledger() -> None:
+    """使用量台帳ライターを停止"""
+    global _ledger_writer
+
+    if _ledger_writer:
+        await _ledger_writer.stop()
+        _ledger_writer = None
@@ -4,41 +4,274 @@ Usage Service
 プロジェクトの使用量集計と利用制限チェックサービス
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Tuple, List
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple, List
 
 from sqlalchemy import select, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.database import ProjectModel, SessionModel
+from app.config import settings
+from app.models.database import ProjectModel, ProjectUsageDailyModel, SessionModel
+from app.utils.database import get_session_context
 from app.utils.helpers import jst_now
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # JSTタイムゾーン
 JST = timezone(timedelta(hours=9))
 
+# 利用制限の集計期間（日数）
+PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+
+
+def _jst_today() -> date:
+    """JSTの今日の日付"""
+    return datetime.now(JST).date()
+
+
+@dataclass
+class ProjectBudget:
+    """プロジェクトの利用制限と直近30日の日別コスト（キャッシュエントリ）"""
+    limit_daily: Optional[float]
+    limit_weekly: Optional[float]
+    limit_monthly: Optional[float]
+    daily_costs: Dict[date, float] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def add_cost(self, usage_date: date, cost_usd: float) -> None:
+        """日別コストに加算"""
+        self.daily_costs[usage_date] = self.daily_costs.get(usage_date, 0.0) + cost_usd
+
+    def period_costs(self) -> Dict[str, float]:
+        """期間別（daily/weekly/monthly）コストを集計"""
+        today = _jst_today()
+        costs = {period: 0.0 for period in PERIOD_DAYS}
+        for usage_date, cost in self.daily_costs.items():
+            age = (today - usage_date).days
+            for period, days in PERIOD_DAYS.items():
+                if 0 <= age < days:
+                    costs[period] += cost
+        return costs
+
+
+class ProjectBudgetCache:
+    """
+    プロジェクト予算のインメモリキャッシュ（ワーカープロセス単位）
+
+    - DBから初回ロード（制限値 + 日次ロールアップ最大30行）
+    - 使用量記録時にライトスルーで加算
+    - 利用制限の更新時に無効化
+    - 定期リコンシリエーションで他ワーカー分の使用量を反映
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, ProjectBudget] = {}
+
+    def get(self, project_id: str) -> Optional[ProjectBudget]:
+        """有効期限内のエントリを取得"""
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > settings.budget_cache_max_age_seconds:
+            del self._entries[project_id]
+            return None
+        return entry
+
+    def set(self, project_id: str, entry: ProjectBudget) -> None:
+        """エントリを登録"""
+        self._entries[project_id] = entry
+
+    def add_cost(self, project_id: str, usage_date: date, cost_usd: float) -> None:
+        """キャッシュ済みのプロジェクトにコストを加算（未キャッシュなら何もしない）"""
+        entry = self._entries.get(project_id)
+        if entry is not None:
+            entry.add_cost(usage_date, cost_usd)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """エントリを無効化（project_id省略時は全件）"""
+        if project_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(project_id, None)
+
+    def project_ids(self) -> List[str]:
+        """キャッシュ済みプロジェクトID一覧"""
+        return list(self._entries)
+
+
+# グローバル予算キャッシュ
+_budget_cache = ProjectBudgetCache()
+
+
+def get_budget_cache() -> ProjectBudgetCache:
+    """予算キャッシュを取得"""
+    return _budget_cache
+
 
 class UsageService:
     """使用量サービス"""
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.budget_cache = _budget_cache if settings.budget_cache_enabled else None
 
-    def _get_jst_start_of_day(self, days_ago: int = 0) -> datetime:
+    def _get_jst_date(self, days_ago: int = 0) -> date:
         """
-        JST基準で指定日数前の0時0分を取得（UTC変換済み）
+        JST基準で指定日数前の日付を取得
 
         Args:
             days_ago: 何日前か（0=今日）
 
         Returns:
-            JSTの0時0分をUTCに変換したdatetime
+            JSTの日付
+        """
+        return (datetime.now(JST) - timedelta(days=days_ago)).date()
+
+    async def record_usage(
+        self,
+        project_id: str,
+        cost_usd: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_creation_tokens: int = 0,
+        total_tokens: Optional[int] = None,
+    ) -> None:
+        """
+        日次ロールアップに使用量を加算（コミットは呼び出し側）
+
+        使用量が発生したJST日付のバケットに加算するため、
+        長期間継続するセッションのコストも発生日に正しく計上されます。
+
+        Args:
+            project_id: プロジェクトID
+            cost_usd: コスト（USD）
+            input_tokens: 入力トークン数
+            output_tokens: 出力トークン数
+            cache_read_tokens: キャッシュ読み取りトークン数
+            cache_creation_tokens: キャッシュ作成トークン数
+            total_tokens: 合計トークン数（省略時は入力+出力）
+        """
+        if total_tokens is None:
+            total_tokens = input_tokens + output_tokens
+
+        stmt = mysql_insert(ProjectUsageDailyModel).values(
+            project_id=project_id,
+            usage_date=self._get_jst_date(),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_creation_tokens=cache_creation_tokens,
+            total_tokens=total_tokens,
+            cost_usd=cost_usd,
+            message_count=1,
+            updated_at=datetime.now(timezone.utc),
+        )
+        table = ProjectUsageDailyModel.__table__.c
+        stmt = stmt.on_duplicate_key_update(
+            input_tokens=table.input_tokens + stmt.inserted.input_tokens,
+            output_tokens=table.output_tokens + stmt.inserted.output_tokens,
+            cache_read_tokens=table.cache_read_tokens + stmt.inserted.cache_read_tokens,
+            cache_creation_tokens=table.cache_creation_tokens + stmt.inserted.cache_creation_tokens,
+            total_tokens=table.total_tokens + stmt.inserted.total_tokens,
+            cost_usd=table.cost_usd + stmt.inserted.cost_usd,
+            message_count=table.message_count + 1,
+            updated_at=stmt.inserted.updated_at,
+        )
+        await self.session.execute(stmt)
+
+        # ライトスルー（ロールバック時の過大計上は次回リコンシリエーションで補正）
+        if self.budget_cache is not None:
+            self.budget_cache.add_cost(project_id, self._get_jst_date(), cost_usd)
+
+    async def load_budgets(self, project_ids: Iterable[str]) -> Dict[str, ProjectBudget]:
+        """
+        複数プロジェクトの予算をDBから読み込む（2クエリ）
+
+        Args:
+            project_ids: プロジェクトID一覧
+
+        Returns:
+            Dict[str, ProjectBudget]: 存在するプロジェクトの予算
+        """
+        project_ids = list(project_ids)
+        if not project_ids:
+            return {}
+
+        result = await self.session.execute(
+            select(
+                ProjectModel.id,
+                ProjectModel.cost_limit_daily,
+                ProjectModel.cost_limit_weekly,
+                ProjectModel.cost_limit_monthly,
+            ).where(ProjectModel.id.in_(project_ids))
+        )
+        budgets = {
+            row.id: ProjectBudget(
+                limit_daily=row.cost_limit_daily,
+                limit_weekly=row.cost_limit_weekly,
+                limit_monthly=row.cost_limit_monthly,
+            )
+            for row in result
+        }
+        if not budgets:
+            return budgets
+
+        since = self._get_jst_date(PERIOD_DAYS["monthly"] - 1)
+        result = await self.session.execute(
+            select(
+                ProjectUsageDailyModel.project_id,
+                ProjectUsageDailyModel.usage_date,
+                ProjectUsageDailyModel.cost_usd,
+            )
+            .where(ProjectUsageDailyModel.project_id.in_(list(budgets)))
+            .where(ProjectUsageDailyModel.usage_date >= since)
+        )
+        for row in result:
+            budgets[row.project_id].add_cost(row.usage_date, float(row.cost_usd or 0.0))
+        return budgets
+
+    async def _get_budget(self, project_id: str) -> Optional[ProjectBudget]:
+        """予算を取得（キャッシュヒット時はI/Oなし）"""
+        if self.budget_cache is not None:
+            entry = self.budget_cache.get(project_id)
+            if entry is not None:
+                return entry
+
+        budget = (await self.load_budgets([project_id])).get(project_id)
+        if budget is not None and self.budget_cache is not None:
+            self.budget_cache.set(project_id, budget)
+        return budget
+
+    async def _get_daily_rows(self, project_id: str, days: int) -> List[ProjectUsageDailyModel]:
+        """直近N日分（JST）の日次ロールアップ行を取得（最大N行）"""
+        since = self._get_jst_date(days - 1)
+        result = await self.session.execute(
+            select(ProjectUsageDailyModel)
+            .where(ProjectUsageDailyModel.project_id == project_id)
+            .where(ProjectUsageDailyModel.usage_date >= since)
+        )
+        return list(result.scalars().all())
+
+    async def get_period_costs(self, project_id: str) -> Dict[str, float]:
+        """
+        期間別コストを1クエリ（最大30行）で取得
+
+        Args:
+            project_id: プロジェクトID
+
+        Returns:
+            {"daily": ..., "weekly": ..., "monthly": ...}
         """
-        # 現在のJST時刻
-        now_jst = datetime.now(JST)
-        # 指定日数前のJST 0時0分
-        start_of_day_jst = now_jst.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days_ago)
-        # UTCに変換して返す（DBはUTCで保存されているため）
-        return start_of_day_jst.astimezone(timezone.utc)
+        rows = await self._get_daily_rows(project_id, PERIOD_DAYS["monthly"])
+        budget = ProjectBudget(limit_daily=None, limit_weekly=None, limit_monthly=None)
+        for row in rows:
+            budget.add_cost(row.usage_date, float(row.cost_usd or 0.0))
+        return budget.period_costs()
 
     async def get_cost_by_period(
         self,
@@ -55,32 +288,28 @@ class UsageService:
         Returns:
             Tuple[cost, input_tokens, output_tokens]
         """
-        # JSTの0時基準で計算（days=1は今日の0時から、days=7は7日前の0時から）
-        since = self._get_jst_start_of_day(days - 1)  # days=1なら今日の0時、days=7なら6日前の0時
-
-        result = await self.session.execute(
-            select(
-                func.coalesce(func.sum(SessionModel.total_cost_usd), 0.0).label("cost"),
-                func.coalesce(func.sum(SessionModel.total_tokens), 0).label("tokens"),
-                func.count(SessionModel.id).label("session_count"),
-            )
-            .where(SessionModel.project_id == project_id)
-            .where(SessionModel.created_at >= since)
+        # JSTの0時基準で計算（days=1は今日、days=7は6日前から）
+        rows = await self._get_daily_rows(project_id, days)
+        return (
+            sum(float(r.cost_usd or 0.0) for r in rows),
+            sum(int(r.input_tokens or 0) for r in rows),
+            sum(int(r.output_tokens or 0) for r in rows),
         )
-        row = result.one()
-        return float(row.cost), int(row.tokens), int(row.session_count)
 
     async def get_usage_stats(self, project_id: str) -> dict:
         """
         プロジェクトの使用量統計を取得
 
+        利用制限と同じ値を返すよう、ターンと同一トランザクションで更新される
+        sessions / 日次ロールアップから集計します（使用量台帳は非同期書き込みのため対象外）。
+
         Args:
             project_id: プロジェクトID
 
         Returns:
             使用量統計辞書
         """
-        # 全期間の統計
+        # 全期間の統計（セッション数はプロジェクトあたり上限付き）
         result = await self.session.execute(
             select(
                 func.coalesce(func.sum(SessionModel.total_cost_usd), 0.0).label("total_cost"),
@@ -92,22 +321,30 @@ class UsageService:
         )
         total_row = result.one()
 
+        # 入出力トークン内訳（全期間、ロールアップから集計）
+        token_result = await self.session.execute(
+            select(
+                func.coalesce(func.sum(ProjectUsageDailyModel.input_tokens), 0).label("input_tokens"),
+                func.coalesce(func.sum(ProjectUsageDailyModel.output_tokens), 0).label("output_tokens"),
+            )
+            .where(ProjectUsageDailyModel.project_id == project_id)
+        )
+        token_row = token_result.one()
+
         # 期間別コスト
-        cost_daily, _, _ = await self.get_cost_by_period(project_id, 1)
-        cost_weekly, _, _ = await self.get_cost_by_period(project_id, 7)
-        cost_monthly, _, _ = await self.get_cost_by_period(project_id, 30)
+        costs = await self.get_period_costs(project_id)
 
         return {
             "project_id": project_id,
             "total_tokens": int(total_row.total_tokens),
             "total_cost": float(total_row.total_cost),
-            "input_tokens": 0,  # 現状SessionModelには分離されていない
-            "output_tokens": 0,
+            "input_tokens": int(token_row.input_tokens),
+            "output_tokens": int(token_row.output_tokens),
             "session_count": int(total_row.session_count),
             "message_count": int(total_row.message_count),
-            "cost_daily": cost_daily,
-            "cost_weekly": cost_weekly,
-            "cost_monthly": cost_monthly,
+            "cost_daily": costs["daily"],
+            "cost_weekly": costs["weekly"],
+            "cost_monthly": costs["monthly"],
         }
 
     async def check_cost_limits(self, project_id: str) -> dict:
@@ -120,13 +357,10 @@ class UsageService:
         Returns:
             利用制限チェック結果辞書
         """
-        # プロジェクトの制限設定を取得
-        result = await self.session.execute(
-            select(ProjectModel).where(ProjectModel.id == project_id)
-        )
-        project = result.scalar_one_or_none()
+        # 制限設定と期間別コスト（通常はキャッシュから）
+        budget = await self._get_budget(project_id)
 
-        if not project:
+        if not budget:
             return {
                 "project_id": project_id,
                 "can_use": False,
@@ -139,21 +373,21 @@ class UsageService:
                 "limit_monthly": None,
             }
 
-        # 期間別コスト取得
-        cost_daily, _, _ = await self.get_cost_by_period(project_id, 1)
-        cost_weekly, _, _ = await self.get_cost_by_period(project_id, 7)
-        cost_monthly, _, _ = await self.get_cost_by_period(project_id, 30)
+        costs = budget.period_costs()
+        cost_daily = costs["daily"]
+        cost_weekly = costs["weekly"]
+        cost_monthly = costs["monthly"]
 
         # 超過チェック
         exceeded_limits: List[str] = []
 
-        if project.cost_limit_daily is not None and cost_daily >= project.cost_limit_daily:
+        if budget.limit_daily is not None and cost_daily >= budget.limit_daily:
             exceeded_limits.append("daily")
 
-        if project.cost_limit_weekly is not None and cost_weekly >= project.cost_limit_weekly:
+        if budget.limit_weekly is not None and cost_weekly >= budget.limit_weekly:
             exceeded_limits.append("weekly")
 
-        if project.cost_limit_monthly is not None and cost_monthly >= project.cost_limit_monthly:
+        if budget.limit_monthly is not None and cost_monthly >= budget.limit_monthly:
             exceeded_limits.append("monthly")
 
         return {
@@ -163,9 +397,9 @@ class UsageService:
             "cost_daily": cost_daily,
             "cost_weekly": cost_weekly,
             "cost_monthly": cost_monthly,
-            "limit_daily": project.cost_limit_daily,
-            "limit_weekly": project.cost_limit_weekly,
-            "limit_monthly": project.cost_limit_monthly,
+            "limit_daily": budget.limit_daily,
+            "limit_weekly": budget.limit_weekly,
+            "limit_monthly": budget.limit_monthly,
         }
 
     async def update_cost_limits(
@@ -213,4 +447,34 @@ class UsageService:
         await self.session.commit()
         await self.session.refresh(project)
 
+        if self.budget_cache is not None:
+            self.budget_cache.invalidate(project_id)
+
         return project
+
+
+async def reconcile_budget_cache() -> int:
+    """
+    予算キャッシュをDBと突き合わせる（スケジューラから呼び出し）
+
+    他ワーカーで記録された使用量や削除済みプロジェクトを反映します。
+
+    Returns:
+        int: 再読み込みしたプロジェクト数
+    """
+    project_ids = _budget_cache.project_ids()
+    if not project_ids:
+        return 0
+
+    async with get_session_context() as db_session:
+        budgets = await UsageService(db_session).load_budgets(project_ids)
+
+    for project_id in project_ids:
+        budget = budgets.get(project_id)
+        if budget is None:
+            _budget_cache.invalidate(project_id)
+        else:
+            _budget_cache.set(project_id, budget)
+
+    logger.debug("Budget cache reconciled", projects=len(project_ids))
+    return len(budgets)
@@ -0,0 +1,176 @@
+"""
+Compression Utilities
+
+zstd / gzip / zlib 圧縮ヘルパー
+zstandard は任意依存のため、未インストール時は gzip / zlib にフォールバックします。
+"""
+
+import base64
+import gzip
+import io
+import os
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 任意依存
+    zstandard = None
+
+ZSTD_AVAILABLE = zstandard is not None
+
+# コーデック名 -> ファイル拡張子
+CODEC_EXTENSIONS = {
+    "zstd": ".zst",
+    "gzip": ".gz",
+}
+
+
+def default_codec() -> str:
+    """利用可能な最良のコーデック名を返す"""
+    return "zstd" if ZSTD_AVAILABLE else "gzip"
+
+
+def codec_from_path(path: Path) -> str:
+    """ファイル拡張子からコーデック名を判定"""
+    for codec, ext in CODEC_EXTENSIONS.items():
+        if path.name.endswith(ext):
+            return codec
+    raise ValueError(f"Unknown compression extension: {path.name}")
+
+
+def write_compressed_lines(path: Path, lines: Iterable[str]) -> int:
+    """
+    テキスト行を圧縮ファイルにアトミックに書き込む
+
+    一時ファイルに書き出してから rename するため、読み取り側が
+    書き込み途中のファイルを見ることはありません。
+
+    Args:
+        path: 出力先パス（拡張子でコーデックを決定）
+        lines: 改行を含まないテキスト行
+
+    Returns:
+        int: 書き込んだ圧縮後のバイト数
+    """
+    codec = codec_from_path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    with open(tmp_path, "wb") as raw:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is not installed")
+            compressor = zstandard.ZstdCompressor(level=3)
+            with compressor.stream_writer(raw, closefd=False) as writer:
+                for line in lines:
+                    writer.write(line.encode("utf-8") + b"\n")
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as writer:
+                for line in lines:
+                    writer.write(line.encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+def iter_compressed_lines(path: Path) -> Iterator[str]:
+    """
+    圧縮ファイルからテキスト行をストリーミングで読み出す
+
+    Args:
+        path: 入力パス（拡張子でコーデックを判定）
+
+    Yields:
+        str: 改行を除いたテキスト行
+    """
+    codec = codec_from_path(path)
+
+    with open(path, "rb") as raw:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is not installed")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+        else:
+            reader = gzip.GzipFile(fileobj=raw, mode="rb")
+
+        with io.TextIOWrapper(reader, encoding="utf-8") as text:
+            for line in text:
+                line = line.rstrip("\n")
+                if line:
+                    yield line
+
+
+# ============================================
+# Text Compression (DBカラム格納用)
+# ============================================
+
+# 圧縮済みテキストのマーカー（"{marker}{codec}:{base64}" 形式）
+# 通常のメッセージ本文がこの接頭辞で始まることはないため、
+# マーカーの無い既存行はそのまま平文として読み出せます。
+TEXT_COMPRESSION_MARKER = "\x00cz1:"
+
+
+def is_compressed_text(value: str) -> bool:
+    """圧縮済みテキストかどうか"""
+    return value.startswith(TEXT_COMPRESSION_MARKER)
+
+
+def compress_text(text: str, threshold: int) -> Tuple[str, int]:
+    """
+    しきい値を超えるテキストを圧縮してマーカー付き文字列に変換
+
+    圧縮しても小さくならない場合は元のテキストを返します。
+
+    Args:
+        text: 元のテキスト
+        threshold: 圧縮対象とする最小バイト数
+
+    Returns:
+        Tuple[str, int]: (格納用文字列, 元のUTF-8バイト数)
+    """
+    raw = text.encode("utf-8")
+    if len(raw) < threshold or is_compressed_text(text):
+        return text, len(raw)
+
+    if ZSTD_AVAILABLE:
+        codec = "zstd"
+        payload = zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        codec = "zlib"
+        payload = zlib.compress(raw, 6)
+
+    encoded = f"{TEXT_COMPRESSION_MARKER}{codec}:{base64.b64encode(payload).decode('ascii')}"
+    if len(encoded) >= len(raw):
+        return text, len(raw)
+    return encoded, len(raw)
+
+
+def decompress_text(value: str) -> str:
+    """
+    compress_text で圧縮された文字列を復元（未圧縮の場合はそのまま返す）
+
+    Args:
+        value: 格納されている文字列
+
+    Returns:
+        str: 元のテキスト
+    """
+    if not is_compressed_text(value):
+        return value
+
+    codec, _, encoded = value[len(TEXT_COMPRESSION_MARKER):].partition(":")
+    payload = base64.b64decode(encoded)
+
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == "zlib":
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown text compression codec: {codec}")
+    return raw.decode("utf-8")
@@ -4,18 +4,25 @@ Database Connection Manager
 MySQL/SQLAlchemy接続管理
 """
 
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from itertools import chain
+from typing import AsyncGenerator, Dict, Iterable, Optional, Set
 
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.models.database import Base
+from app.models.database import ProjectModel, SessionModel
 from app.utils.logger import get_logger
+from app.utils.migrations import ensure_schema
+from app.utils.redis_client import get_redis
 
 logger = get_logger(__name__)
 
@@ -23,21 +30,55 @@ logger = get_logger(__name__)
 _engine = None
 _async_session_factory = None
 
+# Read replica engine and session factory (optional)
+_read_engine = None
+_read_session_factory = None
 
-def get_database_url() -> str:
+# 読み取りルーティング状態
+# - _recent_writes: エンティティID -> 最終書き込み時刻（monotonic）
+# - _unshared_writes: Redis へ未共有の書き込みキー
+# - _replica_state: レプリカ遅延チェック結果（一定間隔でのみ再チェック）
+_recent_writes: Dict[str, float] = {}
+_RECENT_WRITES_MAX = 10000
+_unshared_writes: Set[str] = set()
+_replica_state = {"healthy": False, "lag_seconds": None, "checked_at": 0.0}
+_replica_lock: Optional[asyncio.Lock] = None
+_routing_stats = {"replica": 0, "primary": 0}
+
+# 書き込みマーカーをワーカー間で共有する Redis（REDIS_URL 設定時のみ）
+_redis = None
+_RECENT_WRITE_KEY_PREFIX = "read_your_writes:"
+
+
+def get_database_url(host: Optional[str] = None, port: Optional[int] = None) -> str:
     """
     データベースURL取得
 
+    Args:
+        host: 接続先ホスト（省略時はプライマリ）
+        port: 接続先ポート（省略時はプライマリ）
+
     Returns:
         str: MySQL接続URL
     """
     return (
         f"mysql+aiomysql://{settings.mysql_user}:{settings.mysql_password}"
-        f"@{settings.mysql_host}:{settings.mysql_port}/{settings.mysql_database}"
+        f"@{host or settings.mysql_host}:{port or settings.mysql_port}/{settings.mysql_database}"
         f"?charset=utf8mb4"
     )
 
 
+def _session_factory(engine) -> async_sessionmaker:
+    """セッションファクトリ作成"""
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
 async def init_database() -> None:
     """
     データベース初期化
@@ -53,22 +94,19 @@ async def init_database() -> None:
         database_url,
         echo=settings.debug,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
         pool_recycle=3600,
     )
 
-    _async_session_factory = async_sessionmaker(
-        bind=_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+    _async_session_factory = _session_factory(_engine)
+
+    # 読み取りレプリカ（任意）
+    if settings.mysql_read_host:
+        _init_read_engine()
 
-    # テーブル作成
-    async with _engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # スキーマバージョン確認（未適用分は DB_AUTO_MIGRATE 指定時のみ適用）
+    await ensure_schema(_engine, auto_migrate=settings.db_auto_migrate)
 
     logger.info("Database initialized successfully")
 
@@ -77,6 +115,17 @@ async def close_database() -> None:
     """データベース接続をクローズ"""
     global _engine, _async_session_factory
 
+    global _read_engine, _read_session_factory, _redis
+
+    # 共有 Redis クライアントは shutdown_redis でクローズ
+    _redis = None
+
+    if _read_engine:
+        logger.info("Closing read replica connection")
+        await _read_engine.dispose()
+        _read_engine = None
+        _read_session_factory = None
+
     if _engine:
         logger.info("Closing database connection")
         await _engine.dispose()
@@ -102,6 +151,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
+            await _share_recent_writes()
             await session.close()
 
 
@@ -125,9 +175,22 @@ async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
+            await _share_recent_writes()
             await session.close()
 
 
+def get_engine():
+    """
+    プライマリのエンジン取得
+
+    Returns:
+        AsyncEngine: エンジン
+    """
+    if _engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    return _engine
+
+
 def get_session_factory() -> async_sessionmaker:
     """
     セッションファクトリ取得
@@ -138,3 +201,243 @@ def get_session_factory() -> async_sessionmaker:
     if _async_session_factory is None:
         raise RuntimeError("Database not initialized. Call init_database() first.")
     return _async_session_factory
+
+
+# ============================================
+# Read Replica Routing
+# ============================================
+
+
+def _init_read_engine() -> None:
+    """読み取りレプリカのエンジンとセッションファクトリを作成"""
+    global _read_engine, _read_session_factory, _redis
+
+    logger.info("Initializing read replica connection", host=settings.mysql_read_host)
+    _read_engine = create_async_engine(
+        get_database_url(settings.mysql_read_host, settings.mysql_read_port),
+        echo=settings.debug,
+        pool_pre_ping=True,
+        pool_size=settings.db_read_pool_size,
+        max_overflow=settings.db_read_max_overflow,
+        pool_recycle=3600,
+    )
+    _read_session_factory = _session_factory(_read_engine)
+    _replica_state.update(healthy=False, lag_seconds=None, checked_at=0.0)
+
+    # 書き込み直後の読み取りが別ワーカーに届いてもプライマリへ振り分けられるよう共有
+    _redis = get_redis()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_keys(session: Session, flush_context) -> None:
+    """フラッシュされたエンティティのID（セッション/プロジェクト）を記録"""
+    keys = session.info.setdefault("written_keys", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (SessionModel, ProjectModel)):
+            keys.add(obj.id)
+        for attr in ("session_id", "project_id"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, str):
+                keys.add(value)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_written_keys(session: Session) -> None:
+    """コミット済みの書き込みを read-your-writes 判定用に登録"""
+    keys = session.info.pop("written_keys", None)
+    if keys:
+        mark_recent_write(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_keys(session: Session) -> None:
+    """ロールバックされた書き込みは登録しない"""
+    session.info.pop("written_keys", None)
+
+
+def mark_recent_write(*keys: str) -> None:
+    """
+    書き込みを記録（一定時間、該当キーの読み取りはプライマリへ）
+
+    ORMのフラッシュは自動で記録されます。一括UPDATE等で
+    ORMを経由しない書き込みを行った場合に明示的に呼び出します。
+    REDIS_URL 設定時は get_session / get_session_context の終了時に
+    Redis へ共有され、他のワーカーの読み取りにも反映されます。
+
+    Args:
+        keys: セッションIDやプロジェクトID
+    """
+    now = time.monotonic()
+    if len(_recent_writes) > _RECENT_WRITES_MAX:
+        expired_before = now - settings.read_your_writes_window
+        for key in [k for k, t in _recent_writes.items() if t < expired_before]:
+            del _recent_writes[key]
+    for key in keys:
+        _recent_writes[key] = now
+    if _redis is not None:
+        _unshared_writes.update(keys)
+
+
+async def _share_recent_writes() -> None:
+    """未共有の書き込みを Redis に登録（TTL は read-your-writes 期間）"""
+    if _redis is None or not _unshared_writes:
+        return
+
+    keys = list(_unshared_writes)
+    _unshared_writes.clear()
+    try:
+        async with _redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(
+                    f"{_RECENT_WRITE_KEY_PREFIX}{key}",
+                    1,
+                    px=int(settings.read_your_writes_window * 1000),
+                )
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to share recent writes", keys=len(keys), error=str(e))
+
+
+async def _has_recent_write(keys: Iterable[str]) -> bool:
+    """いずれかのキーが read-your-writes 期間内に書き込まれたか（他ワーカー分を含む）"""
+    keys = list(keys)
+    if not keys:
+        return False
+
+    threshold = time.monotonic() - settings.read_your_writes_window
+    if any(_recent_writes.get(key, 0.0) >= threshold for key in keys):
+        return True
+    if _redis is None:
+        return False
+
+    try:
+        return bool(await _redis.exists(*(f"{_RECENT_WRITE_KEY_PREFIX}{key}" for key in keys)))
+    except Exception as e:
+        # 判定できない場合は整合性を優先してプライマリへ
+        logger.warning("Recent write lookup failed", error=str(e))
+        return True
+
+
+async def _query_replica_lag() -> Optional[float]:
+    """
+    レプリカ遅延（秒）を取得
+
+    Returns:
+        Optional[float]: 遅延秒数（レプリケーション停止時は None）
+    """
+    async with _read_engine.connect() as conn:
+        # MySQL 8.0.22+ は REPLICA、それ以前は SLAVE
+        for statement, column in (
+            ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+            ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+        ):
+            try:
+                result = await conn.execute(text(statement))
+            except Exception:
+                continue
+            row = result.mappings().first()
+            if row is None:
+                # レプリケーション設定の無いサーバー（プロキシ経由等）は遅延なしとみなす
+                return 0.0
+            lag = row.get(column)
+            return float(lag) if lag is not None else None
+    raise RuntimeError("Unable to query replica status")
+
+
+async def _replica_available() -> bool:
+    """レプリカが読み取りに使えるか（遅延チェック結果をキャッシュ）"""
+    global _replica_lock
+
+    if _read_session_factory is None:
+        return False
+
+    if time.monotonic() - _replica_state["checked_at"] < settings.replica_lag_check_interval:
+        return _replica_state["healthy"]
+
+    if _replica_lock is None:
+        _replica_lock = asyncio.Lock()
+
+    async with _replica_lock:
+        # 他のタスクがチェック済みの場合はその結果を使う
+        if time.monotonic() - _replica_state["checked_at"] < settings.replica_lag_check_interval:
+            return _replica_state["healthy"]
+
+        try:
+            lag = await _query_replica_lag()
+        except Exception as e:
+            logger.warning("Replica lag check failed", error=str(e))
+            lag = None
+
+        healthy = lag is not None and lag <= settings.replica_max_lag_seconds
+        if healthy != _replica_state["healthy"]:
+            logger.info("Read replica state changed", healthy=healthy, lag_seconds=lag)
+        _replica_state.update(healthy=healthy, lag_seconds=lag, checked_at=time.monotonic())
+        return healthy
+
+
+@asynccontextmanager
+async def get_read_session_context(
+    consistency_keys: Iterable[str] = (),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    読み取り専用セッション取得
+
+    レプリカが設定されていて遅延が許容範囲内であればレプリカを使用します。
+    consistency_keys のいずれかが直前に書き込まれている場合は
+    read-your-writes を保証するためプライマリを使用します。
+
+    Args:
+        consistency_keys: 読み取り対象のセッションIDやプロジェクトID
+
+    Usage:
+        async with get_read_session_context([session_id]) as session:
+            # read-only queries
+    """
+    if _async_session_factory is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+
+    factory = _async_session_factory
+    if await _replica_available() and not await _has_recent_write(consistency_keys):
+        factory = _read_session_factory
+        _routing_stats["replica"] += 1
+    else:
+        _routing_stats["primary"] += 1
+
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            # 読み取り専用のためコミットしない
+            await session.close()
+
+
+def _pool_metrics(engine) -> dict:
+    """エンジンのコネクションプール状態"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_metrics() -> dict:
+    """
+    エンジンごとのコネクションプール・読み取りルーティング統計
+
+    Returns:
+        dict: primary / replica のプール状態と読み取りルーティング件数
+    """
+    metrics = {
+        "primary": _pool_metrics(_engine) if _engine else None,
+        "replica": None,
+        "read_routing": dict(_routing_stats),
+    }
+    if _read_engine:
+        metrics["replica"] = {
+            **_pool_metrics(_read_engine),
+            "healthy": _replica_state["healthy"],
+            "lag_seconds": _replica_state["lag_seconds"],
+        }
+    return metrics
@@ -0,0 +1,176 @@
+"""
+Filesystem Sync Utilities
+
+マニフェストによるディレクトリの差分同期
+
+目的のファイル集合（相対パス -> 内容）とマニフェスト（前回書き出した
+ファイルのハッシュ）を比較し、変更されたファイルのみを一時ファイル+renameで
+アトミックに書き込み、不要になったファイルのみを削除します。
+マニフェスト上は変更がなくても、ディスク上のファイルが外部で編集されていれば
+（サイズまたはハッシュが異なれば）書き直します。
+同期中もディレクトリが空になることはありません。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ディレクトリ単位の排他（同一ディレクトリへの同時同期を直列化）
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+@dataclass
+class SyncResult:
+    """同期結果"""
+    written: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def touched(self) -> int:
+        """書き込み・削除したファイル数"""
+        return self.written + self.deleted
+
+
+def _content_hash(content: str) -> str:
+    """内容のSHA-256"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _matches_on_disk(path: Path, content: str, digest: str) -> bool:
+    """ディスク上のファイルが内容と一致するか（サイズで先に判定し、同じ場合のみハッシュを比較）"""
+    try:
+        if path.stat().st_size != len(content.encode("utf-8")):
+            return False
+        return hashlib.sha256(path.read_bytes()).hexdigest() == digest
+    except OSError:
+        return False
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """
+    一時ファイルに書き込んでから rename で置き換え
+
+    Args:
+        path: 書き込み先
+        content: 内容
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _load_manifest(manifest_path: Path, root: Path) -> Dict[str, Optional[str]]:
+    """
+    マニフェストを読み込み
+
+    マニフェストがない場合（差分同期導入前に全件書き出したディレクトリ）は
+    既存ファイルをすべて管理対象とみなします。
+    """
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning("Invalid sync manifest, rebuilding", path=str(manifest_path), error=str(e))
+
+    if not root.is_dir():
+        return {}
+    return {
+        path.relative_to(root).as_posix(): None
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+def _remove_empty_parents(path: Path, root: Path) -> None:
+    """削除したファイルの空になった親ディレクトリを root まで削除"""
+    parent = path.parent
+    while parent != root and root in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+
+
+def sync_directory(root: Path, files: Dict[str, str], manifest_path: Path) -> SyncResult:
+    """
+    ディレクトリを目的のファイル集合に差分同期
+
+    Args:
+        root: 同期先ディレクトリ
+        files: 相対パス（POSIX形式） -> 内容
+        manifest_path: マニフェストファイルのパス（root の外に置く）
+
+    Returns:
+        SyncResult: 書き込み・削除・変更なしのファイル数
+    """
+    with _locks_guard:
+        lock = _locks.setdefault(str(root), threading.Lock())
+
+    with lock:
+        result = SyncResult()
+        manifest = _load_manifest(manifest_path, root)
+        new_manifest: Dict[str, str] = {}
+
+        for relative_path, content in files.items():
+            digest = _content_hash(content)
+            path = root / relative_path
+            if manifest.get(relative_path) == digest and _matches_on_disk(path, content, digest):
+                result.unchanged += 1
+            else:
+                atomic_write_text(path, content)
+                result.written += 1
+            new_manifest[relative_path] = digest
+
+        for relative_path in manifest.keys() - new_manifest.keys():
+            path = root / relative_path
+            try:
+                path.unlink()
+                result.deleted += 1
+            except FileNotFoundError:
+                pass
+            _remove_empty_parents(path, root)
+
+        if result.touched or manifest.keys() != new_manifest.keys() or not manifest_path.exists():
+            atomic_write_text(manifest_path, json.dumps(new_manifest, sort_keys=True))
+        return result
+
+
+async def sync_directory_async(
+    root: Path, files: Dict[str, str], manifest_path: Path
+) -> SyncResult:
+    """
+    sync_directory をスレッドで実行（イベントループをブロックしない）
+
+    Args:
+        root: 同期先ディレクトリ
+        files: 相対パス（POSIX形式） -> 内容
+        manifest_path: マニフェストファイルのパス
+
+    Returns:
+        SyncResult: 同期結果
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, sync_directory, root, files, manifest_path)
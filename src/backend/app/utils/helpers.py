@@ -5,11 +5,19 @@ Helper Functions
 """
 
 import hashlib
+import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from zoneinfo import ZoneInfo
 
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+from app.utils.ip_allowlist import IPAllowlist
+
 # 日本標準時（JST）タイムゾーン
 JST = ZoneInfo("Asia/Tokyo")
 
@@ -24,9 +32,86 @@ def jst_now() -> datetime:
     return datetime.now(JST)
 
 
+# UUIDv7 生成用の単調増加状態（同一ミリ秒内の順序保証）
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def generate_uuid7() -> uuid.UUID:
+    """
+    UUID v7 を生成（RFC 9562）
+
+    先頭48bitがUnixミリ秒タイムスタンプのため、生成順にソートされます。
+    同一ミリ秒内は12bitカウンタ（rand_a）で単調増加を保証します。
+
+    Returns:
+        uuid.UUID: 時系列順のUUID
+    """
+    global _uuid7_last_ms, _uuid7_counter
+
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x3FF
+        else:
+            # 時計の巻き戻り・同一ミリ秒：カウンタを進め、溢れたら論理時刻を進める
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        ms = _uuid7_last_ms
+        counter = _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    value = (
+        (ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
+
+
 def generate_id() -> str:
-    """UUID v4 を生成"""
-    return str(uuid.uuid4())
+    """
+    時系列順のID（UUID v7文字列）を生成
+
+    既存のString(36)カラムと互換の形式で、InnoDBクラスタインデックスへの
+    挿入が末尾追記中心になります。
+    """
+    return str(generate_uuid7())
+
+
+def uuid7_to_datetime(value: str) -> Optional[datetime]:
+    """
+    UUID v7 文字列から生成時刻を取得
+
+    Args:
+        value: UUID文字列
+
+    Returns:
+        Optional[datetime]: 生成時刻（UTC）。v7以外の場合None
+    """
+    try:
+        parsed = uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if parsed.version != 7:
+        return None
+    return datetime.fromtimestamp((parsed.int >> 80) / 1000, tz=timezone.utc)
+
+
+def uuid_to_bin(value: str) -> bytes:
+    """UUID文字列をBINARY(16)格納用のバイト列に変換"""
+    return uuid.UUID(value).bytes
+
+
+def bin_to_uuid(value: bytes) -> str:
+    """BINARY(16)のバイト列をUUID文字列に変換"""
+    return str(uuid.UUID(bytes=value))
 
 
 def generate_hash(data: str) -> str:
@@ -52,3 +137,60 @@ def truncate_string(s: str, max_length: int = 100, suffix: str = "...") -> str:
     if len(s) <= max_length:
         return s
     return s[: max_length - len(suffix)] + suffix
+
+
+# コンパイル済みの信頼済みプロキシ（設定値, マッチャー）
+_trusted_proxies: Optional[tuple] = None
+
+
+def _get_trusted_proxies() -> IPAllowlist:
+    """信頼済みプロキシのマッチャー（設定値が変わった場合は再コンパイル）"""
+    global _trusted_proxies
+
+    raw = settings.trusted_proxies
+    if _trusted_proxies is None or _trusted_proxies[0] != raw:
+        entries = [entry.strip() for entry in raw.split(",") if entry.strip()]
+        _trusted_proxies = (raw, IPAllowlist.compile(entries, strict=False))
+    return _trusted_proxies[1]
+
+
+def get_client_ip(connection: HTTPConnection) -> str:
+    """
+    クライアントIPを取得
+
+    X-Forwarded-For / X-Real-IP は直接の接続元が trusted_proxies に
+    含まれる場合のみ参照します（クライアントが任意に設定できるため）。
+    X-Forwarded-For は右から順に辿り、信頼済みプロキシ以外の最初のアドレスを
+    クライアントとみなします。
+
+    Args:
+        connection: Request または WebSocket
+
+    Returns:
+        str: クライアントIP（取得できない場合 "unknown"）
+    """
+    if not connection.client:
+        return "unknown"
+
+    # 直接接続
+    peer = connection.client.host
+    trusted = _get_trusted_proxies()
+    if not trusted.contains(peer):
+        return peer
+
+    # X-Forwarded-For（左端はクライアントが偽装できる）
+    forwarded = connection.headers.get("X-Forwarded-For")
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not trusted.contains(hop):
+                return hop
+        if hops:
+            return hops[0]
+
+    # X-Real-IP ヘッダー
+    real_ip = connection.headers.get("X-Real-IP")
+    if real_ip:
+        return real_ip.strip()
+
+    return peer
@@ -0,0 +1,148 @@
+"""
+IP Allowlist
+
+許可IPリスト（IPアドレス/CIDR）のコンパイル済みマッチャー
+
+エントリを一度だけ解析し、IPバージョンごとに重複・隣接を統合した
+ソート済み区間（開始, 終了）に変換します。
+判定は二分探索で O(log n) となり、リストが数千件でもリクエストごとの
+再解析は発生しません。
+"""
+
+import ipaddress
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_allowlist_entry(entry: str) -> IPNetwork:
+    """
+    許可IPリストのエントリを解析
+
+    Args:
+        entry: IPアドレスまたはCIDR（ホストビットは無視）
+
+    Returns:
+        IPNetwork: ネットワーク（単一アドレスは /32 または /128）
+
+    Raises:
+        ValueError: 不正なエントリ
+    """
+    value = entry.strip() if isinstance(entry, str) else entry
+    if not value or not isinstance(value, str):
+        raise ValueError(f"Invalid IP address or CIDR: {entry!r}")
+    try:
+        return ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        raise ValueError(f"Invalid IP address or CIDR: {entry!r}") from None
+
+
+def validate_allowed_ips(entries: Optional[Iterable[str]]) -> Optional[list[str]]:
+    """
+    保存前に許可IPリストを検証
+
+    Args:
+        entries: 許可IPリスト
+
+    Returns:
+        Optional[list[str]]: 前後の空白を除いたリスト（空の場合 None）
+
+    Raises:
+        ValueError: 不正なエントリを含む場合
+    """
+    if not entries:
+        return None
+    normalized = []
+    for entry in entries:
+        parse_allowlist_entry(entry)
+        normalized.append(entry.strip())
+    return normalized
+
+
+class IPAllowlist:
+    """
+    コンパイル済み許可IPリスト
+
+    責務:
+    - エントリの一括解析と区間の統合
+    - 二分探索によるアドレス判定
+    """
+
+    __slots__ = ("_starts", "_ends", "invalid_entries")
+
+    def __init__(
+        self,
+        intervals: Dict[int, List[Tuple[int, int]]],
+        invalid_entries: Tuple[str, ...] = (),
+    ):
+        """
+        Args:
+            intervals: IPバージョン -> 統合済みのソート済み区間
+            invalid_entries: 解析できずに除外したエントリ
+        """
+        self._starts = {version: [s for s, _ in spans] for version, spans in intervals.items()}
+        self._ends = {version: [e for _, e in spans] for version, spans in intervals.items()}
+        self.invalid_entries = invalid_entries
+
+    @classmethod
+    def compile(cls, entries: Optional[Iterable[str]], strict: bool = True) -> "IPAllowlist":
+        """
+        許可IPリストをコンパイル
+
+        Args:
+            entries: IPアドレス/CIDRのリスト
+            strict: 不正なエントリで例外を送出するか（False の場合は除外して記録）
+
+        Returns:
+            IPAllowlist: マッチャー
+
+        Raises:
+            ValueError: strict=True で不正なエントリを含む場合
+        """
+        networks: Dict[int, List[IPNetwork]] = {4: [], 6: []}
+        invalid = []
+        for entry in entries or ():
+            try:
+                network = parse_allowlist_entry(entry)
+            except ValueError:
+                if strict:
+                    raise
+                invalid.append(str(entry))
+                continue
+            networks[network.version].append(network)
+
+        intervals = {
+            version: [
+                (int(net.network_address), int(net.broadcast_address))
+                for net in ipaddress.collapse_addresses(nets)
+            ]
+            for version, nets in networks.items()
+        }
+        return cls(intervals, tuple(invalid))
+
+    def __len__(self) -> int:
+        """統合後の区間数"""
+        return sum(len(starts) for starts in self._starts.values())
+
+    def contains(self, client_ip: str) -> bool:
+        """
+        アドレスが許可されているか判定
+
+        Args:
+            client_ip: クライアントIP（IPv4射影IPv6アドレスはIPv4として判定）
+
+        Returns:
+            bool: 許可されていれば True（不正なアドレスは False）
+        """
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+
+        starts = self._starts[address.version]
+        value = int(address)
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= self._ends[address.version][index]
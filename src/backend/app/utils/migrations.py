@@ -0,0 +1,307 @@
+"""
+Schema Migrations
+
+migrations/*.sql のバージョン管理と適用
+
+schema_migrations テーブルに適用済みバージョンを記録し、起動時は
+1クエリでバージョンを比較します。未適用のマイグレーションは
+明示的に指示された場合（DB_AUTO_MIGRATE または CLI）のみ適用します。
+
+Usage:
+    python -m app.utils.migrations          # 未適用のマイグレーションを適用
+    python -m app.utils.migrations --check  # 状態確認のみ
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 既定のマイグレーションディレクトリ（src/backend/migrations）
+DEFAULT_MIGRATIONS_PATH = Path(__file__).resolve().parents[2] / "migrations"
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+# 再実行時に既に反映済みとみなすMySQLエラー
+# 1050: Table already exists / 1060: Duplicate column / 1061: Duplicate key name
+# 1091: Can't DROP (does not exist)
+IDEMPOTENT_ERROR_CODES = {1050, 1060, 1061, 1091}
+
+# 複数ワーカー同時起動時の排他用ロック名
+MIGRATION_LOCK_NAME = "schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 300
+
+CREATE_VERSION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+@dataclass
+class Migration:
+    """マイグレーションファイル"""
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def checksum(self) -> str:
+        """ファイル内容のSHA-256"""
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()
+
+
+def discover_migrations(path: Optional[Path] = None) -> List[Migration]:
+    """
+    マイグレーションファイル一覧をバージョン順で取得
+
+    Args:
+        path: マイグレーションディレクトリ
+
+    Returns:
+        List[Migration]: マイグレーション一覧
+    """
+    path = Path(path or settings.migrations_path or DEFAULT_MIGRATIONS_PATH)
+    if not path.is_dir():
+        return []
+
+    migrations = []
+    for file in path.iterdir():
+        match = MIGRATION_FILE_PATTERN.match(file.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), file))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    SQLスクリプトを文単位に分割
+
+    文字列リテラル内のセミコロンや `--` / `#` / `/* */` コメントを考慮します。
+
+    Args:
+        sql: SQLスクリプト
+
+    Returns:
+        List[str]: SQL文のリスト（コメントのみの文は除外）
+    """
+    statements: List[str] = []
+    current: List[str] = []
+    quote: Optional[str] = None
+    i = 0
+    length = len(sql)
+
+    while i < length:
+        char = sql[i]
+
+        if quote:
+            current.append(char)
+            if char == "\\" and quote != "`" and i + 1 < length:
+                current.append(sql[i + 1])
+                i += 2
+                continue
+            if char == quote:
+                quote = None
+            i += 1
+            continue
+
+        if char in ("'", '"', "`"):
+            quote = char
+            current.append(char)
+        elif sql.startswith("--", i) or char == "#":
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+async def get_schema_version(engine: AsyncEngine) -> int:
+    """
+    適用済みスキーマバージョンを取得（1クエリ）
+
+    Args:
+        engine: データベースエンジン
+
+    Returns:
+        int: 最新の適用済みバージョン（未管理のDBは 0）
+    """
+    async with engine.connect() as conn:
+        try:
+            result = await conn.exec_driver_sql("SELECT MAX(version) FROM schema_migrations")
+        except DBAPIError:
+            # schema_migrations が存在しない（新規DBまたはバージョン管理導入前）
+            return 0
+        return result.scalar() or 0
+
+
+async def _execute_migration(cursor, migration: Migration) -> None:
+    """1つのマイグレーションを実行してバージョンを記録"""
+    for statement in split_sql_statements(migration.path.read_text(encoding="utf-8")):
+        try:
+            await cursor.execute(statement)
+        except Exception as e:
+            code = e.args[0] if e.args else None
+            if code not in IDEMPOTENT_ERROR_CODES:
+                raise
+            logger.warning(
+                "Migration statement already applied, skipping",
+                version=migration.version,
+                error=str(e),
+            )
+
+    await cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+        (migration.version, migration.name, migration.checksum),
+    )
+
+
+async def apply_migrations(
+    engine: AsyncEngine, migrations: Optional[List[Migration]] = None
+) -> List[Migration]:
+    """
+    未適用のマイグレーションを順に適用
+
+    GET_LOCK で排他するため、複数ワーカーが同時に呼び出しても
+    各マイグレーションは1回だけ実行されます。
+
+    Args:
+        engine: データベースエンジン
+        migrations: 対象マイグレーション（省略時はディレクトリから検出）
+
+    Returns:
+        List[Migration]: 適用したマイグレーション
+
+    Raises:
+        RuntimeError: マイグレーションロックを取得できなかった場合
+    """
+    migrations = migrations if migrations is not None else discover_migrations()
+    applied: List[Migration] = []
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver_conn = raw.driver_connection
+        # DDLは暗黙コミットされるため、各文を即時反映させる
+        await driver_conn.autocommit(True)
+        try:
+            async with driver_conn.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT)
+                )
+                # 1: 取得 / 0: タイムアウト / NULL: エラー（取得できないまま適用しない）
+                locked = (await cursor.fetchone())[0]
+                if locked != 1:
+                    raise RuntimeError(
+                        f"Could not acquire migration lock '{MIGRATION_LOCK_NAME}' "
+                        f"within {MIGRATION_LOCK_TIMEOUT}s (GET_LOCK returned {locked})"
+                    )
+                try:
+                    await cursor.execute(CREATE_VERSION_TABLE_SQL)
+                    await cursor.execute("SELECT MAX(version) FROM schema_migrations")
+                    current = (await cursor.fetchone())[0] or 0
+
+                    for migration in migrations:
+                        if migration.version <= current:
+                            continue
+                        logger.info(
+                            "Applying migration",
+                            version=migration.version,
+                            name=migration.name,
+                        )
+                        await _execute_migration(cursor, migration)
+                        applied.append(migration)
+                finally:
+                    await cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+        finally:
+            await driver_conn.autocommit(False)
+
+    return applied
+
+
+async def ensure_schema(engine: AsyncEngine, auto_migrate: bool = False) -> dict:
+    """
+    起動時のスキーマバージョン確認
+
+    Args:
+        engine: データベースエンジン
+        auto_migrate: 未適用のマイグレーションを適用するか
+
+    Returns:
+        dict: current / latest バージョン、pending / applied のバージョン一覧
+    """
+    migrations = discover_migrations()
+    latest = migrations[-1].version if migrations else 0
+    current = await get_schema_version(engine)
+    pending = [m for m in migrations if m.version > current]
+
+    applied: List[Migration] = []
+    if pending and auto_migrate:
+        applied = await apply_migrations(engine, migrations)
+        current = max([current] + [m.version for m in applied])
+        pending = [m for m in migrations if m.version > current]
+
+    if pending:
+        logger.warning(
+            "Database schema is out of date; run `python -m app.utils.migrations`",
+            current_version=current,
+            latest_version=latest,
+            pending=[m.version for m in pending],
+        )
+    else:
+        logger.info("Database schema is up to date", version=current)
+
+    return {
+        "current": current,
+        "latest": latest,
+        "pending": [m.version for m in pending],
+        "applied": [m.version for m in applied],
+    }
+
+
+async def _main(check_only: bool) -> None:
+    """CLIエントリポイント"""
+    from app.utils.database import get_database_url
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(get_database_url())
+    try:
+        await ensure_schema(engine, auto_migrate=not check_only)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--check", action="store_true", help="Only report pending migrations")
+    args = parser.parse_args()
+    asyncio.run(_main(args.check))
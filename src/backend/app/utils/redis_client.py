@@ -0,0 +1,44 @@
+"""
+Redis Client
+
+ワーカープロセス内で共有する Redis クライアント
+
+レート制限・予算予約・公開チャットの実行枠・キャッシュ無効化通知・
+書き込み直後の読み取り振り分けは、同じ接続プールを共有します。
+"""
+
+from typing import Any, Optional
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 共有クライアント（REDIS_URL 未設定時は None）
+_client: Optional[Any] = None
+
+
+def get_redis() -> Optional[Any]:
+    """
+    共有 Redis クライアントを取得（初回呼び出し時に作成）
+
+    Returns:
+        Optional[redis.asyncio.Redis]: クライアント（REDIS_URL 未設定時は None）
+    """
+    global _client
+
+    if _client is None and settings.redis_url:
+        import redis.asyncio as redis
+
+        _client = redis.from_url(settings.redis_url)
+        logger.info("Redis client created")
+    return _client
+
+
+async def shutdown_redis() -> None:
+    """共有 Redis クライアントをクローズ"""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
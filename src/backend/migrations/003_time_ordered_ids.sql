@@ -0,0 +1,41 @@
+-- ============================================
+-- Time-Ordered IDs Migration
+-- Description: 既存メッセージIDをUUID v7（時系列順）に変換
+-- Date: 2025-01-20
+-- Depends on: 001_initial_schema.sql
+-- ============================================
+--
+-- アプリケーションは generate_id() で UUID v7 を発行するようになったため、
+-- 新規行は既存の VARCHAR(36) 主キーのまま末尾追記で挿入されます。
+-- 既存の UUID v4 行はそのままでも動作しますが、messages テーブルの
+-- クラスタインデックスを時系列順に揃えるため、ここで created_at から
+-- UUID v7 を再生成します。
+--
+-- 注意:
+-- - messages.id は他テーブルから参照されていないため安全に書き換え可能です。
+-- - projects / sessions の ID は外部キーおよびワークスペースディレクトリ名に
+--   使われているため書き換えません（v4 と v7 が混在しても問題ありません）。
+-- - 大規模テーブルではメンテナンス時間帯に実行してください。
+
+SET @saved_time_zone = @@session.time_zone;
+SET time_zone = '+00:00';
+
+-- ============================================
+-- messages.id を created_at ベースの UUID v7 に変換
+-- ============================================
+UPDATE messages
+SET id = LOWER(CONCAT(
+    SUBSTR(LPAD(HEX(FLOOR(UNIX_TIMESTAMP(created_at) * 1000)), 12, '0'), 1, 8), '-',
+    SUBSTR(LPAD(HEX(FLOOR(UNIX_TIMESTAMP(created_at) * 1000)), 12, '0'), 9, 4), '-',
+    '7', SUBSTR(HEX(RANDOM_BYTES(2)), 1, 3), '-',
+    HEX(0x80 | (ASCII(RANDOM_BYTES(1)) & 0x3F)), HEX(RANDOM_BYTES(1)), '-',
+    HEX(RANDOM_BYTES(6))
+))
+WHERE SUBSTR(id, 15, 1) <> '7';
+
+SET time_zone = @saved_time_zone;
+
+-- ============================================
+-- クラスタインデックスを再構築（断片化解消）
+-- ============================================
+ALTER TABLE messages ENGINE=InnoDB;
@@ -0,0 +1,16 @@
+-- ============================================
+-- Session Archive Migration
+-- Description: 非アクティブセッションのコールドストレージ退避用カラム追加
+-- Date: 2025-01-21
+-- Depends on: 001_initial_schema.sql
+-- ============================================
+--
+-- archived_at が設定されたセッションは messages 行を持たず、
+-- メッセージは {ARCHIVE_PATH}/{project_id}/{session_id}.ndjson.zst
+-- （zstandard 未導入時は .ndjson.gz）に保存されています。
+-- 新規アクティビティ時にアプリケーションが messages テーブルへ復元し、
+-- archived_at を NULL に戻します。
+
+ALTER TABLE sessions
+    ADD COLUMN archived_at DATETIME NULL AFTER last_activity_at,
+    ADD INDEX ix_sessions_archive_candidates (archived_at, last_activity_at);
@@ -0,0 +1,57 @@
+-- ============================================
+-- Project Usage Daily Rollup Migration
+-- Description: プロジェクト日次使用量ロールアップテーブル追加
+-- Date: 2025-01-22
+-- Depends on: 001_initial_schema.sql
+-- ============================================
+--
+-- 使用量記録時（SessionManager.update_usage）に JST 日付単位で加算されます。
+-- 利用制限チェックと使用量統計は直近30行のみを参照します。
+
+CREATE TABLE IF NOT EXISTS project_usage_daily (
+    project_id VARCHAR(36) NOT NULL,
+    usage_date DATE NOT NULL,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    cache_read_tokens BIGINT NOT NULL DEFAULT 0,
+    cache_creation_tokens BIGINT NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd DOUBLE NOT NULL DEFAULT 0,
+    message_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (project_id, usage_date),
+    CONSTRAINT fk_project_usage_daily_project FOREIGN KEY (project_id)
+        REFERENCES projects(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- 既存データのバックフィル
+-- ============================================
+-- 過去の発生日時は記録されていないため、各セッションの累計を
+-- 最終アクティビティの JST 日付に計上します（入出力内訳は不明のため 0）。
+-- 累計には発生日不明の過去分が含まれるため、利用制限の集計期間
+-- （直近30日）に入る日付は30日前に寄せ、デプロイ当日から始まる
+-- daily/weekly/monthly の集計にはバックフィル分を含めません。
+INSERT INTO project_usage_daily (project_id, usage_date, total_tokens, cost_usd, message_count)
+SELECT
+    project_id,
+    backfill_date,
+    SUM(total_tokens),
+    SUM(total_cost_usd),
+    SUM(message_count)
+FROM (
+    SELECT
+        project_id,
+        LEAST(
+            DATE(CONVERT_TZ(last_activity_at, '+00:00', '+09:00')),
+            DATE(CONVERT_TZ(UTC_TIMESTAMP(), '+00:00', '+09:00')) - INTERVAL 30 DAY
+        ) AS backfill_date,
+        total_tokens,
+        total_cost_usd,
+        message_count
+    FROM sessions
+    WHERE total_cost_usd > 0 OR total_tokens > 0
+) AS session_totals
+GROUP BY project_id, backfill_date
+ON DUPLICATE KEY UPDATE project_id = project_id;
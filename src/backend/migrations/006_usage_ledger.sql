@@ -0,0 +1,29 @@
+-- ============================================
+-- Usage Ledger Migration
+-- Description: ターン単位の使用量台帳（追記専用）テーブル追加
+-- Date: 2025-01-23
+-- Depends on: 001_initial_schema.sql
+-- ============================================
+--
+-- バックグラウンドのフラッシャーがバッチで INSERT します。
+-- セッション・プロジェクト削除後も分析用に保持するため外部キーは設定しません。
+
+CREATE TABLE IF NOT EXISTS usage_ledger (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    project_id VARCHAR(36) NOT NULL,
+    session_id VARCHAR(36) NOT NULL,
+    user_id VARCHAR(36) NULL,
+    model VARCHAR(50) NULL,
+    input_tokens INT NOT NULL DEFAULT 0,
+    output_tokens INT NOT NULL DEFAULT 0,
+    cache_read_tokens INT NOT NULL DEFAULT 0,
+    cache_creation_tokens INT NOT NULL DEFAULT 0,
+    cost_usd DOUBLE NOT NULL DEFAULT 0,
+    duration_ms INT NOT NULL DEFAULT 0,
+    tool_count INT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX ix_usage_ledger_project_created (project_id, created_at),
+    INDEX ix_usage_ledger_session_created (session_id, created_at),
+    INDEX ix_usage_ledger_user_created (user_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
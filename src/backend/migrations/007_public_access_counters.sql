@@ -0,0 +1,28 @@
+-- ============================================
+-- Public Access Counters Migration
+-- Description: 外部公開設定に当日セッション数カウンターを追加
+-- Date: 2025-01-24
+-- Depends on: 002_public_access_tables.sql
+-- ============================================
+--
+-- 公開セッション作成時に条件付き UPDATE で判定と加算を同時に行います
+-- （session_count_date が当日（UTC）でなければ 1 から数え直し）。
+-- 上限判定のために public_sessions を COUNT(*) する必要はありません。
+
+ALTER TABLE project_public_access
+    ADD COLUMN session_count_date DATE NULL AFTER max_messages_per_session,
+    ADD COLUMN session_count_today INT NOT NULL DEFAULT 0 AFTER session_count_date;
+
+-- ============================================
+-- 既存データのバックフィル（当日分）
+-- ============================================
+
+UPDATE project_public_access pa
+SET
+    pa.session_count_date = UTC_DATE(),
+    pa.session_count_today = (
+        SELECT COUNT(*) FROM public_sessions ps
+        WHERE ps.public_access_id = pa.id
+          AND ps.created_at >= UTC_DATE()
+    ),
+    pa.updated_at = pa.updated_at;
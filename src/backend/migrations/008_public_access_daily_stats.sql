@@ -0,0 +1,40 @@
+-- ============================================
+-- Public Access Daily Stats Migration
+-- Description: 外部公開の日次統計ロールアップテーブル追加
+-- Date: 2025-01-25
+-- Depends on: 002_public_access_tables.sql
+-- ============================================
+--
+-- 公開セッション作成・メッセージ送信時に UTC 日付単位で加算されます。
+-- visitor_sketch はクライアントIPの HyperLogLog レジスタ（1024バイト）で、
+-- 日別スケッチを合算してユニーク訪問者数を推定します。
+-- アクセス統計は public_sessions を走査せずこのテーブルのみを参照します。
+
+CREATE TABLE IF NOT EXISTS public_access_daily_stats (
+    public_access_id VARCHAR(36) NOT NULL,
+    stat_date DATE NOT NULL,
+    session_count INT NOT NULL DEFAULT 0,
+    message_count INT NOT NULL DEFAULT 0,
+    visitor_sketch VARBINARY(1024) NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (public_access_id, stat_date),
+    CONSTRAINT fk_public_access_daily_stats_access FOREIGN KEY (public_access_id)
+        REFERENCES project_public_access(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- 既存データのバックフィル
+-- ============================================
+-- メッセージの送信日時は記録されていないため、セッション作成日に計上します。
+-- visitor_sketch は NULL とし、初回の統計表示時にアプリケーションが
+-- public_sessions から構築します。
+INSERT INTO public_access_daily_stats (public_access_id, stat_date, session_count, message_count)
+SELECT
+    public_access_id,
+    DATE(created_at) AS stat_date,
+    COUNT(*),
+    SUM(message_count)
+FROM public_sessions
+GROUP BY public_access_id, DATE(created_at)
+ON DUPLICATE KEY UPDATE public_access_id = public_access_id;
@@ -0,0 +1,12 @@
+-- ============================================
+-- Command Result Cache Migration
+-- Description: コマンド公開設定に実行結果キャッシュの有効期間を追加
+-- Date: 2025-01-24
+-- Depends on: 002_public_access_tables.sql
+-- ============================================
+--
+-- result_cache_ttl_seconds が設定されたコマンドのみ、公開チャットの
+-- 最初のメッセージに対する応答をキャッシュして再生します（NULL = 無効）。
+
+ALTER TABLE command_public_settings
+    ADD COLUMN result_cache_ttl_seconds INT NULL AFTER priority;
@@ -0,0 +1,13 @@
+-- ============================================
+-- Public Session Shared SDK Session Migration
+-- Description: 公開セッションに結果キャッシュと共有中のSDKセッションを示すフラグを追加
+-- Date: 2025-01-25
+-- Depends on: 009_command_result_cache.sql
+-- ============================================
+--
+-- 結果キャッシュから応答したセッション（およびキャッシュ元の実行）は
+-- SDKセッションを他の公開セッションと共有するため、次のメッセージのみ分岐（fork）して
+-- 再開します。分岐後は自身のSDKセッションを通常どおり再開します。
+
+ALTER TABLE public_sessions
+    ADD COLUMN sdk_session_shared BOOLEAN NOT NULL DEFAULT FALSE AFTER sdk_session_id;
@@ -12,16 +12,7 @@ echo "MySQL is ready!"
 
 # Run database migrations
 echo "Running database migrations..."
-python -c "
-import asyncio
-from app.models.database import init_db
-
-async def migrate():
-    await init_db()
-    print('Database migration completed!')
-
-asyncio.run(migrate())
-"
+python -m app.utils.migrations
 
 # Start the application
 echo "Starting uvicorn..."
@@ -4,8 +4,11 @@ Pytest Configuration and Fixtures
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.main import app
+from app.models.database import Base
+from app.utils import database
 
 
 @pytest.fixture
@@ -14,6 +17,32 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+async def sqlite_db():
+    """
+    Build in-memory SQLite session factories
+
+    Call with model classes to create their tables, e.g.
+    ``factory = await sqlite_db(ProjectModel, SessionModel)``.
+    The engine is available as ``factory.kw["bind"]``.
+    """
+    engines = []
+
+    async def create(*models) -> async_sessionmaker:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        engines.append(engine)
+        if models:
+            async with engine.begin() as conn:
+                await conn.run_sync(
+                    Base.metadata.create_all, tables=[model.__table__ for model in models]
+                )
+        return database._session_factory(engine)
+
+    yield create
+    for engine in engines:
+        await engine.dispose()
+
+
 @pytest.fixture
 def sample_project_data():
     """Sample project data for testing"""
@@ -25,3 +25,13 @@ def test_root_endpoint(client: TestClient):
     assert data["name"] == "Claude Code Backend"
     assert data["version"] == "1.0.0"
     assert data["status"] == "running"
+
+
+def test_database_health(client: TestClient):
+    """Test database pool metrics endpoint"""
+    response = client.get("/api/health/database")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "read_routing" in data
+    assert "timestamp" in data
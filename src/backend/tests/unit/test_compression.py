@@ -0,0 +1,72 @@
+"""
+Unit Tests for Compression Utilities
+"""
+
+import pytest
+
+from app.utils.compression import (
+    CODEC_EXTENSIONS,
+    TEXT_COMPRESSION_MARKER,
+    codec_from_path,
+    compress_text,
+    decompress_text,
+    is_compressed_text,
+    iter_compressed_lines,
+    write_compressed_lines,
+)
+from app.utils import compression
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_compressed_lines_roundtrip(tmp_path, codec):
+    """Test that lines survive a write/read roundtrip"""
+    if codec == "zstd" and not compression.ZSTD_AVAILABLE:
+        pytest.skip("zstandard is not installed")
+
+    path = tmp_path / "project" / f"session.ndjson{CODEC_EXTENSIONS[codec]}"
+    lines = ['{"role": "user", "content": "こんにちは"}', '{"role": "assistant", "content": "hi"}']
+
+    size = write_compressed_lines(path, lines)
+
+    assert size == path.stat().st_size
+    assert not any(p.name.endswith(".tmp") for p in path.parent.iterdir())
+    assert list(iter_compressed_lines(path)) == lines
+
+
+def test_codec_from_path_rejects_unknown_extension(tmp_path):
+    """Test that unknown extensions are rejected"""
+    with pytest.raises(ValueError):
+        codec_from_path(tmp_path / "segment.ndjson")
+
+
+def test_compress_text_roundtrip_above_threshold():
+    """Test that large text is compressed and restored"""
+    text = '[{"type": "tool_result", "content": "' + "x" * 50000 + '"}]'
+
+    stored, original_bytes = compress_text(text, threshold=1024)
+
+    assert is_compressed_text(stored)
+    assert original_bytes == len(text.encode("utf-8"))
+    assert len(stored) < original_bytes
+    assert decompress_text(stored) == text
+
+
+def test_compress_text_keeps_small_text():
+    """Test that text below the threshold is stored as-is"""
+    text = "こんにちは"
+
+    stored, _ = compress_text(text, threshold=1024)
+
+    assert stored == text
+    assert decompress_text(stored) == text
+
+
+def test_decompress_text_reads_zlib_rows(monkeypatch):
+    """Test that zlib-compressed rows remain readable when zstd is used"""
+    monkeypatch.setattr(compression, "ZSTD_AVAILABLE", False)
+    text = "a" * 10000
+    stored, _ = compress_text(text, threshold=1024)
+    monkeypatch.undo()
+
+    assert stored.startswith(f"{TEXT_COMPRESSION_MARKER}zlib:")
+    assert decompress_text(stored) == text
@@ -0,0 +1,52 @@
+"""
+Unit Tests for the File-Based Project Config Index
+"""
+
+import json
+import os
+
+from app.core.config_loader import ProjectConfigIndex, load_agents_config
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def test_refresh_reparses_only_changed_files(tmp_path):
+    """Test unchanged workspaces are served from the index"""
+    _write(tmp_path / ".agents" / "reviewer.md", "# Reviewer\n\nReviews code\n")
+    _write(tmp_path / "custom_commands" / "deploy.md", "# Deploy\n\nShips it\n")
+    _write(tmp_path / ".mcp.json", json.dumps({"mcpServers": {"fs": {"command": "npx"}}}))
+    index = ProjectConfigIndex(str(tmp_path))
+
+    config = index.refresh()
+    assert index.parse_count == 3
+    assert config.agents["Reviewer"].description == "Reviews code"
+    assert set(config.commands) == {"deploy"}
+    assert index.refresh() is config
+
+    command = tmp_path / "custom_commands" / "deploy.md"
+    _write(command, "# Deploy\n\nShips it to production\n")
+    os.utime(command, ns=(0, command.stat().st_mtime_ns + 1_000_000))
+    _write(tmp_path / "custom_commands" / "lint.md", "# Lint\n\nChecks style\n")
+    (tmp_path / ".mcp.json").unlink()
+
+    config = index.refresh()
+    assert index.parse_count == 5
+    assert config.commands["deploy"].description == "Ships it to production"
+    assert set(config.commands) == {"deploy", "lint"}
+    assert config.mcp_servers == {}
+
+
+def test_agents_json_state_does_not_mutate_cached_agents(tmp_path):
+    """Test .agents.json toggles apply per load and match load_agents_config"""
+    _write(tmp_path / ".agents" / "reviewer.md", "# Reviewer\n\nReviews code\n")
+    _write(tmp_path / ".agents.json", json.dumps({"agents": {"Reviewer": {"enabled": False}}}))
+    index = ProjectConfigIndex(str(tmp_path))
+
+    assert index.refresh().agents["Reviewer"].enabled is False
+    assert load_agents_config(str(tmp_path))["Reviewer"].enabled is False
+
+    (tmp_path / ".agents.json").unlink()
+    assert index.refresh().agents["Reviewer"].enabled is True
@@ -0,0 +1,51 @@
+"""
+Unit Tests for Manifest-Based Directory Sync
+"""
+
+from app.utils.fs_sync import sync_directory
+
+
+def test_sync_writes_only_changes_and_deletes_removed(tmp_path):
+    """Test incremental writes, deletions and empty directory cleanup"""
+    root = tmp_path / "commands"
+    manifest = tmp_path / ".commands-sync.json"
+
+    result = sync_directory(root, {"deploy.md": "v1", "ops/restart.md": "r"}, manifest)
+    assert (result.written, result.deleted, result.unchanged) == (2, 0, 0)
+
+    result = sync_directory(root, {"deploy.md": "v2", "ops/restart.md": "r"}, manifest)
+    assert (result.written, result.deleted, result.unchanged) == (1, 0, 1)
+    assert (root / "deploy.md").read_text() == "v2"
+
+    result = sync_directory(root, {"deploy.md": "v2"}, manifest)
+    assert (result.written, result.deleted, result.unchanged) == (0, 1, 1)
+    assert not (root / "ops").exists()
+    assert [p.name for p in root.iterdir()] == ["deploy.md"]
+
+
+def test_first_sync_adopts_existing_files(tmp_path):
+    """Test directories written by the previous full rewrite are cleaned up"""
+    root = tmp_path / "skills"
+    (root / "old").mkdir(parents=True)
+    (root / "old" / "SKILL.md").write_text("stale")
+
+    result = sync_directory(root, {"new/SKILL.md": "fresh"}, tmp_path / ".skills-sync.json")
+
+    assert (result.written, result.deleted) == (1, 1)
+    assert not (root / "old").exists()
+    assert result.touched == 2
+
+
+def test_externally_edited_file_is_rewritten(tmp_path):
+    """Test a file changed on disk is restored even when the manifest is unchanged"""
+    root = tmp_path / "agents"
+    manifest = tmp_path / ".agents-sync.json"
+    sync_directory(root, {"a.md": "alpha", "b.md": "bravo"}, manifest)
+
+    (root / "a.md").write_text("alpha, edited")
+    (root / "b.md").write_text("BRAVO")  # same size, different content
+
+    result = sync_directory(root, {"a.md": "alpha", "b.md": "bravo"}, manifest)
+    assert (result.written, result.unchanged) == (2, 0)
+    assert (root / "a.md").read_text() == "alpha"
+    assert (root / "b.md").read_text() == "bravo"
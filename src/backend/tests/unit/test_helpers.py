@@ -0,0 +1,83 @@
+"""
+Unit Tests for Helper Functions
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from starlette.requests import Request
+
+from app.config import settings
+from app.utils.helpers import (
+    bin_to_uuid,
+    generate_id,
+    get_client_ip,
+    uuid7_to_datetime,
+    uuid_to_bin,
+)
+
+
+def test_generate_id_is_uuid7():
+    """Test that generated IDs are UUID v7 strings"""
+    value = generate_id()
+
+    assert len(value) == 36
+    parsed = uuid.UUID(value)
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+
+
+def test_generate_id_is_monotonic():
+    """Test that IDs generated in sequence sort in generation order"""
+    ids = [generate_id() for _ in range(5000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_uuid7_to_datetime():
+    """Test timestamp extraction from UUID v7"""
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    created = uuid7_to_datetime(generate_id())
+    after = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    assert created is not None
+    assert before <= created <= after
+    assert uuid7_to_datetime(str(uuid.uuid4())) is None
+    assert uuid7_to_datetime("not-a-uuid") is None
+
+
+def test_uuid_binary_roundtrip():
+    """Test BINARY(16) conversion roundtrip"""
+    value = generate_id()
+
+    packed = uuid_to_bin(value)
+
+    assert len(packed) == 16
+    assert bin_to_uuid(packed) == value
+
+
+def _request(peer: str, **headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "client": (peer, 12345),
+        "headers": [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_client_ip_ignores_forwarded_headers_from_untrusted_peers(monkeypatch):
+    """Test that a direct client cannot spoof its address"""
+    monkeypatch.setattr(settings, "trusted_proxies", "")
+
+    assert get_client_ip(_request("203.0.113.9", X_Forwarded_For="1.2.3.4", X_Real_IP="1.2.3.4")) == "203.0.113.9"
+
+
+def test_client_ip_takes_rightmost_untrusted_hop(monkeypatch):
+    """Test X-Forwarded-For handling behind trusted proxies"""
+    monkeypatch.setattr(settings, "trusted_proxies", "10.0.0.0/8, 172.16.0.1")
+
+    # The left-most entry was supplied by the client and is ignored
+    request = _request("172.16.0.1", X_Forwarded_For="1.2.3.4, 198.51.100.7, 10.0.0.5")
+    assert get_client_ip(request) == "198.51.100.7"
+    assert get_client_ip(_request("10.1.2.3", X_Real_IP="198.51.100.8")) == "198.51.100.8"
+    assert get_client_ip(_request("10.1.2.3")) == "10.1.2.3"
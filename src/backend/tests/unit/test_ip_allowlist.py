@@ -0,0 +1,65 @@
+"""
+Unit Tests for the Compiled IP Allowlist
+"""
+
+import ipaddress
+import random
+import time
+
+import pytest
+
+from app.utils.ip_allowlist import IPAllowlist, validate_allowed_ips
+
+
+def _naive_contains(entries, client_ip):
+    """Reference implementation: parse and scan every entry"""
+    address = ipaddress.ip_address(client_ip)
+    return any(address in ipaddress.ip_network(entry, strict=False) for entry in entries)
+
+
+def test_matches_addresses_and_cidrs():
+    """Test single addresses, CIDRs, IPv6 and IPv4-mapped clients"""
+    allowlist = IPAllowlist.compile(["10.0.0.0/8", "192.168.1.5", "2001:db8::/32"])
+
+    assert allowlist.contains("10.255.0.1")
+    assert allowlist.contains("192.168.1.5")
+    assert not allowlist.contains("192.168.1.6")
+    assert allowlist.contains("2001:db8::1")
+    assert not allowlist.contains("2001:db9::1")
+    assert allowlist.contains("::ffff:10.1.2.3")
+    assert not allowlist.contains("not-an-ip")
+
+
+def test_invalid_entries_rejected_at_save_time():
+    """Test strict validation and lenient compilation of stored lists"""
+    with pytest.raises(ValueError, match="300.1.1.1"):
+        validate_allowed_ips(["10.0.0.1", "300.1.1.1"])
+    assert validate_allowed_ips([" 10.0.0.1 "]) == ["10.0.0.1"]
+    assert validate_allowed_ips([]) is None
+
+    allowlist = IPAllowlist.compile(["bogus", "10.0.0.1"], strict=False)
+    assert allowlist.invalid_entries == ("bogus",)
+    assert allowlist.contains("10.0.0.1")
+
+
+def test_thousands_of_cidrs_match_reference_and_stay_fast():
+    """Micro-benchmark: 5,000 CIDRs agree with the naive scan and look up quickly"""
+    rng = random.Random(42)
+    entries = [
+        f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.choice((16, 20, 24, 28))}"
+        for _ in range(5000)
+    ]
+    allowlist = IPAllowlist.compile(entries)
+    probes = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(100)]
+    probes += [entry.split("/")[0] for entry in entries[:100]]
+
+    for probe in probes:
+        assert allowlist.contains(probe) == _naive_contains(entries, probe)
+
+    started = time.perf_counter()
+    for _ in range(50):
+        for probe in probes:
+            allowlist.contains(probe)
+    per_lookup = (time.perf_counter() - started) / (50 * len(probes))
+    # A linear re-parse of 5,000 entries takes milliseconds per lookup
+    assert per_lookup < 0.0005
@@ -0,0 +1,177 @@
+"""
+Unit Tests for Maintenance Service
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.config import settings
+from app.models.database import (
+    CronLogModel,
+    ProjectModel,
+    ProjectPublicAccessModel,
+    PublicAccessDailyStatsModel,
+    PublicSessionModel,
+    SessionModel,
+)
+from app.services.maintenance_service import MaintenanceService
+from app.utils import database
+
+
+@pytest.fixture
+async def session_factory(monkeypatch, tmp_path, sqlite_db):
+    """SQLite-backed global session factory with an isolated workspace layout"""
+    factory = await sqlite_db(
+        ProjectModel, SessionModel, CronLogModel, ProjectPublicAccessModel, PublicSessionModel,
+        PublicAccessDailyStatsModel,
+    )
+    monkeypatch.setattr(database, "_async_session_factory", factory)
+    monkeypatch.setattr(settings, "workspace_base", str(tmp_path / "workspace"))
+    monkeypatch.setattr(settings, "public_workspace_overlay_path", str(tmp_path / "overlays"))
+    monkeypatch.setattr(settings, "sdk_state_path", str(tmp_path / "sdk"))
+    return factory
+
+
+async def _count(factory, model) -> int:
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+async def test_sweeps_run_in_batches_and_record_stats(session_factory, monkeypatch):
+    """Test each sweep touches only expired rows, in batches, and reports its counts"""
+    monkeypatch.setattr(settings, "maintenance_public_session_retention_days", 30)
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=90)
+    async with session_factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        session.add(ProjectPublicAccessModel(id="access-1", project_id="project-1", access_token="t"))
+        session.add_all([
+            SessionModel(id=f"s{i}", project_id="project-1", is_processing=True, processing_started_at=old)
+            for i in range(3)
+        ])
+        session.add(SessionModel(id="busy", project_id="project-1", is_processing=True, processing_started_at=now))
+        session.add_all([
+            PublicSessionModel(public_access_id="access-1", ip_address="10.0.0.1", last_activity_at=old)
+            for _ in range(5)
+        ])
+        session.add(PublicSessionModel(public_access_id="access-1", ip_address="10.0.0.1"))
+        session.add_all([
+            CronLogModel(job_id="job", status="success", started_at=old, created_at=old)
+            for _ in range(4)
+        ])
+        session.add(CronLogModel(job_id="job", status="success", started_at=now))
+        await session.commit()
+
+    service = MaintenanceService(batch_size=2, max_batches=10, batch_pause_seconds=0)
+    results = await service.run_once()
+
+    assert results == {
+        "stale_processing": 3,
+        "visitor_sketch_backfill": 0,
+        "expired_public_sessions": 5,
+        "cron_log_retention": 4,
+        "orphaned_workspaces": 0,
+    }
+    assert await _count(session_factory, PublicSessionModel) == 1
+    assert await _count(session_factory, CronLogModel) == 1
+    async with session_factory() as session:
+        processing = (await session.execute(
+            select(SessionModel.id).where(SessionModel.is_processing == True)  # noqa: E712
+        )).scalars().all()
+    assert processing == ["busy"]
+
+    stats = service.stats()
+    assert stats["expired_public_sessions"]["last_rows"] == 5
+    assert stats["cron_log_retention"]["runs"] == 1
+    assert stats["stale_processing"]["last_error"] is None
+
+
+async def test_batches_per_run_are_capped(session_factory):
+    """Test a run stops after max_batches and leaves the rest for the next run"""
+    old = datetime.now(timezone.utc) - timedelta(days=90)
+    async with session_factory() as session:
+        session.add_all([
+            CronLogModel(job_id="job", status="success", started_at=old, created_at=old)
+            for _ in range(5)
+        ])
+        await session.commit()
+
+    service = MaintenanceService(batch_size=2, max_batches=1, batch_pause_seconds=0)
+    assert await service.delete_old_cron_logs() == 2
+    assert await service.delete_old_cron_logs() == 2
+    assert await service.delete_old_cron_logs() == 1
+
+
+async def test_orphaned_project_workspaces_and_sdk_state_are_removed(session_factory, monkeypatch, tmp_path):
+    """Test only stale directories of deleted projects are removed"""
+    monkeypatch.setattr(settings, "maintenance_remove_orphaned_project_workspaces", True)
+    live_id, deleted_id = "a" * 36, "b" * 36
+    async with session_factory() as session:
+        session.add(ProjectModel(id=live_id, name="Live"))
+        await session.commit()
+
+    workspace = tmp_path / "workspace"
+    # The SDK names its state directory after the working directory
+    state_prefix = re.sub(r"[^a-zA-Z0-9]", "-", str(workspace))
+    stale = (datetime.now(timezone.utc) - timedelta(days=3)).timestamp()
+    paths = [
+        workspace / live_id,
+        workspace / deleted_id,
+        tmp_path / "sdk" / f"{state_prefix}-{live_id}",
+        tmp_path / "sdk" / f"{state_prefix}-{deleted_id}",
+    ]
+    for path in paths:
+        path.mkdir(parents=True)
+        os.utime(path, (stale, stale))
+
+    service = MaintenanceService(batch_size=10, batch_pause_seconds=0)
+    assert await service.remove_orphaned_workspaces() == 2
+    assert [path.exists() for path in paths] == [True, False, True, False]
+
+
+async def test_public_sessions_are_kept_unless_retention_is_set(session_factory):
+    """Test public session deletion is opt-in"""
+    old = datetime.now(timezone.utc) - timedelta(days=365)
+    async with session_factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        session.add(ProjectPublicAccessModel(id="access-1", project_id="project-1", access_token="t"))
+        session.add(PublicSessionModel(public_access_id="access-1", ip_address="10.0.0.1", last_activity_at=old))
+        await session.commit()
+
+    service = MaintenanceService(batch_size=10, batch_pause_seconds=0)
+    assert await service.delete_expired_public_sessions() == 0
+    assert await _count(session_factory, PublicSessionModel) == 1
+
+
+async def test_sweep_runs_in_one_worker_at_a_time(session_factory, monkeypatch):
+    """Test a worker skips the sweep while another holds the maintenance lock"""
+    engine = session_factory.kw["bind"]
+    monkeypatch.setattr(database, "_engine", engine)
+    held: set = set()
+
+    def get_lock(name, timeout):
+        if name in held:
+            return 0
+        held.add(name)
+        return 1
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def register_lock_functions(dbapi_connection, connection_record):
+        # Stand-ins for MySQL's named locks
+        dbapi_connection.create_function("GET_LOCK", 2, get_lock)
+        dbapi_connection.create_function("RELEASE_LOCK", 1, lambda name: int(held.discard(name) is None))
+
+    await engine.dispose()  # reconnect so the functions are registered
+    workers = [MaintenanceService(batch_size=10, batch_pause_seconds=0) for _ in range(2)]
+
+    held.add("maintenance_sweep")  # another worker is sweeping
+    assert await workers[0].run_exclusive() is None
+    assert workers[0].stats()["cron_log_retention"]["runs"] == 0
+
+    held.clear()
+    assert await workers[1].run_exclusive() is not None
+    assert held == set()
@@ -0,0 +1,39 @@
+"""
+Unit Tests for Schema Migrations
+"""
+
+from app.utils.migrations import DEFAULT_MIGRATIONS_PATH, discover_migrations, split_sql_statements
+
+
+def test_discover_bundled_migrations_in_order():
+    """Test that bundled migrations are discovered with unique versions"""
+    migrations = discover_migrations(DEFAULT_MIGRATIONS_PATH)
+    versions = [m.version for m in migrations]
+
+    assert versions[0] == 1
+    assert versions == sorted(set(versions))
+
+
+def test_split_sql_statements_ignores_comments_and_quoted_semicolons():
+    """Test SQL script splitting"""
+    sql = """
+    -- comment; not a statement
+    CREATE TABLE t (id INT); /* block; comment */
+    INSERT INTO t VALUES (';'), ("a\\";b");
+    # hash comment
+    SET @x = 1
+    """
+
+    statements = split_sql_statements(sql)
+
+    assert statements == [
+        "CREATE TABLE t (id INT)",
+        "INSERT INTO t VALUES (';'), (\"a\\\";b\")",
+        "SET @x = 1",
+    ]
+
+
+def test_bundled_migrations_split_cleanly():
+    """Test that every bundled migration yields at least one statement"""
+    for migration in discover_migrations(DEFAULT_MIGRATIONS_PATH):
+        assert split_sql_statements(migration.path.read_text(encoding="utf-8"))
@@ -0,0 +1,51 @@
+"""
+Unit Tests for Project Config Cache
+"""
+
+import pytest
+
+from app.models.database import ProjectSkillModel
+from app.services import project_config_cache
+from app.services.project_config_cache import ProjectConfigCache
+
+
+def test_stale_load_is_not_cached():
+    """Test a bundle loaded before an invalidation is discarded"""
+    cache = ProjectConfigCache(ttl_seconds=60)
+    version = cache.version("project-1")
+
+    cache.invalidate(["project-1"])
+    cache.set("project-1", version, "stale")
+    assert cache.get("project-1") is None
+
+    cache.set("project-1", cache.version("project-1"), "fresh")
+    assert cache.get("project-1") == "fresh"
+
+    cache.invalidate(["project-1"])
+    assert cache.get("project-1") is None
+
+
+@pytest.fixture
+async def session_factory(monkeypatch, sqlite_db):
+    """SQLite-backed session factory and an isolated global cache"""
+    cache = ProjectConfigCache(ttl_seconds=60)
+    monkeypatch.setattr(project_config_cache, "_config_cache", cache)
+    return await sqlite_db(ProjectSkillModel), cache
+
+
+async def test_committed_config_write_bumps_version(session_factory):
+    """Test committed writes invalidate and rolled back writes do not"""
+    factory, cache = session_factory
+    cache.set("project-1", 0, "bundle")
+
+    async with factory() as session:
+        session.add(ProjectSkillModel(project_id="project-1", name="rolled-back"))
+        await session.flush()
+        await session.rollback()
+    assert cache.get("project-1") == "bundle"
+
+    async with factory() as session:
+        session.add(ProjectSkillModel(project_id="project-1", name="review"))
+        await session.commit()
+    assert cache.version("project-1") == 1
+    assert cache.get("project-1") is None
@@ -0,0 +1,61 @@
+"""
+Unit Tests for the Single-Query Project Config Loader
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.models.database import (
+    ProjectAgentModel,
+    ProjectCommandModel,
+    ProjectMCPServerModel,
+    ProjectModel,
+    ProjectSkillModel,
+)
+from app.services.project_config_service import ProjectConfigService
+
+
+@pytest.fixture
+async def factory(sqlite_db):
+    """SQLite session factory with project and config tables"""
+    return await sqlite_db(
+        ProjectModel,
+        ProjectMCPServerModel,
+        ProjectAgentModel,
+        ProjectSkillModel,
+        ProjectCommandModel,
+    )
+
+
+async def test_loads_project_and_all_configs_in_one_query(factory):
+    """Test typed rows for every collection come back from a single SELECT"""
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        session.add_all([
+            ProjectMCPServerModel(project_id="project-1", name="fs", command="npx", args=["-y"]),
+            ProjectAgentModel(project_id="project-1", name="reviewer", tools=["Read"]),
+            ProjectSkillModel(project_id="project-1", name="c-skill", category="tools", content="c"),
+            ProjectSkillModel(project_id="project-1", name="b-skill", category="docs", content="b"),
+            ProjectSkillModel(project_id="project-1", name="a-skill", category="tools", content="a"),
+            ProjectCommandModel(project_id="project-1", name="deploy", enabled=False),
+        ])
+        await session.commit()
+
+    statements = []
+    event.listen(factory.kw["bind"].sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    async with factory() as session:
+        service = ProjectConfigService(session)
+        project, rows = await service.load_project_with_config("project-1")
+        _, enabled_rows = await service.load_project_with_config("project-1", enabled_only=True)
+        missing = await service.load_project_with_config("missing")
+
+    assert len(statements) == 3
+    assert project.name == "Demo"
+    assert rows.mcp_servers[0].args == ["-y"]
+    assert rows.agents[0].tools == ["Read"]
+    # Same order as the per-collection queries: category, then name
+    assert [s.name for s in rows.skills] == ["b-skill", "a-skill", "c-skill"]
+    assert [c.name for c in rows.commands] == ["deploy"]
+    assert enabled_rows.commands == []
+    assert missing is None
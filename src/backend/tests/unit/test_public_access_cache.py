@@ -0,0 +1,144 @@
+"""
+Unit Tests for Public Access Token Cache
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, update
+
+from app.models.database import ProjectModel, ProjectPublicAccessModel, PublicSessionModel
+from app.services import public_access_cache
+from app.services.public_access_cache import PublicAccessCache
+from app.services.public_access_service import PublicAccessService
+
+
+@pytest.fixture
+async def service_factory(monkeypatch, sqlite_db):
+    """SQLite-backed services, a statement counter and an isolated global cache"""
+    factory = await sqlite_db(ProjectModel, ProjectPublicAccessModel, PublicSessionModel)
+
+    statements = []
+    event.listen(
+        factory.kw["bind"].sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    monkeypatch.setattr(
+        public_access_cache,
+        "_public_access_cache",
+        PublicAccessCache(ttl_seconds=60, negative_ttl_seconds=60),
+    )
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        await PublicAccessService(session).create_public_access("project-1", enabled=True)
+
+    return factory, statements
+
+
+async def test_token_resolution_is_cached(service_factory):
+    """Test known and unknown tokens hit the database once"""
+    factory, statements = service_factory
+    async with factory() as session:
+        token = (await PublicAccessService(session).get_public_access("project-1")).access_token
+
+    statements.clear()
+    for _ in range(3):
+        async with factory() as session:
+            service = PublicAccessService(session)
+            resolved = await service.get_public_access_by_token(token)
+            assert resolved.project.name == "Demo"
+            assert await service.get_public_access_by_token("unknown") is None
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 3
+
+
+async def test_admin_updates_invalidate_immediately(service_factory):
+    """Test update and regenerate drop cached resolutions for the project"""
+    factory, _ = service_factory
+    async with factory() as session:
+        service = PublicAccessService(session)
+        old_token = (await service.get_public_access("project-1")).access_token
+        assert (await service.get_public_access_by_token(old_token)).enabled is True
+
+        await service.update_public_access("project-1", enabled=False)
+        assert (await service.get_public_access_by_token(old_token)).enabled is False
+
+        new_token = await service.regenerate_token("project-1")
+        assert await service.get_public_access_by_token(old_token) is None
+        assert (await service.get_public_access_by_token(new_token)).project_id == "project-1"
+
+        await service.delete_public_access("project-1")
+        assert await service.get_public_access_by_token(new_token) is None
+
+
+async def test_session_creation_lookup_skips_stale_entry(service_factory):
+    """Test use_cache=False sees a change committed by another worker"""
+    factory, _ = service_factory
+    async with factory() as session:
+        service = PublicAccessService(session)
+        token = (await service.get_public_access("project-1")).access_token
+        assert (await service.get_public_access_by_token(token)).enabled is True
+
+    # Another worker disables access; this worker's cache is not notified
+    async with factory() as session:
+        await session.execute(update(ProjectPublicAccessModel).values(enabled=False))
+        await session.commit()
+
+    async with factory() as session:
+        service = PublicAccessService(session)
+        assert (await service.get_public_access_by_token(token)).enabled is True
+        assert (await service.get_public_access_by_token(token, use_cache=False)).enabled is False
+        assert (await service.get_public_access_by_token(token)).enabled is False
+
+
+class _Broker:
+    """In-process stand-in for Redis pub/sub shared by several workers"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    async def publish(self, channel, data):
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "channel": channel, "data": data.encode()})
+
+    def pubsub(self):
+        return _PubSub(self)
+
+
+class _PubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.broker.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        self.broker.subscribers.remove(self.queue)
+
+
+async def test_invalidation_is_broadcast_to_other_workers():
+    """Test an invalidation in one worker drops the entry in another"""
+    broker = _Broker()
+    workers = [PublicAccessCache(ttl_seconds=60, negative_ttl_seconds=60) for _ in range(2)]
+    for cache in workers:
+        cache._redis = broker
+        cache._listener = asyncio.create_task(cache._listen())
+    await asyncio.sleep(0)
+
+    other = workers[1]
+    other.store("token-1", None, other.generation)
+    assert other.lookup("token-1") == (True, None)
+
+    workers[0].invalidate(["token-1"])
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert other.lookup("token-1") == (False, None)
+    for cache in workers:
+        cache._listener.cancel()
+        await asyncio.gather(cache._listener, return_exceptions=True)
@@ -0,0 +1,59 @@
+"""
+Unit Tests for Atomic Public Access Counters
+"""
+
+import pytest
+
+from app.models.database import (
+    ProjectModel,
+    ProjectPublicAccessModel,
+    PublicAccessDailyStatsModel,
+    PublicSessionModel,
+)
+from app.services import public_access_cache
+from app.services.public_access_cache import PublicAccessCache
+from app.services.public_access_service import PublicAccessService
+
+
+@pytest.fixture
+async def service(monkeypatch, sqlite_db):
+    """SQLite-backed service with a public access limited to 2 sessions/day, 1 message/session"""
+    factory = await sqlite_db(
+        ProjectModel, ProjectPublicAccessModel, PublicSessionModel, PublicAccessDailyStatsModel
+    )
+    monkeypatch.setattr(public_access_cache, "_public_access_cache", PublicAccessCache())
+
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        await session.commit()
+        yield PublicAccessService(session)
+
+
+async def test_daily_session_limit_is_claimed_atomically(service):
+    """Test the counter admits max_sessions_per_day sessions and then refuses"""
+    access = await service.create_public_access(
+        "project-1", enabled=True, max_sessions_per_day=2
+    )
+
+    for _ in range(2):
+        assert await service.create_public_session(access, ip_address="10.0.0.1")
+    assert await service.check_session_limit(access) is True
+
+    with pytest.raises(ValueError, match="Daily session limit"):
+        await service.create_public_session(access, ip_address="10.0.0.1")
+
+    await service.db.refresh(access)
+    assert access.session_count_today == 2
+
+
+async def test_message_count_checks_and_increments_in_one_update(service):
+    """Test the conditional increment stops at the limit and can be refunded"""
+    access = await service.create_public_access("project-1", enabled=True)
+    session = await service.create_public_session(access, ip_address="10.0.0.1")
+
+    assert await service.increment_message_count(session.id, max_messages=1) is True
+    assert await service.increment_message_count(session.id, max_messages=1) is False
+
+    await service.decrement_message_count(session.id)
+    assert await service.increment_message_count(session.id, max_messages=1) is True
+    assert await service.increment_message_count("missing") is False
@@ -0,0 +1,84 @@
+"""
+Unit Tests for Public Access Daily Stats
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.models.database import (
+    ProjectModel,
+    ProjectPublicAccessModel,
+    PublicAccessDailyStatsModel,
+    PublicSessionModel,
+)
+from app.services import public_access_cache
+from app.services.public_access_cache import PublicAccessCache
+from app.services.public_access_service import PublicAccessService
+from app.utils.hyperloglog import HyperLogLog
+
+
+def test_hyperloglog_estimates_and_merges():
+    """Test estimates stay within a few percent and merging unions the sets"""
+    first = HyperLogLog.from_values(f"10.0.{i // 256}.{i % 256}" for i in range(5000))
+    second = HyperLogLog.from_values(f"10.0.{i // 256}.{i % 256}" for i in range(2500, 7500))
+
+    assert abs(first.estimate() - 5000) / 5000 < 0.1
+    first.merge(second)
+    assert abs(first.estimate() - 7500) / 7500 < 0.1
+    assert HyperLogLog.from_values(["a", "b", "a"]).estimate() == 2
+    assert HyperLogLog(first.to_bytes()).estimate() == first.estimate()
+
+
+@pytest.fixture
+async def service(monkeypatch, sqlite_db):
+    """SQLite-backed service with one enabled public access"""
+    factory = await sqlite_db(
+        ProjectModel, ProjectPublicAccessModel, PublicSessionModel, PublicAccessDailyStatsModel
+    )
+    monkeypatch.setattr(public_access_cache, "_public_access_cache", PublicAccessCache())
+
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        await session.commit()
+        yield PublicAccessService(session)
+
+
+async def test_stats_come_from_daily_rollup(service):
+    """Test sessions, messages and unique visitors are maintained incrementally"""
+    access = await service.create_public_access("project-1", enabled=True)
+    sessions = [
+        await service.create_public_session(access, ip_address=ip)
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1")
+    ]
+    for session in sessions[:2]:
+        await service.increment_message_count(session.id, public_access_id=access.id)
+
+    stats = await service.get_public_access_stats("project-1")
+    assert stats == {
+        "total_sessions": 3,
+        "today_sessions": 3,
+        "total_messages": 2,
+        "unique_ips": 2,
+    }
+
+
+async def test_migrated_rows_are_estimated_on_read_and_backfilled_once(service):
+    """Test stats stay read-only for rows without a sketch and the backfill stores it"""
+    access = await service.create_public_access("project-1", enabled=True)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        await service.create_public_session(access, ip_address=ip)
+    await service.db.execute(update(PublicAccessDailyStatsModel).values(visitor_sketch=None))
+    await service.db.commit()
+
+    assert (await service.get_public_access_stats("project-1"))["unique_ips"] == 3
+    row = await service.db.get(PublicAccessDailyStatsModel, (access.id, datetime.now(timezone.utc).date()))
+    await service.db.refresh(row)
+    assert row.visitor_sketch is None
+
+    assert await service.backfill_visitor_sketches(limit=10) == 1
+    await service.db.commit()
+    assert await service.backfill_visitor_sketches(limit=10) == 0
+    await service.db.refresh(row)
+    assert HyperLogLog(row.visitor_sketch).estimate() == 3
@@ -0,0 +1,139 @@
+"""
+Unit Tests for Public Chat Queue
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.public_chat_queue import PublicChatQueue, QueueFullError
+
+
+async def test_queue_is_fifo_with_position_updates_and_cancellation():
+    """Test waiters are admitted in order, see their position and can leave the queue"""
+    queue = PublicChatQueue(max_concurrent=1, max_waiting=2)
+    positions: list[tuple[str, int]] = []
+    order: list[str] = []
+    release_first = asyncio.Event()
+
+    async def on_position(session_id: str, position: int) -> None:
+        positions.append((session_id, position))
+
+    async def run(session_id: str, hold: asyncio.Event | None = None) -> None:
+        async with queue.slot("access-1", session_id, on_position):
+            order.append(session_id)
+            if hold:
+                await hold.wait()
+
+    first = asyncio.create_task(run("s1", release_first))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(run("s2"))
+    third = asyncio.create_task(run("s3"))
+    await asyncio.sleep(0)
+    assert queue.stats("access-1") == {"running": 1, "waiting": 2}
+
+    # The queue is full for a fourth session
+    with pytest.raises(QueueFullError):
+        async with queue.slot("access-1", "s4"):
+            pass
+
+    # s2 leaves (disconnect) and s3 moves up
+    second.cancel()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert ("s3", 1) in positions
+
+    release_first.set()
+    await asyncio.gather(first, third)
+    assert second.cancelled()
+    assert order == ["s1", "s3"]
+    assert positions[:2] == [("s2", 1), ("s3", 2)]
+    assert queue.stats("access-1") == {"running": 0, "waiting": 0}
+
+
+async def test_limits_are_per_public_access():
+    """Test a busy public access does not block another one"""
+    queue = PublicChatQueue(max_concurrent=1, max_waiting=1)
+    hold = asyncio.Event()
+
+    async def busy() -> None:
+        async with queue.slot("access-1", "s1"):
+            await hold.wait()
+
+    task = asyncio.create_task(busy())
+    await asyncio.sleep(0)
+    async with queue.slot("access-2", "s2"):
+        assert queue.stats("access-2")["running"] == 1
+    hold.set()
+    await task
+
+
+class _SharedSlots:
+    """Python model of the shared slot script, standing in for Redis"""
+
+    def __init__(self):
+        self.running: set = set()
+        self.waiting: list = []
+
+    def register_script(self, script):
+        return self.acquire
+
+    async def acquire(self, keys, args):
+        _, _, limit, max_waiting, member = args
+        free = limit - len(self.running)
+        if member not in self.waiting:
+            if len(self.waiting) >= max(free, 0) + max_waiting:
+                return -1
+            self.waiting.append(member)
+        rank = self.waiting.index(member)
+        if rank < free:
+            self.waiting.remove(member)
+            self.running.add(member)
+            return 0
+        return rank - max(free, 0) + 1
+
+    async def zrem(self, key, member):
+        self.running.discard(member)
+        if member in self.waiting:
+            self.waiting.remove(member)
+
+    async def zadd(self, *args, **kwargs):
+        pass
+
+    async def pexpire(self, *args):
+        pass
+
+
+async def test_shared_slots_limit_runs_across_workers(monkeypatch):
+    """Test two workers sharing slots admit one run at a time"""
+    monkeypatch.setattr("app.services.public_chat_queue._SHARED_POLL_INTERVAL", 0)
+    shared = _SharedSlots()
+    workers = [PublicChatQueue(max_concurrent=1, max_waiting=1, redis_client=shared) for _ in range(2)]
+    positions: list[tuple[str, int]] = []
+
+    async def on_position(session_id: str, position: int) -> None:
+        positions.append((session_id, position))
+
+    release_first = asyncio.Event()
+
+    async def run(queue: PublicChatQueue, session_id: str) -> None:
+        async with queue.slot("access-1", session_id, on_position):
+            if session_id == "s1":
+                await release_first.wait()
+
+    first = asyncio.create_task(run(workers[0], "s1"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(run(workers[1], "s2"))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert len(shared.running) == 1 and len(shared.waiting) == 1
+    assert positions == [("s2", 1)]
+
+    # The shared queue is full for a third session on either worker
+    with pytest.raises(QueueFullError):
+        async with workers[0].slot("access-1", "s3"):
+            pass
+
+    release_first.set()
+    await asyncio.gather(first, second)
+    assert shared.running == set() and shared.waiting == []
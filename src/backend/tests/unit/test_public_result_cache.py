@@ -0,0 +1,132 @@
+"""
+Unit Tests for Public Command Result Cache
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from app.api.websocket import public_handlers
+from app.services import public_result_cache
+from app.services.public_result_cache import (
+    CachedResult,
+    PublicResultCache,
+    get_public_result_cache,
+    make_cache_key,
+    normalize_input,
+)
+
+
+def test_key_normalizes_input_and_tracks_command_and_config():
+    """Test near-identical inputs share a key while prompt/config changes do not"""
+    key = make_cache_key("cmd-1", "Summarize", "Hello   World ", 3)
+
+    assert normalize_input("  ＨＥＬＬＯ\tworld") == "hello world"
+    assert make_cache_key("cmd-1", "Summarize", "hello world", 3) == key
+    assert make_cache_key("cmd-1", "Summarize v2", "hello world", 3) != key
+    assert make_cache_key("cmd-1", "Summarize", "hello world", 4) != key
+    assert make_cache_key("cmd-2", "Summarize", "hello world", 3) != key
+
+
+def test_ttl_lru_eviction_and_metrics(monkeypatch):
+    """Test entries expire, the least recently used is evicted and hits are counted"""
+    clock = [100.0]
+    monkeypatch.setattr(public_result_cache.time, "monotonic", lambda: clock[0])
+    cache = PublicResultCache(max_entries=2, max_response_chars=10)
+    result = CachedResult(events=[{"type": "text", "content": "hi"}], full_response="hi")
+
+    assert cache.set("a", result, ttl_seconds=60)
+    assert cache.set("b", result, ttl_seconds=10)
+    assert cache.get("a") is result  # "a" becomes most recently used
+    assert cache.set("c", result, ttl_seconds=60)  # evicts "b"
+    assert cache.get("b") is None
+
+    clock[0] += 61
+    assert cache.get("a") is None
+    # Empty or oversized responses are never cached
+    assert not cache.set("d", CachedResult(full_response=""), ttl_seconds=60)
+    assert not cache.set("e", CachedResult(full_response="x" * 11), ttl_seconds=60)
+
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["evictions"]) == (1, 2, 1)
+    assert metrics["entries"] == 1
+
+
+async def test_cache_hit_follow_up_forks_once_then_resumes(monkeypatch):
+    """Test the turn after a cache hit forks the cached SDK session and later turns do not"""
+    public_session = SimpleNamespace(
+        public_access_id="access-1",
+        public_access=SimpleNamespace(max_messages_per_session=None),
+        message_count=0,
+        sdk_session_id=None,
+        sdk_session_shared=False,
+    )
+    stored_counts = {"s1": 0}
+    built_options = []
+    sdk_session_ids = iter(["sdk-forked", "sdk-forked"])
+
+    class FakeDB:
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def session_context():
+        yield FakeDB()
+
+    class FakeService:
+        def __init__(self, db):
+            pass
+
+        async def get_public_session(self, session_id):
+            public_session.message_count = stored_counts["s1"]
+            return public_session
+
+        async def increment_message_count(self, session_id, max_messages, public_access_id=None):
+            # Conditional UPDATE: the loaded row keeps its previous count
+            stored_counts[session_id] += 1
+            return True
+
+    class FakeProcessor:
+        def __init__(self, db, project_id):
+            pass
+
+        async def load_config(self):
+            return SimpleNamespace(workspace_path="/tmp")
+
+        def validate_api_key(self, config):
+            return None
+
+        def build_sdk_options(self, config, **kwargs):
+            built_options.append(kwargs)
+            return kwargs
+
+    async def stream(session_id, options, content, **kwargs):
+        return "answer", {}, next(sdk_session_ids)
+
+    async def send_message(session_id, message):
+        pass
+
+    monkeypatch.setattr(public_handlers, "get_session_context", session_context)
+    monkeypatch.setattr(public_handlers, "PublicAccessService", FakeService)
+    monkeypatch.setattr(public_handlers, "ChatMessageProcessor", FakeProcessor)
+    monkeypatch.setattr(public_handlers, "_stream_public_response", stream)
+    monkeypatch.setattr(public_handlers.public_connection_manager, "send_message", send_message)
+
+    command = SimpleNamespace(
+        id="cmd-1", content="Summarize", public_setting=SimpleNamespace(result_cache_ttl_seconds=60)
+    )
+    version = public_handlers.get_project_config_cache().version("project-1")
+    get_public_result_cache().set(
+        make_cache_key("cmd-1", "Summarize", "hello", version),
+        CachedResult(events=[], full_response="cached", sdk_session_id="sdk-origin"),
+        ttl_seconds=60,
+    )
+
+    for content in ("hello", "tell me more", "and then?"):
+        await public_handlers._handle_public_chat("s1", content, "project-1", "/tmp", command)
+
+    assert [(o["resume_session_id"], o["fork_session"]) for o in built_options] == [
+        ("sdk-origin", True),
+        ("sdk-forked", False),
+    ]
+    assert public_session.sdk_session_id == "sdk-forked"
+    assert not public_session.sdk_session_shared
@@ -0,0 +1,72 @@
+"""
+Unit Tests for Leased Public SDK Clients
+"""
+
+import pytest
+
+from app.api.websocket import public_handlers
+from app.api.websocket.public_handlers import PublicConnectionManager
+from app.config import settings
+
+
+class FakeClient:
+    """SDK client stub that records its lifecycle"""
+
+    def __init__(self, options=None):
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(public_handlers, "ClaudeSDKClient", FakeClient)
+    monkeypatch.setattr(settings, "public_sdk_clients_per_token", 2)
+    manager = PublicConnectionManager()
+    manager.active_connections.update({"s1": object(), "s2": object(), "s3": object()})
+    return manager
+
+
+async def test_client_is_reused_across_messages(manager):
+    """Test a session keeps its client until it is discarded"""
+    async with manager.lease_sdk_client("s1", "token-a", None) as lease:
+        first = lease.client
+    async with manager.lease_sdk_client("s1", "token-a", None) as lease:
+        assert lease.client is first
+        lease.reusable = False
+
+    assert first.closed
+    assert "s1" not in manager._sdk_clients
+
+
+async def test_client_is_recreated_after_config_change(manager):
+    """Test a held client started with outdated options is replaced"""
+    async with manager.lease_sdk_client("s1", "token-a", None, config_version=1) as lease:
+        first = lease.client
+    async with manager.lease_sdk_client("s1", "token-a", None, config_version=2) as lease:
+        assert lease.client is not first
+        assert lease.config_version == 2
+
+    assert first.closed
+    assert manager._sdk_clients["s1"].client is not first
+    await manager.close_all_sdk_clients()
+
+
+async def test_per_token_cap_evicts_least_recently_used(manager):
+    """Test the oldest idle client of the same token is closed at the cap"""
+    async with manager.lease_sdk_client("s1", "token-a", None) as lease:
+        oldest = lease.client
+    async with manager.lease_sdk_client("s2", "token-a", None):
+        pass
+    async with manager.lease_sdk_client("s3", "token-a", None):
+        pass
+
+    assert oldest.closed
+    assert set(manager._sdk_clients) == {"s2", "s3"}
+
+    assert await manager.evict_idle_sdk_clients(max_idle_seconds=0) == 2
+    await manager.close_all_sdk_clients()
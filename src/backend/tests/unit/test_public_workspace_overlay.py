@@ -0,0 +1,38 @@
+"""
+Unit Tests for Public Workspace Overlays
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.services.public_workspace_overlay import PublicWorkspaceOverlays
+
+
+@pytest.mark.parametrize("mode", ["auto", "copy"])
+async def test_session_workspace_is_isolated_and_collected(tmp_path: Path, mode: str):
+    """Test a session's writes stay out of the project and expired overlays are removed"""
+    project = tmp_path / "workspace" / "project-1"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "main.py").write_text("print('hi')\n")
+    overlays = PublicWorkspaceOverlays(base_path=str(tmp_path / "overlays"), mode=mode)
+
+    cwd = Path(await overlays.ensure("session-1", str(project)))
+    assert (cwd / "src" / "main.py").read_text() == "print('hi')\n"
+
+    (cwd / "src" / "main.py").write_text("changed\n")
+    (cwd / "new.txt").write_text("new\n")
+    assert (project / "src" / "main.py").read_text() == "print('hi')\n"
+    assert not (project / "new.txt").exists()
+
+    # Existing overlays are reused, keeping the session's changes
+    assert Path(await overlays.ensure("session-1", str(project))) == cwd
+    assert (cwd / "new.txt").exists()
+
+    await overlays.ensure("session-2", str(project))
+    assert await overlays.collect_garbage(live_session_ids={"session-2"}) == 1
+    assert overlays.list_sessions() == ["session-2"]
+    assert project.is_dir()
+
+    assert await overlays.remove("session-2")
+    assert overlays.list_sessions() == []
@@ -0,0 +1,57 @@
+"""
+Unit Tests for Rate Limiting
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware.rate_limit import RateLimitMiddleware
+from app.config import settings
+from app.services import rate_limiter
+from app.services.rate_limiter import RateLimit, RateLimiter
+
+
+async def test_token_bucket_allows_burst_then_refills(monkeypatch):
+    """Test the bucket admits its capacity, then reports when to retry"""
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: clock[0])
+    limiter = RateLimiter(backend="memory")
+    limit = RateLimit(per_minute=3)
+
+    results = [await limiter.hit("k", limit) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after == pytest.approx(20.0)
+    assert results[-1].retry_after_seconds == 20
+
+    clock[0] += 20
+    assert (await limiter.hit("k", limit)).allowed
+    assert (await limiter.hit("other", limit)).allowed
+
+
+def test_middleware_limits_per_group_with_retry_after(monkeypatch):
+    """Test public routes get 429 + Retry-After while health stays exempt"""
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_public_per_minute", 2)
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", RateLimiter(backend="memory"))
+
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/api/public/{token}", ok),
+        Route("/api/health", ok),
+    ])
+    client = TestClient(RateLimitMiddleware(app))
+
+    statuses = [client.get("/api/public/abc").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+    limited = client.get("/api/public/abc")
+    assert limited.headers["Retry-After"] == "30"
+    assert limited.json()["code"] == "rate_limited"
+    # Another token gets its own bucket
+    assert client.get("/api/public/xyz").status_code == 200
+    assert all(client.get("/api/health").status_code == 200 for _ in range(5))
@@ -0,0 +1,117 @@
+"""
+Unit Tests for Read Replica Routing
+"""
+
+import time
+
+import pytest
+from starlette.requests import Request
+
+from app.api.dependencies import get_read_session
+from app.utils import database
+
+
+@pytest.fixture
+async def routed_factories(monkeypatch, sqlite_db):
+    """Primary and replica session factories backed by in-memory SQLite"""
+    primary = await sqlite_db()
+    replica = await sqlite_db()
+    monkeypatch.setattr(database, "_async_session_factory", primary)
+    monkeypatch.setattr(database, "_read_session_factory", replica)
+    monkeypatch.setattr(database, "_recent_writes", {})
+    monkeypatch.setattr(database, "_unshared_writes", set())
+    monkeypatch.setattr(
+        database,
+        "_replica_state",
+        {"healthy": True, "lag_seconds": 0.0, "checked_at": time.monotonic()},
+    )
+    return primary, replica
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_healthy_replica(routed_factories):
+    """Test that reads use the replica when it is healthy"""
+    _, replica = routed_factories
+
+    async with database.get_read_session_context(["session-1"]) as session:
+        assert session.bind is replica.kw["bind"]
+
+
+@pytest.mark.asyncio
+async def test_recent_write_reads_from_primary(routed_factories):
+    """Test read-your-writes fallback for a just-written session"""
+    primary, _ = routed_factories
+    database.mark_recent_write("session-1")
+
+    async with database.get_read_session_context(["session-1"]) as session:
+        assert session.bind is primary.kw["bind"]
+
+    async with database.get_read_session_context(["session-2"]) as session:
+        assert session.bind is not primary.kw["bind"]
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(routed_factories):
+    """Test that an unhealthy replica is bypassed"""
+    primary, _ = routed_factories
+    database._replica_state["healthy"] = False
+
+    async with database.get_read_session_context() as session:
+        assert session.bind is primary.kw["bind"]
+
+
+class _SharedRedis:
+    """Minimal stand-in for the Redis instance shared by all workers"""
+
+    def __init__(self):
+        self.keys = {}
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    async def exists(self, *keys):
+        return sum(key in self.keys for key in keys)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, px=None):
+        self.pending.append((key, px))
+
+    async def execute(self):
+        self.redis.keys.update(self.pending)
+
+
+@pytest.mark.asyncio
+async def test_recent_write_is_shared_across_workers(routed_factories, monkeypatch):
+    """Test a write committed in one worker routes another worker's reads to primary"""
+    primary, _ = routed_factories
+    monkeypatch.setattr(database, "_redis", _SharedRedis())
+
+    database.mark_recent_write("project-1")
+    async with database.get_session_context():
+        pass  # the marker is shared when the write session closes
+
+    # Another worker has no local record of the write
+    database._recent_writes.clear()
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/sessions",
+        "query_string": b"project_id=project-1",
+        "headers": [],
+        "path_params": {},
+    })
+    reads = get_read_session(request)
+    session = await reads.__anext__()
+    assert session.bind is primary.kw["bind"]
+    await reads.aclose()
@@ -0,0 +1,116 @@
+"""
+Unit Tests for Session Archival
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Delete, func, insert, select, update
+
+from app.config import settings
+from app.core.session_manager import SessionManager
+from app.models.database import MessageModel, ProjectModel, SessionModel
+from app.models.messages import MessageRole
+from app.services.archive_service import SessionArchiveService
+
+OLD = datetime.now(timezone.utc) - timedelta(days=60)
+
+
+@pytest.fixture
+async def db(monkeypatch, tmp_path, sqlite_db):
+    """SQLite session with one inactive session holding two messages"""
+    monkeypatch.setattr(settings, "archive_path", str(tmp_path / "archive"))
+    factory = await sqlite_db(ProjectModel, SessionModel, MessageModel)
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo"))
+        session.add(SessionModel(id="session-1", project_id="project-1", last_activity_at=OLD))
+        session.add_all([
+            MessageModel(id="m1", session_id="session-1", role="user", content="hello", created_at=OLD),
+            MessageModel(
+                id="m2", session_id="session-1", role="assistant", content="hi there",
+                created_at=OLD + timedelta(seconds=1),
+            ),
+        ])
+        await session.commit()
+        yield session
+
+
+async def _message_count(session) -> int:
+    return await session.scalar(select(func.count()).select_from(MessageModel))
+
+
+async def test_archive_read_and_rehydrate(db):
+    """Test archived messages are served from the segment and restored on rehydrate"""
+    archive = SessionArchiveService(db)
+    assert await archive.archive_inactive_sessions(inactive_days=30) == 1
+    assert await _message_count(db) == 0
+
+    manager = SessionManager(db)
+    messages = await manager.get_messages("session-1")
+    assert [(m.role, m.content) for m in messages] == [
+        (MessageRole.USER, "hello"),
+        (MessageRole.ASSISTANT, "hi there"),
+    ]
+    assert [m.content for m in await manager.get_messages("session-1", role=MessageRole.USER)] == ["hello"]
+
+    assert await manager.rehydrate_if_archived("session-1") == 2
+    await db.commit()
+    assert await _message_count(db) == 2
+    assert archive.find_segment("project-1", "session-1") is None
+    assert [m.content for m in await manager.get_messages("session-1")] == ["hello", "hi there"]
+
+
+async def test_archive_skips_sessions_that_became_active(db):
+    """Test the conditional claim refuses processing or recently active sessions"""
+    archive = SessionArchiveService(db)
+    threshold = datetime.now(timezone.utc) - timedelta(days=30)
+
+    await db.execute(update(SessionModel).values(is_processing=True))
+    await db.commit()
+    assert await archive.archive_session("session-1", "project-1", inactive_before=threshold) is None
+
+    await db.execute(
+        update(SessionModel).values(is_processing=False, last_activity_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    assert await archive.archive_session("session-1", "project-1", inactive_before=threshold) is None
+
+    assert await _message_count(db) == 2
+    assert (await db.get(SessionModel, "session-1")).archived_at is None
+
+
+async def test_archive_aborts_when_a_message_arrives_mid_archive(db, monkeypatch):
+    """Test a message inserted after the read is neither deleted nor archived"""
+    archive = SessionArchiveService(db)
+    execute = db.execute
+
+    async def delete_then_insert(statement, *args, **kwargs):
+        result = await execute(statement, *args, **kwargs)
+        if isinstance(statement, Delete):
+            # Simulate a message saved after the archive read its snapshot
+            await execute(insert(MessageModel).values(
+                id="m3", session_id="session-1", role="user", content="still here"
+            ))
+        return result
+
+    monkeypatch.setattr(db, "execute", delete_then_insert)
+
+    assert await archive.archive_session("session-1", "project-1") is None
+    assert await _message_count(db) == 2  # m3 was rolled back with the archive attempt
+    assert (await db.get(SessionModel, "session-1")).archived_at is None
+    assert archive.find_segment("project-1", "session-1") is None
+
+
+async def test_rehydrate_keeps_segment_until_commit(db):
+    """Test a rolled-back rehydrate leaves the archive segment in place"""
+    archive = SessionArchiveService(db)
+    assert await archive.archive_inactive_sessions(inactive_days=30) == 1
+
+    manager = SessionManager(db)
+    assert await manager.rehydrate_if_archived("session-1") == 2
+    assert archive.find_segment("project-1", "session-1") is not None
+    await db.rollback()
+
+    assert archive.find_segment("project-1", "session-1") is not None
+    assert (await db.get(SessionModel, "session-1")).archived_at is not None
+    assert [m.content for m in await manager.get_messages("session-1")] == ["hello", "hi there"]
@@ -0,0 +1,60 @@
+"""
+Unit Tests for Spend Reservation
+"""
+
+import pytest
+
+from app.services.spend_reservation import SpendReservationManager, remaining_budget
+
+
+def _cost_check(cost_daily: float, limit_daily: float) -> dict:
+    return {
+        "can_use": True,
+        "cost_daily": cost_daily,
+        "cost_weekly": cost_daily,
+        "cost_monthly": cost_daily,
+        "limit_daily": limit_daily,
+        "limit_weekly": None,
+        "limit_monthly": None,
+    }
+
+
+def test_remaining_budget_uses_tightest_limit():
+    """Test headroom is the minimum across configured limits"""
+    check = _cost_check(0.4, 1.0)
+    check["limit_monthly"] = 0.5
+
+    assert remaining_budget(check) == pytest.approx(0.1)
+    assert remaining_budget({"cost_daily": 5.0, "limit_daily": None}) is None
+
+
+async def test_concurrent_reservations_respect_headroom():
+    """Test parallel turns are admitted only while estimates fit the budget"""
+    manager = SpendReservationManager(backend="memory")
+    check = _cost_check(0.0, 0.6)
+
+    first = await manager.reserve("project-1", check)
+    second = await manager.reserve("project-1", check)
+    third = await manager.reserve("project-1", check)
+
+    assert first is not None and second is not None
+    assert third is None
+    assert await manager.reserved_total("project-1") == pytest.approx(0.5)
+
+    await manager.settle(first, 0.1)
+    await manager.release(second)
+    assert await manager.reserved_total("project-1") == 0.0
+    # 実績コストから推定額を更新（下限あり）
+    assert manager.estimate("project-1") == pytest.approx(0.15)
+
+
+async def test_single_turn_allowed_below_estimate_and_unlimited_noop():
+    """Test the first in-flight turn keeps the previous until-limit behavior"""
+    manager = SpendReservationManager(backend="memory")
+
+    assert await manager.reserve("project-1", _cost_check(0.95, 1.0)) is not None
+    assert await manager.reserve("project-1", _cost_check(0.95, 1.0)) is None
+
+    unlimited = await manager.reserve("project-2", {"can_use": True})
+    assert unlimited is not None and unlimited.is_noop
+    assert await manager.reserved_total("project-2") == 0.0
@@ -0,0 +1,46 @@
+"""
+Unit Tests for Turn Budget
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.turn_budget import TurnBudget, get_model_pricing
+
+
+def _assistant(message_id: str, input_tokens: int, output_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        message_id=message_id,
+        usage={"input_tokens": input_tokens, "output_tokens": output_tokens},
+    )
+
+
+def test_observe_accumulates_once_per_api_message():
+    """Test usage split across messages with the same id is counted once"""
+    budget = TurnBudget(model="claude-sonnet-4-5", max_tokens=10_000)
+
+    assert budget.observe(_assistant("msg-1", 1000, 200)) is None
+    assert budget.observe(_assistant("msg-1", 1000, 200)) is None
+    assert budget.observe(SimpleNamespace(usage=None)) is None
+
+    assert budget.total_tokens == 1200
+    assert budget.cost_usd == pytest.approx((1000 * 3 + 200 * 15) / 1_000_000)
+
+
+def test_observe_reports_first_exceeded_limit_only():
+    """Test the cost ceiling trips once and later messages keep accumulating"""
+    budget = TurnBudget(model="claude-opus-4-5", max_cost_usd=0.05)
+
+    assert budget.observe(_assistant("msg-1", 1000, 100)) is None
+    assert budget.observe(_assistant("msg-2", 2000, 500)) == "cost"
+    assert budget.observe(_assistant("msg-3", 100, 10)) is None
+
+    assert budget.exceeded == "cost"
+    assert budget.to_usage_info()["input_tokens"] == 3100
+
+
+def test_unknown_model_uses_highest_pricing():
+    """Test estimates never undercount for unrecognised models"""
+    assert get_model_pricing("custom-model") == get_model_pricing("opus")
+    assert get_model_pricing("haiku") < get_model_pricing("sonnet")
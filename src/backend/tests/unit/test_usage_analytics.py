@@ -0,0 +1,99 @@
+"""
+Unit Tests for Usage Analytics Service
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import ProjectModel, ProjectShareModel, UsageLedgerModel
+from app.models.errors import ValidationError
+from app.services.permission_service import PermissionService
+from app.services.usage_analytics_service import UsageAnalyticsService
+
+
+@pytest.mark.asyncio
+async def test_hourly_range_is_bounded():
+    """Test that hourly series reject overly long ranges"""
+    service = UsageAnalyticsService(session=None)
+    end = datetime(2025, 1, 31)
+
+    with pytest.raises(ValidationError):
+        await service.get_usage_series(
+            ["project-1"], interval="hour", start=end - timedelta(days=30), end=end
+        )
+
+
+@pytest.mark.asyncio
+async def test_unknown_group_by_is_rejected():
+    """Test group_by validation"""
+    service = UsageAnalyticsService(session=None)
+
+    with pytest.raises(ValidationError):
+        await service.get_usage_series(["project-1"], group_by="team")
+
+
+@pytest.fixture
+async def ledger_db(sqlite_db):
+    """SQLite session holding ledger rows around a JST day and week boundary"""
+    factory = await sqlite_db(UsageLedgerModel)
+    async with factory() as session:
+        session.add_all([
+            # 2025-01-05 23:30 JST (Sunday)
+            UsageLedgerModel(
+                project_id="project-1", session_id="s1", model="sonnet",
+                input_tokens=10, cost_usd=0.25, created_at=datetime(2025, 1, 5, 14, 30),
+            ),
+            # 2025-01-06 00:30 JST (Monday)
+            UsageLedgerModel(
+                project_id="project-1", session_id="s1", model="opus",
+                input_tokens=20, cost_usd=0.5, created_at=datetime(2025, 1, 5, 15, 30),
+            ),
+            UsageLedgerModel(
+                project_id="project-2", session_id="s2", model="opus",
+                input_tokens=99, cost_usd=9.0, created_at=datetime(2025, 1, 5, 15, 30),
+            ),
+        ])
+        await session.commit()
+        yield session
+
+
+@pytest.mark.parametrize("interval, buckets", [
+    ("hour", ["2025-01-05 23:00:00", "2025-01-06 00:00:00"]),
+    ("day", ["2025-01-05 00:00:00", "2025-01-06 00:00:00"]),
+    ("week", ["2024-12-30 00:00:00", "2025-01-06 00:00:00"]),
+])
+async def test_ledger_rows_are_bucketed_in_jst(ledger_db, interval, buckets):
+    """Test real ledger rows fall into JST buckets and are filtered by project"""
+    result = await UsageAnalyticsService(ledger_db).get_usage_series(
+        ["project-1"], interval=interval, group_by="model",
+        start=datetime(2025, 1, 1), end=datetime(2025, 1, 8),
+    )
+
+    points = sorted(
+        (point["bucket"], series["key"]) for series in result["series"] for point in series["points"]
+    )
+    assert points == list(zip(buckets, ["sonnet", "opus"]))
+    assert result["totals"]["input_tokens"] == 30
+    assert result["totals"]["cost_usd"] == pytest.approx(0.75)
+    assert result["totals"]["turns"] == 2
+
+
+async def test_accessible_projects_are_resolved_in_one_query(sqlite_db):
+    """Test owned and shared projects are accessible while others are not"""
+    factory = await sqlite_db(ProjectModel, ProjectShareModel)
+    async with factory() as session:
+        session.add_all([
+            ProjectModel(id="owned", name="Owned", user_id="user-1"),
+            ProjectModel(id="deleted", name="Deleted", user_id="user-1", status="deleted"),
+            ProjectModel(id="shared", name="Shared", user_id="user-2"),
+            ProjectModel(id="other", name="Other", user_id="user-2"),
+            ProjectShareModel(project_id="shared", user_id="user-1"),
+        ])
+        await session.commit()
+
+        accessible = await PermissionService(session).filter_accessible_projects(
+            "user-1", ["owned", "deleted", "shared", "other", "missing"]
+        )
+
+    assert accessible == {"owned", "shared"}
@@ -0,0 +1,103 @@
+"""
+Unit Tests for Project Usage Rollup and Budget Cache
+"""
+
+from datetime import timedelta
+
+from sqlalchemy.dialects import mysql
+
+from app.models.database import ProjectModel, ProjectUsageDailyModel
+from app.services import usage_service
+from app.services.usage_service import ProjectBudget, ProjectBudgetCache, UsageService, _jst_today
+
+
+def test_period_costs_bucket_by_jst_day():
+    """Test daily/weekly/monthly aggregation from daily costs"""
+    today = _jst_today()
+    budget = ProjectBudget(limit_daily=1.0, limit_weekly=None, limit_monthly=None)
+    budget.add_cost(today, 0.5)
+    budget.add_cost(today, 0.25)
+    budget.add_cost(today - timedelta(days=6), 1.0)
+    budget.add_cost(today - timedelta(days=7), 2.0)
+    budget.add_cost(today - timedelta(days=30), 100.0)
+
+    costs = budget.period_costs()
+
+    assert costs["daily"] == 0.75
+    assert costs["weekly"] == 1.75
+    assert costs["monthly"] == 3.75
+
+
+def test_cache_write_through_and_invalidate():
+    """Test that recorded spend updates cached entries only"""
+    cache = ProjectBudgetCache()
+    today = _jst_today()
+    cache.set("project-1", ProjectBudget(limit_daily=1.0, limit_weekly=None, limit_monthly=None))
+
+    cache.add_cost("project-1", today, 0.4)
+    cache.add_cost("project-2", today, 9.0)
+
+    assert cache.get("project-1").period_costs()["daily"] == 0.4
+    assert cache.get("project-2") is None
+
+    cache.invalidate("project-1")
+    assert cache.get("project-1") is None
+
+
+class _CapturingSession:
+    """Records executed statements instead of running them"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+async def test_record_usage_upserts_todays_rollup(monkeypatch):
+    """Test that record_usage adds to the JST day row and writes through to the cache"""
+    cache = ProjectBudgetCache()
+    cache.set("project-1", ProjectBudget(limit_daily=1.0, limit_weekly=None, limit_monthly=None))
+    monkeypatch.setattr(usage_service, "_budget_cache", cache)
+    session = _CapturingSession()
+    service = UsageService(session)
+
+    await service.record_usage("project-1", 0.3, input_tokens=10, output_tokens=5)
+
+    (statement,) = session.statements
+    compiled = statement.compile(dialect=mysql.dialect())
+    sql = str(compiled)
+    assert "ON DUPLICATE KEY UPDATE" in sql
+    assert "cost_usd = (project_usage_daily.cost_usd + VALUES(cost_usd))" in sql
+    assert "message_count = (project_usage_daily.message_count + %s)" in sql
+    assert compiled.params["usage_date"] == _jst_today()
+    assert compiled.params["total_tokens"] == 15
+    assert cache.get("project-1").period_costs()["daily"] == 0.3
+
+
+async def test_cost_limits_aggregate_rollup_rows(sqlite_db):
+    """Test period totals and limit checks read from the daily rollup"""
+    factory = await sqlite_db(ProjectModel, ProjectUsageDailyModel)
+    today = _jst_today()
+    async with factory() as session:
+        session.add(ProjectModel(id="project-1", name="Demo", cost_limit_daily=1.0, cost_limit_weekly=2.0))
+        session.add_all([
+            ProjectUsageDailyModel(project_id="project-1", usage_date=today, cost_usd=0.5, input_tokens=100),
+            ProjectUsageDailyModel(
+                project_id="project-1", usage_date=today - timedelta(days=6), cost_usd=1.5, output_tokens=50
+            ),
+            ProjectUsageDailyModel(project_id="project-1", usage_date=today - timedelta(days=29), cost_usd=3.0),
+            # Backfilled lifetime totals are dated outside every window
+            ProjectUsageDailyModel(project_id="project-1", usage_date=today - timedelta(days=30), cost_usd=50.0),
+        ])
+        await session.commit()
+
+        service = UsageService(session)
+        service.budget_cache = None
+
+        assert await service.get_period_costs("project-1") == {"daily": 0.5, "weekly": 2.0, "monthly": 5.0}
+        assert await service.get_cost_by_period("project-1", 7) == (2.0, 100, 50)
+
+        limits = await service.check_cost_limits("project-1")
+        assert limits["can_use"] is False
+        assert limits["exceeded_limits"] == ["weekly"]
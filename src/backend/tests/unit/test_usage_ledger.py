@@ -0,0 +1,72 @@
+"""
+Unit Tests for Usage Ledger
+"""
+
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select
+
+from app.models.database import UsageLedgerModel
+from app.services import usage_ledger
+from app.services.usage_ledger import UsageLedgerEntry, UsageLedgerWriter
+
+
+def test_entry_from_usage_info():
+    """Test conversion from _stream_response usage info"""
+    usage_info = {
+        "input_tokens": 10,
+        "output_tokens": 20,
+        "cache_read_input_tokens": 30,
+        "cache_creation_input_tokens": 40,
+        "total_cost_usd": 0.5,
+        "duration_ms": 1200,
+    }
+
+    entry = UsageLedgerEntry.from_usage_info(
+        usage_info, project_id="p", session_id="s", model="m", tool_count=2
+    )
+
+    assert (entry.input_tokens, entry.output_tokens) == (10, 20)
+    assert (entry.cache_read_tokens, entry.cache_creation_tokens) == (30, 40)
+    assert entry.cost_usd == 0.5
+    assert entry.duration_ms == 1200
+    assert entry.tool_count == 2
+
+
+def test_record_drops_oldest_when_buffer_full():
+    """Test that the buffer is bounded"""
+    writer = UsageLedgerWriter(flush_interval=60, batch_size=100, max_buffer=2)
+
+    for i in range(3):
+        writer.record(UsageLedgerEntry(project_id="p", session_id=f"s{i}"))
+
+    assert writer.pending == 2
+    assert writer.dropped == 1
+
+
+async def test_flush_writes_batches_and_keeps_failed_entries(monkeypatch, sqlite_db):
+    """Test flush inserts every buffered entry in batches and retries after a failure"""
+    factory = await sqlite_db(UsageLedgerModel)
+
+    @asynccontextmanager
+    async def session_context():
+        async with factory() as session:
+            yield session
+            await session.commit()
+
+    monkeypatch.setattr(usage_ledger, "get_session_context", session_context)
+    writer = UsageLedgerWriter(flush_interval=60, batch_size=2, max_buffer=10)
+    for i in range(3):
+        writer.record(UsageLedgerEntry(project_id="p", session_id=f"s{i}", input_tokens=i))
+
+    assert await writer.flush()
+    assert writer.pending == 0
+    async with factory() as session:
+        rows = (await session.execute(select(UsageLedgerModel.session_id))).scalars().all()
+    assert sorted(rows) == ["s0", "s1", "s2"]
+
+    async with factory.kw["bind"].begin() as conn:
+        await conn.run_sync(UsageLedgerModel.__table__.drop)
+    writer.record(UsageLedgerEntry(project_id="p", session_id="s3"))
+    assert not await writer.flush()
+    assert writer.pending == 1